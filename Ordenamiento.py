@@ -23,4 +23,207 @@ class GnomeSort:
                 # Intercambiar elementos
                 arr[index], arr[index - 1] = arr[index - 1], arr[index]
                 index -= 1
-        return
\ No newline at end of file
+        return
+
+
+class MotorOrdenamiento:
+    """
+    Motor de ordenamiento O(n log n) / O(n·d) para entradas BibTeX con claves de varios campos.
+
+    Cada entrada recibe un `valor_orden` precalculado (una tupla con un componente por campo) y
+    el desempate final se hace por la clave, igual que en `GnomeSort.comparar_entradas`.
+    Todos los algoritmos son estables y producen exactamente el mismo orden.
+    """
+
+    ALGORITMOS = ("timsort", "merge", "counting", "radix")
+
+    # Campos cuyo valor se compara como entero (años mal formados o vacíos quedan en -1)
+    CAMPOS_NUMERICOS = {"year"}
+
+    @staticmethod
+    def valor_campo(entrada, campo):
+        """Obtiene el componente de orden de una entrada para un campo."""
+        if campo == "ENTRYTYPE":
+            return entrada.entry_type
+        if campo in ("clave", "ID"):
+            return entrada.clave
+        valor = entrada.campos.get(campo, '').strip()
+        if campo in MotorOrdenamiento.CAMPOS_NUMERICOS:
+            digitos = ''.join(filter(str.isdigit, valor))
+            return int(digitos) if digitos else -1
+        return valor
+
+    @staticmethod
+    def asignar_valor_orden(entradas, campos):
+        """
+        Precalcula `valor_orden` en cada entrada.
+
+        Args:
+            entradas: Lista de objetos EntradaBib.
+            campos: Secuencia de campos en orden de prioridad (p. ej. ("year", "journal")).
+        """
+        campos = tuple(campos)
+        valor_campo = MotorOrdenamiento.valor_campo
+        for entrada in entradas:
+            entrada.valor_orden = tuple(valor_campo(entrada, campo) for campo in campos)
+
+    @staticmethod
+    def _claves(entradas):
+        # La clave completa de comparación: valor_orden y, en caso de empate, la clave de la entrada
+        return [(entrada.valor_orden, entrada.clave) for entrada in entradas]
+
+    @staticmethod
+    def _timsort(claves):
+        return sorted(range(len(claves)), key=claves.__getitem__)
+
+    @staticmethod
+    def _merge(claves):
+        """Merge sort ascendente (bottom-up) y estable sobre índices."""
+        n = len(claves)
+        orden = list(range(n))
+        auxiliar = [0] * n
+        ancho = 1
+        while ancho < n:
+            for inicio in range(0, n, 2 * ancho):
+                medio = min(inicio + ancho, n)
+                fin = min(inicio + 2 * ancho, n)
+                if medio >= fin or claves[orden[medio - 1]] <= claves[orden[medio]]:
+                    # Las dos mitades ya están en orden
+                    auxiliar[inicio:fin] = orden[inicio:fin]
+                    continue
+                i, j, k = inicio, medio, inicio
+                while i < medio and j < fin:
+                    # `<=` mantiene la estabilidad: ante empate gana la mitad izquierda
+                    if claves[orden[i]] <= claves[orden[j]]:
+                        auxiliar[k] = orden[i]
+                        i += 1
+                    else:
+                        auxiliar[k] = orden[j]
+                        j += 1
+                    k += 1
+                auxiliar[k:k + medio - i] = orden[i:medio]
+                k += medio - i
+                auxiliar[k:k + fin - j] = orden[j:fin]
+            orden, auxiliar = auxiliar, orden
+            ancho *= 2
+        return orden
+
+    @staticmethod
+    def _componentes_densos(claves):
+        """
+        Convierte cada componente de la clave (campos + clave de la entrada) en rangos enteros densos.
+
+        Returns:
+            Lista de columnas, de la más significativa a la menos significativa, y la cantidad de
+            valores distintos de cada una.
+        """
+        if not claves:
+            return [], []
+        n_campos = len(claves[0][0])
+        columnas = [[clave[0][c] for clave in claves] for c in range(n_campos)]
+        columnas.append([clave[1] for clave in claves])
+
+        densas = []
+        tamanos = []
+        for columna in columnas:
+            if all(type(valor) is int for valor in columna) and \
+                    max(columna) - min(columna) <= 4 * len(columna) + 1024:
+                # Enteros en un rango pequeño (años): se usan directamente desplazados al mínimo
+                minimo = min(columna)
+                densas.append([valor - minimo for valor in columna])
+                tamanos.append(max(columna) - minimo + 1)
+            else:
+                rango = {valor: i for i, valor in enumerate(sorted(set(columna)))}
+                densas.append([rango[valor] for valor in columna])
+                tamanos.append(len(rango))
+        return densas, tamanos
+
+    @staticmethod
+    def _pasada_counting(orden, columna, tamano):
+        """Una pasada estable de counting sort de `orden` según `columna`."""
+        conteos = [0] * (tamano + 1)
+        for i in orden:
+            conteos[columna[i] + 1] += 1
+        for v in range(tamano):
+            conteos[v + 1] += conteos[v]
+        salida = [0] * len(orden)
+        for i in orden:
+            v = columna[i]
+            salida[conteos[v]] = i
+            conteos[v] += 1
+        return salida
+
+    @staticmethod
+    def _counting(claves):
+        """Counting sort LSD: una pasada por componente, con tantos cubos como valores distintos."""
+        densas, tamanos = MotorOrdenamiento._componentes_densos(claves)
+        orden = list(range(len(claves)))
+        for columna, tamano in zip(reversed(densas), reversed(tamanos)):
+            if tamano > 1:
+                orden = MotorOrdenamiento._pasada_counting(orden, columna, tamano)
+        return orden
+
+    @staticmethod
+    def _radix(claves, bits=8):
+        """Radix sort LSD por dígitos de `bits` bits sobre los rangos densos de cada componente."""
+        densas, tamanos = MotorOrdenamiento._componentes_densos(claves)
+        orden = list(range(len(claves)))
+        base = 1 << bits
+        mascara = base - 1
+        for columna, tamano in zip(reversed(densas), reversed(tamanos)):
+            desplazamiento = 0
+            while (tamano - 1) >> desplazamiento:
+                digitos = [(valor >> desplazamiento) & mascara for valor in columna]
+                orden = MotorOrdenamiento._pasada_counting(orden, digitos, base)
+                desplazamiento += bits
+        return orden
+
+    @staticmethod
+    def ordenar(entradas, campos=("year",), algoritmo="timsort"):
+        """
+        Ordena las entradas en el lugar por los campos indicados y, ante empate, por la clave.
+
+        Args:
+            entradas: Lista de objetos EntradaBib.
+            campos: Campos de ordenamiento en orden de prioridad, p. ej. ("year", "journal").
+            algoritmo: "timsort", "merge", "counting" (ideal para `year`) o "radix".
+
+        Returns:
+            La misma lista, ya ordenada.
+        """
+        if algoritmo not in MotorOrdenamiento.ALGORITMOS:
+            raise ValueError(f"Algoritmo de ordenamiento desconocido: '{algoritmo}'")
+
+        MotorOrdenamiento.asignar_valor_orden(entradas, campos)
+        claves = MotorOrdenamiento._claves(entradas)
+        orden = getattr(MotorOrdenamiento, "_" + algoritmo)(claves)
+        entradas[:] = [entradas[i] for i in orden]
+        return entradas
+
+    @staticmethod
+    def ordenar_archivo(archivo_entrada, archivo_salida, campos=("year",), algoritmo="timsort"):
+        """
+        Lee un archivo .bib, lo ordena y escribe las entradas completas en `archivo_salida`.
+
+        Reemplaza el paso de GnomeSort que genera `referencias_ordenadas_GnomeSort_year.bib`.
+        """
+        entradas = BibFileUtil.leer_archivo_bib(archivo_entrada)
+        MotorOrdenamiento.ordenar(entradas, campos, algoritmo)
+        with open(archivo_salida, 'w', encoding='utf-8') as salida:
+            for entrada in entradas:
+                salida.write(entrada.entrada_completa)
+        return len(entradas)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ordena un archivo .bib por uno o varios campos.")
+    parser.add_argument("entrada")
+    parser.add_argument("salida")
+    parser.add_argument("--campos", nargs="+", default=["year"])
+    parser.add_argument("--algoritmo", choices=MotorOrdenamiento.ALGORITMOS, default="timsort")
+    args = parser.parse_args()
+
+    total = MotorOrdenamiento.ordenar_archivo(args.entrada, args.salida, args.campos, args.algoritmo)
+    print(f"{total} entradas ordenadas en: {args.salida}")
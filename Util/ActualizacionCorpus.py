@@ -0,0 +1,252 @@
+"""
+Actualización incremental del corpus ordenado cuando llegan nuevas exportaciones .bib.
+
+En lugar de volver a unir, filtrar y ordenar todo, las entradas nuevas se parsean, se descartan
+las que ya están en el corpus (índice de huellas en disco), se insertan en su posición dentro del
+archivo ordenado copiando el resto por bloques de bytes y se agregan al BibCorpus en memoria.
+
+Uso (desde la raíz del repositorio):
+    python -m Util.ActualizacionCorpus Util/outputFile/referencias_ordenadas_GnomeSort_year.bib nuevos/*.bib
+"""
+import argparse
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+
+from Ordenamiento import MotorOrdenamiento
+from Util.BibCorpus import BibCorpus
+from Util.BibFileUtil import BibFileUtil
+from Util.CacheCorpus import CacheCorpus
+from Util.UnirBib import UnirBib
+
+
+class IndiceClaves:
+    """
+    Índice en disco de las huellas de deduplicación (DOI normalizado y título+año) del corpus,
+    las que registra UnirBib.huellas; las entradas nuevas se buscan con UnirBib.huellas_consulta.
+
+    Guarda las huellas de 64 bits ordenadas junto con el SHA-256 del archivo .bib al que
+    corresponden; si el archivo cambió por otra vía el índice se descarta y se reconstruye.
+    """
+
+    MAGICO = b"BIBCLAV2"
+    _cabecera = struct.Struct("<8s32sQ")
+
+    def __init__(self, huellas=None):
+        self.huellas = array('Q', sorted(set(huellas or ())))
+        self._nuevas = set()
+
+    @classmethod
+    def desde_entradas(cls, entradas):
+        """Construye el índice con las huellas de todas las entradas."""
+        return cls(huella for entrada in entradas for huella in UnirBib.huellas(entrada))
+
+    def __contains__(self, huella):
+        if huella in self._nuevas:
+            return True
+        posicion = bisect_left(self.huellas, huella)
+        return posicion < len(self.huellas) and self.huellas[posicion] == huella
+
+    def __len__(self):
+        return len(self.huellas) + len(self._nuevas)
+
+    def agregar(self, huellas):
+        for huella in huellas:
+            if huella not in self:
+                self._nuevas.add(huella)
+
+    def guardar(self, ruta, sha256_corpus):
+        """Escribe el índice de forma atómica, asociado al SHA-256 del corpus."""
+        if self._nuevas:
+            self.huellas = array('Q', sorted(set(self.huellas).union(self._nuevas)))
+            self._nuevas = set()
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        os.makedirs(directorio, exist_ok=True)
+        descriptor, ruta_temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        with os.fdopen(descriptor, 'wb') as archivo:
+            archivo.write(self._cabecera.pack(self.MAGICO, bytes.fromhex(sha256_corpus), len(self.huellas)))
+            self.huellas.tofile(archivo)
+        os.replace(ruta_temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta, sha256_corpus):
+        """Carga el índice, o devuelve None si no existe o corresponde a otro corpus."""
+        try:
+            with open(ruta, 'rb') as archivo:
+                magico, huella, cantidad = cls._cabecera.unpack(archivo.read(cls._cabecera.size))
+                if magico != cls.MAGICO or huella.hex() != sha256_corpus:
+                    return None
+                indice = cls()
+                indice.huellas.fromfile(archivo, cantidad)
+                return indice
+        except (OSError, EOFError, struct.error):
+            return None
+
+
+class ActualizacionCorpus:
+
+    # Campos por los que está ordenado el corpus (referencias_ordenadas_GnomeSort_year.bib)
+    CAMPOS_ORDEN = ("year",)
+
+    @staticmethod
+    def clave_orden(entrada, campos):
+        """Clave de MotorOrdenamiento.ordenar: (valor_orden, clave de la entrada)."""
+        return tuple(MotorOrdenamiento.valor_campo(entrada, campo) for campo in campos), entrada.clave
+
+    @staticmethod
+    def leer_nuevas(archivos, indice):
+        """
+        Lee los archivos nuevos y devuelve las entradas que no están en el índice ni repetidas
+        entre sí, agregando sus huellas al índice.
+
+        Returns:
+            Tupla (entradas nuevas, total de entradas leídas).
+        """
+        nuevas = []
+        leidas = 0
+        for archivo in archivos:
+            for entrada in BibFileUtil.iter_entradas(archivo):
+                leidas += 1
+                # Con DOI distintos no hay duplicado aunque coincidan título y año
+                if any(huella in indice for huella in UnirBib.huellas_consulta(entrada)):
+                    continue
+                indice.agregar(UnirBib.huellas(entrada))
+                nuevas.append(entrada)
+        return nuevas, leidas
+
+    @staticmethod
+    def insertar_ordenadas(corpus, archivo_bib, nuevas, campos=CAMPOS_ORDEN):
+        """
+        Inserta las entradas nuevas en el archivo ordenado sin volver a ordenarlo.
+
+        Cada entrada nueva se ubica con búsqueda binaria sobre las claves de orden del corpus
+        (después de las iguales, como un ordenamiento estable de corpus + nuevas) y el archivo se
+        reescribe copiando los bloques de bytes entre los puntos de inserción. Las posiciones en
+        bytes de las filas existentes se desplazan y las nuevas se agregan al final del corpus.
+
+        Returns:
+            El número de la primera fila agregada al corpus.
+        """
+        # Filas existentes en el orden del archivo (tras una actualización anterior las filas
+        # agregadas al final del corpus están en medio del archivo)
+        filas = sorted(range(len(corpus)), key=corpus.inicios.__getitem__)
+        claves = [ActualizacionCorpus.clave_orden(corpus[fila], campos) for fila in filas]
+        if any(claves[i] > claves[i + 1] for i in range(len(claves) - 1)):
+            raise ValueError(f"El corpus '{archivo_bib}' no está ordenado por {', '.join(campos)}.")
+
+        nuevas = sorted(nuevas, key=lambda entrada: ActualizacionCorpus.clave_orden(entrada, campos))
+        posiciones = [bisect_right(claves, ActualizacionCorpus.clave_orden(entrada, campos)) for entrada in nuevas]
+        textos = []
+        for entrada in nuevas:
+            texto = entrada.entrada_completa
+            textos.append((texto if texto.endswith('\n') else texto + '\n').encode('utf-8'))
+
+        tamano = os.path.getsize(archivo_bib)
+        desplazamientos = [0] * (len(filas) + 1)  # bytes insertados antes de cada fila (en orden del archivo)
+        ubicaciones = []  # (inicio, fin) de cada entrada nueva en el archivo resultante
+        directorio = os.path.dirname(os.path.abspath(archivo_bib))
+        descriptor, ruta_temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        try:
+            with open(archivo_bib, 'rb') as origen, os.fdopen(descriptor, 'wb') as destino:
+                falta_salto = False
+                if tamano:
+                    origen.seek(tamano - 1)
+                    falta_salto = origen.read(1) != b'\n'
+                copiado = 0
+                insertado = 0
+                for posicion, texto in zip(posiciones, textos):
+                    corte = corpus.inicios[filas[posicion]] if posicion < len(filas) else tamano
+                    if corte > copiado:
+                        ActualizacionCorpus._copiar(origen, destino, copiado, corte)
+                        copiado = corte
+                    if corte == tamano and falta_salto:
+                        destino.write(b'\n')  # El archivo original no termina en salto de línea
+                        insertado += 1
+                        falta_salto = False
+                    inicio = copiado + insertado
+                    destino.write(texto)
+                    insertado += len(texto)
+                    ubicaciones.append((inicio, inicio + len(texto)))
+                    desplazamientos[posicion] = insertado
+                ActualizacionCorpus._copiar(origen, destino, copiado, tamano)
+            os.replace(ruta_temporal, archivo_bib)
+        except BaseException:
+            os.unlink(ruta_temporal)
+            raise
+
+        # Desplazar las filas existentes según los bytes insertados antes de cada una
+        acumulado = 0
+        for indice, fila in enumerate(filas):
+            acumulado = max(acumulado, desplazamientos[indice])
+            if acumulado:
+                corpus.mover(fila, corpus.inicios[fila] + acumulado, corpus.fines[fila] + acumulado)
+
+        primera_fila = len(corpus)
+        for entrada, (inicio, fin) in zip(nuevas, ubicaciones):
+            entrada.inicio, entrada.fin = inicio, fin
+            corpus.agregar(entrada)
+        return primera_fila
+
+    @staticmethod
+    def _copiar(origen, destino, inicio, fin, tamano_bloque=1 << 20):
+        """Copia los bytes [inicio, fin) de `origen` a `destino` por bloques."""
+        origen.seek(inicio)
+        restantes = fin - inicio
+        while restantes > 0:
+            bloque = origen.read(min(tamano_bloque, restantes))
+            if not bloque:
+                break
+            destino.write(bloque)
+            restantes -= len(bloque)
+
+    @staticmethod
+    def aplicar(archivo_bib, corpus, archivos_nuevos, ruta_indice, campos=CAMPOS_ORDEN):
+        """
+        Agrega al corpus ordenado las entradas de `archivos_nuevos` que todavía no tiene.
+
+        Args:
+            archivo_bib: Archivo .bib ordenado del corpus (se reescribe en el lugar).
+            corpus: BibCorpus de ese archivo; recibe las filas nuevas al final.
+            archivos_nuevos: Rutas de las exportaciones nuevas.
+            ruta_indice: Ruta del índice de huellas; se construye si no existe o está desactualizado.
+
+        Returns:
+            Diccionario con las entradas leídas, nuevas y duplicadas, la primera fila agregada
+            (`desde`) y el SHA-256 del archivo resultante.
+        """
+        sha256 = CacheCorpus.huella_archivo(archivo_bib)
+        indice = IndiceClaves.cargar(ruta_indice, sha256)
+        if indice is None:
+            indice = IndiceClaves.desde_entradas(corpus)
+
+        nuevas, leidas = ActualizacionCorpus.leer_nuevas(archivos_nuevos, indice)
+        desde = len(corpus)
+        if nuevas:
+            desde = ActualizacionCorpus.insertar_ordenadas(corpus, archivo_bib, nuevas, campos)
+            sha256 = CacheCorpus.huella_archivo(archivo_bib)
+        indice.guardar(ruta_indice, sha256)
+
+        return {
+            "leidas": leidas,
+            "nuevas": len(nuevas),
+            "duplicadas": leidas - len(nuevas),
+            "desde": desde,
+            "sha256": sha256,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agrega entradas nuevas a un corpus .bib ordenado.")
+    parser.add_argument("corpus")
+    parser.add_argument("nuevos", nargs="+")
+    parser.add_argument("--indice", default=None, help="Índice de huellas (por defecto, <corpus>.claves)")
+    parser.add_argument("--campos", nargs="+", default=list(ActualizacionCorpus.CAMPOS_ORDEN))
+    args = parser.parse_args()
+
+    corpus = BibCorpus.desde_archivo(args.corpus)
+    resumen = ActualizacionCorpus.aplicar(args.corpus, corpus, args.nuevos, args.indice or args.corpus + ".claves",
+                                          tuple(args.campos))
+    print(f"{resumen['nuevas']} entradas nuevas insertadas en {args.corpus} "
+          f"({resumen['duplicadas']} ya existentes de {resumen['leidas']} leídas)")
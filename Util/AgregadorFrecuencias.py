@@ -0,0 +1,207 @@
+"""
+Agregación en streaming de frecuencias: las k más comunes, la moda y la "mediana" alfabética.
+
+Reemplaza el patrón Counter + sorted(todos los valores) de calcular_estadisticas_max15 y
+calcular_estadisticas_dos_campos:
+- Modo "exacto": un Counter por valor distinto, las k más comunes con un heap (como
+  Counter.most_common) y la mediana con selección lineal ponderada sobre los valores distintos,
+  sin la copia ordenada de todos los datos. Mismo resultado que las funciones originales.
+- Modo "aproximado": memoria fija para corpus enormes. Space-Saving mantiene `capacidad`
+  candidatos a más frecuentes, Count-Min acota sus conteos y la mediana se toma de una muestra
+  de tamaño fijo (reservoir sampling).
+"""
+import hashlib
+import heapq
+import random
+from array import array
+from collections import Counter
+
+
+class CountMin:
+    """
+    Sketch Count-Min: estima la frecuencia de cualquier valor con memoria fija (`ancho` x
+    `profundidad` contadores). Nunca subestima; sobreestima como mucho en e/ancho del total con
+    probabilidad 1 - e^-profundidad.
+    """
+
+    def __init__(self, ancho=2048, profundidad=4):
+        self.ancho = ancho
+        self.profundidad = profundidad
+        self.tablas = [array('Q', bytes(8 * ancho)) for _ in range(profundidad)]
+
+    def _posiciones(self, valor):
+        huella = int.from_bytes(hashlib.blake2b(repr(valor).encode('utf-8'), digest_size=8).digest(), 'little')
+        # Doble hashing (Kirsch-Mitzenmacher), como FiltroBloom
+        h1 = huella & 0xFFFFFFFF
+        h2 = (huella >> 32) | 1
+        return ((h1 + i * h2) % self.ancho for i in range(self.profundidad))
+
+    def agregar(self, valor, veces=1):
+        for tabla, posicion in zip(self.tablas, self._posiciones(valor)):
+            tabla[posicion] += veces
+
+    def estimar(self, valor):
+        return min(tabla[posicion] for tabla, posicion in zip(self.tablas, self._posiciones(valor)))
+
+
+class SpaceSaving:
+    """
+    Algoritmo Space-Saving: sigue como mucho `capacidad` valores. Cuando llega un valor nuevo con
+    la tabla llena reemplaza al de menor conteo y hereda ese conteo (que queda como su error
+    máximo). Todo valor con frecuencia mayor que total/capacidad está garantizado en la tabla.
+    """
+
+    def __init__(self, capacidad=1000):
+        self.capacidad = capacidad
+        self.conteos = {}    # valor -> [conteo, error, orden de primera aparición]
+        self._minimos = []   # heap (conteo, orden, valor) con entradas obsoletas que se descartan al salir
+        self._orden = 0
+
+    def agregar(self, valor):
+        datos = self.conteos.get(valor)
+        if datos is not None:
+            datos[0] += 1
+        elif len(self.conteos) < self.capacidad:
+            datos = self.conteos[valor] = [1, 0, self._orden]
+        else:
+            # Desalojar el valor con menor conteo (las entradas del heap pueden estar desactualizadas)
+            while True:
+                conteo, orden, desalojado = heapq.heappop(self._minimos)
+                actual = self.conteos.get(desalojado)
+                if actual is not None and actual[0] == conteo and actual[2] == orden:
+                    break
+            del self.conteos[desalojado]
+            datos = self.conteos[valor] = [conteo + 1, conteo, self._orden]
+        self._orden += 1
+        heapq.heappush(self._minimos, (datos[0], datos[2], valor))
+        if len(self._minimos) > 4 * self.capacidad:
+            self._minimos = [(datos[0], datos[2], valor) for valor, datos in self.conteos.items()]
+            heapq.heapify(self._minimos)
+
+    def mas_comunes(self, k):
+        """Los k valores con mayor conteo; los empates se ordenan por primera aparición."""
+        return heapq.nsmallest(k, ((valor, datos[0], datos[2]) for valor, datos in self.conteos.items()),
+                               key=lambda elemento: (-elemento[1], elemento[2]))
+
+
+class AgregadorFrecuencias:
+    """
+    Recibe los valores uno a uno y calcula cantidad, las k más frecuentes, la moda y la
+    "mediana" (valor central en orden alfabético, como sorted(valores)[n // 2]).
+
+    Args:
+        k: Número de valores más frecuentes a devolver.
+        modo: "exacto" o "aproximado" (memoria fija).
+        capacidad: Valores seguidos por Space-Saving en el modo aproximado.
+        ancho, profundidad: Tamaño del sketch Count-Min en el modo aproximado.
+        tamano_muestra: Tamaño de la muestra para la mediana en el modo aproximado.
+    """
+
+    MODOS = ("exacto", "aproximado")
+
+    def __init__(self, k=15, modo="exacto", capacidad=1000, ancho=2048, profundidad=4, tamano_muestra=10000):
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo de agregación no soportado: '{modo}'")
+        self.k = k
+        self.modo = modo
+        self.cantidad = 0
+        if modo == "exacto":
+            self.contador = Counter()
+        else:
+            self.space_saving = SpaceSaving(max(capacidad, k))
+            self.count_min = CountMin(ancho, profundidad)
+            self.tamano_muestra = tamano_muestra
+            self.muestra = []
+            self._aleatorio = random.Random(0)  # Muestra reproducible
+
+    @staticmethod
+    def valor_en_posicion(frecuencias, posicion):
+        """
+        Valor en la posición `posicion` (desde 0) de los datos ordenados, dado un diccionario
+        valor -> frecuencia, en tiempo lineal sobre los valores distintos en lugar de ordenarlos.
+        """
+        # Se particionan solo las claves (sin tuplas valor-frecuencia) para no duplicar la memoria
+        valores = list(frecuencias)
+        aleatorio = random.Random(0)
+        desbalanceada = False
+        while True:
+            if len(valores) <= 32:
+                for valor in sorted(valores):
+                    if posicion < frecuencias[valor]:
+                        return valor
+                    posicion -= frecuencias[valor]
+                return None
+
+            # Introselect: pivote aleatorio (reproducible) y mediana de medianas si la partición
+            # anterior quedó muy desbalanceada, lo que garantiza tiempo lineal en el peor caso
+            if desbalanceada:
+                pivote = AgregadorFrecuencias._mediana_de_medianas(valores)
+            else:
+                pivote = sorted(aleatorio.sample(valores, 3))[1]
+            anterior = len(valores)
+            menores, mayores = [], []
+            peso_menores = 0
+            for valor in valores:
+                if valor < pivote:
+                    menores.append(valor)
+                    peso_menores += frecuencias[valor]
+                elif pivote < valor:
+                    mayores.append(valor)
+            peso_pivote = frecuencias[pivote]
+
+            if posicion < peso_menores:
+                valores = menores
+            elif posicion < peso_menores + peso_pivote:
+                return pivote
+            else:
+                posicion -= peso_menores + peso_pivote
+                valores = mayores
+            desbalanceada = len(valores) > 3 * anterior // 4
+
+    @staticmethod
+    def _mediana_de_medianas(valores):
+        """Pivote de la selección: mediana de las medianas de grupos de 5 (garantiza O(n))."""
+        if len(valores) <= 5:
+            return sorted(valores)[len(valores) // 2]
+        medianas = [sorted(valores[i:i + 5])[(min(i + 5, len(valores)) - i) // 2] for i in range(0, len(valores), 5)]
+        return AgregadorFrecuencias.valor_en_posicion(Counter(medianas), len(medianas) // 2)
+
+    def agregar(self, valor):
+        self.cantidad += 1
+        if self.modo == "exacto":
+            self.contador[valor] += 1
+            return
+        self.space_saving.agregar(valor)
+        self.count_min.agregar(valor)
+        # Reservoir sampling (algoritmo R)
+        if len(self.muestra) < self.tamano_muestra:
+            self.muestra.append(valor)
+        else:
+            posicion = self._aleatorio.randrange(self.cantidad)
+            if posicion < self.tamano_muestra:
+                self.muestra[posicion] = valor
+
+    def agregar_todos(self, valores):
+        for valor in valores:
+            self.agregar(valor)
+        return self
+
+    def mas_comunes(self, k=None):
+        """Lista de (valor, frecuencia) de los k más comunes, como Counter.most_common(k)."""
+        k = self.k if k is None else k
+        if self.modo == "exacto":
+            return self.contador.most_common(k)  # heapq.nlargest: O(d log k)
+        # Cada conteo de Space-Saving y de Count-Min es una cota superior: se usa la menor
+        return [(valor, min(conteo, self.count_min.estimar(valor)))
+                for valor, conteo, _ in self.space_saving.mas_comunes(k)]
+
+    def moda(self):
+        mas_comunes = self.mas_comunes(1)
+        return mas_comunes[0] if mas_comunes else None
+
+    def mediana(self):
+        if not self.cantidad:
+            return None
+        if self.modo == "exacto":
+            return AgregadorFrecuencias.valor_en_posicion(self.contador, self.cantidad // 2)
+        return AgregadorFrecuencias.valor_en_posicion(Counter(self.muestra), len(self.muestra) // 2)
@@ -0,0 +1,189 @@
+"""
+Análisis map-reduce de un archivo .bib con varios procesos.
+
+El archivo se divide en rangos de bytes alineados al inicio de las entradas; cada proceso parsea
+su rango y calcula agregados parciales combinables (Counters), que luego se combinan en el orden
+del archivo. Con el mismo orden de combinación los resultados son idénticos a los de la ruta en
+serie de EstadisticasDescriptivas, incluidos los desempates de la moda y del top 15.
+
+Uso (desde la raíz del repositorio):
+    python -m Util.AnalisisParalelo Util/outputFile/referencias_ordenadas_GnomeSort_year.bib --workers 4
+"""
+import argparse
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from app import EstadisticasDescriptivas
+from Util.Autores import Autores
+from Util.BibFileUtil import BibFileUtil
+from Util.EmparejadorCategorias import EmparejadorCategorias
+
+
+class ResultadoParcial:
+    """Agregados de un fragmento del corpus que se pueden combinar con los de otro fragmento."""
+
+    # Campos analizados por su primer dato (como calcular_estadisticas_max15)
+    CAMPOS_PRIMER_DATO = ("author", "journal", "publisher")
+    # Campos analizados por su valor completo (como calcular_estadisticas)
+    CAMPOS_COMPLETOS = ("ENTRYTYPE", "source")
+
+    patron_citas = re.compile(r"Cited by: (\d+)")
+    patron_no_vacio = re.compile(r'\S')
+
+    def __init__(self, n_variables):
+        self.entradas = 0
+        self.hay_textos = False
+        self.totales_categorias = [0] * n_variables
+        self.anios = Counter()
+        self.primeros = {campo: Counter() for campo in self.CAMPOS_PRIMER_DATO}
+        self.completos = {campo: Counter() for campo in self.CAMPOS_COMPLETOS}
+        self.journals = Counter()
+        self.citas_journal = Counter()
+        self.articulos_con_citas = Counter()
+
+    def agregar(self, entrada, emparejador, campo_texto="abstract"):
+        """Acumula una entrada en los agregados."""
+        campos = entrada.campos
+        self.entradas += 1
+
+        texto = campos.get(campo_texto, '').strip()
+        if texto:
+            self.hay_textos = True
+            emparejador.contar_texto(texto, self.totales_categorias)
+
+        anio = EstadisticasDescriptivas.limpiar_anio(campos.get("year", '').strip())
+        if anio:
+            self.anios[int(anio)] += 1
+
+        for campo, contador in self.primeros.items():
+            primer_dato = Autores.primer_dato(campo, campos.get(campo, '').strip())
+            if self.patron_no_vacio.search(primer_dato):
+                contador[primer_dato] += 1
+
+        for campo, contador in self.completos.items():
+            valor = entrada.entry_type if campo == "ENTRYTYPE" else campos.get(campo, '').strip()
+            if valor:
+                contador[valor] += 1
+
+        journal = campos.get("journal") or campos.get("issn")
+        if journal:
+            self.journals[journal] += 1
+            coincidencia = self.patron_citas.search(campos.get("note", ""))
+            if coincidencia:
+                self.citas_journal[journal] += int(coincidencia.group(1))
+                self.articulos_con_citas[journal] += 1
+
+    def combinar(self, otro):
+        """Suma los agregados de `otro` (un fragmento posterior del archivo) a este resultado."""
+        self.entradas += otro.entradas
+        self.hay_textos = self.hay_textos or otro.hay_textos
+        self.totales_categorias = [a + b for a, b in zip(self.totales_categorias, otro.totales_categorias)]
+        self.anios.update(otro.anios)
+        for campo, contador in self.primeros.items():
+            contador.update(otro.primeros[campo])
+        for campo, contador in self.completos.items():
+            contador.update(otro.completos[campo])
+        self.journals.update(otro.journals)
+        self.citas_journal.update(otro.citas_journal)
+        self.articulos_con_citas.update(otro.articulos_con_citas)
+        return self
+
+
+def _procesar_rango(argumentos):
+    """Tarea de cada proceso: parsea un rango de bytes y devuelve su ResultadoParcial."""
+    nombre_archivo, inicio, fin, categorias = argumentos
+    emparejador = EmparejadorCategorias(categorias)
+    parcial = ResultadoParcial(len(emparejador.variables))
+    for entrada in BibFileUtil.iter_entradas(nombre_archivo, inicio, fin):
+        parcial.agregar(entrada, emparejador)
+    return parcial
+
+
+class AnalisisParalelo:
+
+    @staticmethod
+    def calcular_parciales(nombre_archivo, categorias, workers=1):
+        """
+        Ejecuta la fase map y combina los resultados parciales en el orden del archivo.
+
+        Args:
+            nombre_archivo: Ruta del archivo .bib.
+            categorias: Diccionario devuelto por EstadisticasDescriptivas.cargar_datos.
+            workers: Número de procesos. Con 1 se procesa todo en el proceso actual.
+        """
+        if workers <= 1:
+            return _procesar_rango((nombre_archivo, 0, None, categorias))
+
+        # Más rangos que procesos para repartir mejor la carga
+        rangos = BibFileUtil.dividir_en_rangos(nombre_archivo, workers * 4)
+        tareas = [(nombre_archivo, inicio, fin, categorias) for inicio, fin in rangos]
+        with ProcessPoolExecutor(max_workers=workers) as ejecutor:
+            parciales = list(ejecutor.map(_procesar_rango, tareas))
+
+        resultado = parciales[0]
+        for parcial in parciales[1:]:
+            resultado.combinar(parcial)
+        return resultado
+
+    @staticmethod
+    def analizar(nombre_archivo, categorias, workers=1, n_top=15, n_journals=10):
+        """
+        Calcula en paralelo las estadísticas del corpus.
+
+        Returns:
+            Diccionario con:
+            - entradas: número de entradas procesadas.
+            - frecuencias_categorias, frecuencias_variables: como contar_frecuencia_categorias.
+            - estadisticas: por campo, el mismo diccionario que devuelve la función de
+              EstadisticasDescriptivas que usa server.py para ese campo.
+            - journals: los `n_journals` journals con más artículos, con sus citaciones totales.
+        """
+        parcial = AnalisisParalelo.calcular_parciales(nombre_archivo, categorias, workers)
+        emparejador = EmparejadorCategorias(categorias)
+        frecuencias_categorias, frecuencias_variables = emparejador.resultados(
+            parcial.totales_categorias if parcial.hay_textos else None)
+
+        estadisticas = {"year": EstadisticasDescriptivas.resumen_numerico(parcial.anios)}
+        for campo, contador in parcial.primeros.items():
+            estadisticas[campo] = EstadisticasDescriptivas.resumen_categorico(contador, n_top)
+        for campo, contador in parcial.completos.items():
+            estadisticas[campo] = EstadisticasDescriptivas.resumen_categorico(contador) if contador else None
+
+        journals = {
+            journal: {
+                "articulos": articulos,
+                "total_citations": parcial.citas_journal[journal],
+                "articulos_con_citas": parcial.articulos_con_citas[journal],
+            }
+            for journal, articulos in parcial.journals.most_common(n_journals)
+        }
+
+        return {
+            "entradas": parcial.entradas,
+            "frecuencias_categorias": frecuencias_categorias,
+            "frecuencias_variables": frecuencias_variables,
+            "estadisticas": estadisticas,
+            "journals": journals,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análisis paralelo (map-reduce) de un archivo .bib.")
+    parser.add_argument("archivo")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--categorias", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "Categorias.csv"))
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultado = AnalisisParalelo.analizar(args.archivo, EstadisticasDescriptivas.cargar_datos(args.categorias), args.workers)
+    segundos = time.perf_counter() - inicio
+
+    print(f"{resultado['entradas']} entradas analizadas con {args.workers} proceso(s) en {segundos:.2f} s")
+    for categoria, total in resultado["frecuencias_categorias"].most_common():
+        print(f"  {categoria}: {total}")
+    for campo, stats in resultado["estadisticas"].items():
+        if stats:
+            print(f"  {campo}: cantidad={stats['cantidad']} moda={stats['moda']} mediana={stats['mediana']}")
@@ -0,0 +1,111 @@
+"""
+Separación y normalización de nombres de autores BibTeX.
+
+En BibTeX los autores se separan con " and " (fuera de llaves, que agrupan nombres de
+instituciones como "{Barnes and Noble}") y cada nombre se escribe como "Apellido, Nombre",
+"Apellido, Jr., Nombre" o "Nombre von Apellido". Separar por comas, como se hacía para obtener el
+"primer autor", devolvía solo el apellido. Aquí cada nombre se lleva a la forma canónica
+"Apellido, Nombre" (sin llaves y con los espacios normalizados), de modo que el mismo autor escrito
+de las dos formas se cuenta una sola vez.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+
+class Autores:
+
+    # Versión de la normalización: forma parte de las claves de los gráficos en caché (server.py)
+    VERSION = 1
+
+    patron_y = re.compile(r"\s+and\s+", re.IGNORECASE)
+    patron_espacios = re.compile(r"\s+")
+
+    @staticmethod
+    def separar(valor):
+        """Nombres (sin normalizar) de una lista de autores separada por " and " fuera de llaves."""
+        if not valor:
+            return []
+        if "{" not in valor:
+            return [nombre for nombre in Autores.patron_y.split(valor.strip()) if nombre.strip()]
+        nombres, inicio = [], 0
+        for coincidencia in Autores.patron_y.finditer(valor):
+            prefijo = valor[:coincidencia.start()]
+            if prefijo.count("{") == prefijo.count("}"):
+                nombres.append(valor[inicio:coincidencia.start()])
+                inicio = coincidencia.end()
+        nombres.append(valor[inicio:])
+        return [nombre for nombre in nombres if nombre.strip()]
+
+    @staticmethod
+    def palabras(nombre):
+        """Palabras de un nombre separadas por espacios fuera de llaves ("{Barnes and Noble}" es una sola)."""
+        palabras, actual, profundidad = [], [], 0
+        for caracter in nombre:
+            if caracter == " " and profundidad == 0:
+                if actual:
+                    palabras.append("".join(actual))
+                    actual = []
+                continue
+            if caracter == "{":
+                profundidad += 1
+            elif caracter == "}":
+                profundidad = max(profundidad - 1, 0)
+            actual.append(caracter)
+        if actual:
+            palabras.append("".join(actual))
+        return palabras
+
+    @staticmethod
+    @lru_cache(maxsize=1 << 16)
+    def canonico(nombre):
+        """
+        Forma canónica "Apellido, Nombre" de un nombre BibTeX, o None si está vacío o es "others".
+
+        "Nombre Apellido" y "Nombre von Apellido" se reordenan; los nombres que ya tienen comas
+        ("Apellido, Nombre" y "Apellido, Jr., Nombre") conservan el orden de sus partes.
+        """
+        nombre = unicodedata.normalize("NFC", Autores.patron_espacios.sub(" ", nombre)).strip(" ,")
+        if not nombre or nombre.lower() == "others":
+            return None
+        if "," in nombre:
+            partes = (parte.replace("{", "").replace("}", "").strip() for parte in nombre.split(","))
+            return ", ".join(parte for parte in partes if parte) or None
+
+        palabras = [palabra.replace("{", "").replace("}", "") for palabra in Autores.palabras(nombre)]
+        palabras = [palabra for palabra in palabras if palabra]
+        if not palabras:
+            return None
+        if len(palabras) == 1:
+            return palabras[0]
+        # El apellido empieza en la primera partícula en minúscula ("von", "de la") o es la última palabra
+        inicio_apellido = len(palabras) - 1
+        for posicion, palabra in enumerate(palabras[:-1]):
+            if palabra[0].islower():
+                inicio_apellido = posicion
+                break
+        if inicio_apellido == 0:
+            return " ".join(palabras)
+        return f"{' '.join(palabras[inicio_apellido:])}, {' '.join(palabras[:inicio_apellido])}"
+
+    @staticmethod
+    def normalizar(valor):
+        """Autores canónicos de un campo `author`, sin repetidos y en su orden original."""
+        autores = (Autores.canonico(nombre) for nombre in Autores.separar(valor))
+        return list(dict.fromkeys(autor for autor in autores if autor))
+
+    @staticmethod
+    def primer_autor(valor):
+        """Primer autor canónico de un campo `author`, o "" si no tiene."""
+        for nombre in Autores.separar(valor):
+            autor = Autores.canonico(nombre)
+            if autor:
+                return autor
+        return ""
+
+    @staticmethod
+    def primer_dato(campo, valor):
+        """Primer dato de un campo: el primer autor para `author` y el texto antes de la primera coma para los demás."""
+        if campo == "author":
+            return Autores.primer_autor(valor)
+        return valor.split(",")[0].strip()
@@ -0,0 +1,322 @@
+import sys
+from array import array
+from collections.abc import Mapping
+
+from Util.BibFileUtil import BibFileUtil
+
+
+class BibCorpus:
+    """
+    Almacenamiento columnar y compacto de un conjunto de entradas BibTeX.
+
+    En lugar de un diccionario `campos` y el texto completo por entrada, guarda una columna por campo:
+    - year: array de enteros de 32 bits (-1 si no hay un año numérico).
+    - entry_type: códigos de categoría en un array de 16 bits.
+    - journal, publisher, author y source: identificadores de un diccionario de valores únicos.
+    - el resto de campos: una lista por campo con None donde la entrada no lo tiene.
+    Los nombres de campo se internan y el texto original se puede leer bajo demanda desde el
+    archivo usando el desplazamiento en bytes de cada entrada.
+
+    Iterar el corpus devuelve vistas `EntradaCorpus` con la misma interfaz que EntradaBib
+    (`.clave`, `.entry_type`, `.campos`, `.entrada_completa`), de modo que EstadisticasDescriptivas
+    funciona sin cambios sobre él.
+    """
+
+    CAMPOS_CODIFICADOS = ("journal", "publisher", "author", "source")
+
+    def __init__(self, ruta_archivo=None, texto_en_memoria=False):
+        self.ruta_archivo = ruta_archivo
+        self.texto_en_memoria = texto_en_memoria
+
+        self.claves = []
+        self.tipos = array('H')
+        self.valores_tipo = []
+        self._codigos_tipo = {}
+
+        self.anios = array('i')
+        self._anios_crudos = {}  # fila -> valor original cuando no coincide con el entero guardado
+
+        self.codigos = {campo: array('i') for campo in self.CAMPOS_CODIFICADOS}
+        self.diccionarios = {campo: [] for campo in self.CAMPOS_CODIFICADOS}
+        self._indices_diccionario = {campo: {} for campo in self.CAMPOS_CODIFICADOS}
+
+        self.otros = {}  # campo -> lista de valores (None si la entrada no tiene el campo)
+
+        self.inicios = array('q')
+        self.fines = array('q')
+        self.textos = [] if texto_en_memoria else None
+
+        # Columnas de citaciones y país del primer autor (Util.Enriquecimiento), calculadas una vez
+        self.enriquecimiento = None
+
+        # True cuando las columnas son vistas de solo lectura sobre un archivo mapeado en memoria
+        self.solo_lectura = False
+
+    @classmethod
+    def desde_archivo(cls, ruta_archivo, texto_en_memoria=False):
+        """
+        Construye el corpus leyendo el archivo .bib en streaming.
+
+        Args:
+            ruta_archivo: Ruta del archivo .bib.
+            texto_en_memoria: Si es False, `entrada_completa` se lee del archivo al pedirse.
+        """
+        corpus = cls(ruta_archivo, texto_en_memoria)
+        for entrada in BibFileUtil.iter_entradas(ruta_archivo):
+            corpus.agregar(entrada)
+        return corpus
+
+    @classmethod
+    def desde_entradas(cls, entradas):
+        """Construye el corpus a partir de una lista de EntradaBib (conserva el texto en memoria)."""
+        corpus = cls(texto_en_memoria=True)
+        for entrada in entradas:
+            corpus.agregar(entrada)
+        return corpus
+
+    def _materializar(self):
+        """Copia las columnas de solo lectura (mmap) a estructuras modificables antes de escribir."""
+        if not self.solo_lectura:
+            return
+        self.claves = list(self.claves)
+        self.tipos = array('H', self.tipos)
+        self.anios = array('i', self.anios)
+        self.inicios = array('q', self.inicios)
+        self.fines = array('q', self.fines)
+        for campo in self.CAMPOS_CODIFICADOS:
+            self.codigos[campo] = array('i', self.codigos[campo])
+            self.diccionarios[campo] = list(self.diccionarios[campo])
+            self._indices_diccionario[campo] = {valor: i for i, valor in enumerate(self.diccionarios[campo])}
+        self.otros = {campo: list(columna) for campo, columna in self.otros.items()}
+        if self.textos is not None:
+            self.textos = list(self.textos)
+        self.solo_lectura = False
+
+    def agregar(self, entrada):
+        """Agrega una EntradaBib al final del corpus y devuelve su número de fila."""
+        self._materializar()
+        fila = len(self.claves)
+        self.claves.append(entrada.clave)
+
+        codigo_tipo = self._codigos_tipo.get(entrada.entry_type)
+        if codigo_tipo is None:
+            codigo_tipo = self._codigos_tipo[entrada.entry_type] = len(self.valores_tipo)
+            self.valores_tipo.append(sys.intern(entrada.entry_type))
+        self.tipos.append(codigo_tipo)
+
+        self.anios.append(-1)
+        for campo in self.CAMPOS_CODIFICADOS:
+            self.codigos[campo].append(-1)
+        for campo, valor in entrada.campos.items():
+            self.asignar(fila, campo, valor)
+
+        inicio = getattr(entrada, "inicio", None)
+        fin = getattr(entrada, "fin", None)
+        self.inicios.append(-1 if inicio is None else inicio)
+        self.fines.append(-1 if fin is None else fin)
+        if self.textos is not None:
+            self.textos.append(entrada.entrada_completa)
+        return fila
+
+    def asignar(self, fila, campo, valor):
+        """Guarda el valor de un campo para la fila indicada en la columna correspondiente."""
+        self._materializar()
+        if campo == "year":
+            digitos = ''.join(filter(str.isdigit, valor)) if isinstance(valor, str) else str(valor)
+            anio = int(digitos) if digitos and int(digitos) < 2**31 else -1
+            self.anios[fila] = anio
+            if str(anio) != valor:
+                self._anios_crudos[fila] = valor
+            else:
+                self._anios_crudos.pop(fila, None)
+        elif campo in self.codigos:
+            indices = self._indices_diccionario[campo]
+            codigo = indices.get(valor)
+            if codigo is None:
+                codigo = indices[valor] = len(self.diccionarios[campo])
+                self.diccionarios[campo].append(valor)
+            self.codigos[campo][fila] = codigo
+        else:
+            columna = self.otros.get(campo)
+            if columna is None:
+                columna = self.otros[sys.intern(campo)] = []
+            if len(columna) <= fila:
+                columna.extend([None] * (fila + 1 - len(columna)))
+            columna[fila] = valor
+
+    def mover(self, fila, inicio, fin):
+        """Actualiza la posición en bytes de una fila (cuando se insertan entradas antes de ella)."""
+        self._materializar()
+        self.inicios[fila] = inicio
+        self.fines[fila] = fin
+
+    def valor(self, fila, campo, defecto=None):
+        """Devuelve el valor de un campo en una fila, o `defecto` si la entrada no lo tiene."""
+        codigos = self.codigos.get(campo)
+        if codigos is not None:
+            codigo = codigos[fila]
+            return self.diccionarios[campo][codigo] if codigo >= 0 else defecto
+        if campo == "year":
+            crudo = self._anios_crudos.get(fila)
+            if crudo is not None:
+                return crudo
+            anio = self.anios[fila]
+            return str(anio) if anio >= 0 else defecto
+        columna = self.otros.get(campo)
+        if columna is None or fila >= len(columna):
+            return defecto
+        valor = columna[fila]
+        return defecto if valor is None else valor
+
+    def campos_de(self, fila):
+        """Nombres de los campos presentes en una fila."""
+        campos = []
+        if self.anios[fila] >= 0 or fila in self._anios_crudos:
+            campos.append("year")
+        for campo, codigos in self.codigos.items():
+            if codigos[fila] >= 0:
+                campos.append(campo)
+        for campo, columna in self.otros.items():
+            if fila < len(columna) and columna[fila] is not None:
+                campos.append(campo)
+        return campos
+
+    def texto(self, fila):
+        """Texto BibTeX completo de la entrada, desde memoria o leído del archivo de origen."""
+        if self.textos is not None:
+            return self.textos[fila]
+        inicio, fin = self.inicios[fila], self.fines[fila]
+        if self.ruta_archivo is None or inicio < 0:
+            return None
+        with open(self.ruta_archivo, 'rb') as archivo:
+            archivo.seek(inicio)
+            texto = archivo.read(fin - inicio).decode('utf-8')
+        return texto.replace('\r\n', '\n') if '\r' in texto else texto
+
+    def __len__(self):
+        return len(self.claves)
+
+    def __getitem__(self, fila):
+        if isinstance(fila, slice):
+            return [EntradaCorpus(self, i) for i in range(*fila.indices(len(self)))]
+        if fila < 0:
+            fila += len(self)
+        if not 0 <= fila < len(self):
+            raise IndexError("índice fuera del corpus")
+        return EntradaCorpus(self, fila)
+
+    def __iter__(self):
+        for fila in range(len(self.claves)):
+            yield EntradaCorpus(self, fila)
+
+
+class ColumnaTexto:
+    """
+    Columna de cadenas de solo lectura sobre un búfer (normalmente un archivo mapeado en memoria).
+
+    Los valores se guardan concatenados en UTF-8 y se decodifican al accederlos. `desplazamientos`
+    tiene n + 1 posiciones de fin; una posición negativa (~fin) indica que el valor es None.
+    """
+
+    __slots__ = ("_desplazamientos", "_datos")
+
+    def __init__(self, desplazamientos, datos):
+        self._desplazamientos = desplazamientos
+        self._datos = datos
+
+    @staticmethod
+    def codificar(valores):
+        """Convierte una lista de cadenas (o None) en (array de desplazamientos, bytes concatenados)."""
+        desplazamientos = array('q', [0])
+        partes = []
+        fin = 0
+        for valor in valores:
+            if valor is None:
+                desplazamientos.append(~fin)
+            else:
+                datos = str(valor).encode('utf-8')
+                partes.append(datos)
+                fin += len(datos)
+                desplazamientos.append(fin)
+        return desplazamientos, b"".join(partes)
+
+    def __len__(self):
+        return len(self._desplazamientos) - 1
+
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice fuera de la columna")
+        fin = self._desplazamientos[indice + 1]
+        if fin < 0:
+            return None
+        inicio = self._desplazamientos[indice]
+        if inicio < 0:
+            inicio = ~inicio
+        return str(self._datos[inicio:fin], 'utf-8')
+
+    def __iter__(self):
+        for indice in range(len(self)):
+            yield self[indice]
+
+
+class CamposEntrada(Mapping):
+    """Vista de solo lectura (salvo asignación explícita) de los campos de una fila del corpus."""
+
+    __slots__ = ("_corpus", "_fila")
+
+    def __init__(self, corpus, fila):
+        self._corpus = corpus
+        self._fila = fila
+
+    def get(self, campo, defecto=None):
+        return self._corpus.valor(self._fila, campo, defecto)
+
+    def __getitem__(self, campo):
+        valor = self._corpus.valor(self._fila, campo)
+        if valor is None:
+            raise KeyError(campo)
+        return valor
+
+    def __setitem__(self, campo, valor):
+        self._corpus.asignar(self._fila, campo, valor)
+
+    def __contains__(self, campo):
+        return self._corpus.valor(self._fila, campo) is not None
+
+    def __iter__(self):
+        return iter(self._corpus.campos_de(self._fila))
+
+    def __len__(self):
+        return len(self._corpus.campos_de(self._fila))
+
+
+class EntradaCorpus:
+    """Vista de una fila del corpus con la interfaz de BibFileUtil.EntradaBib."""
+
+    __slots__ = ("_corpus", "_fila", "valor_orden")
+
+    def __init__(self, corpus, fila):
+        self._corpus = corpus
+        self._fila = fila
+
+    @property
+    def fila(self):
+        return self._fila
+
+    @property
+    def clave(self):
+        return self._corpus.claves[self._fila]
+
+    @property
+    def entry_type(self):
+        return self._corpus.valores_tipo[self._corpus.tipos[self._fila]]
+
+    @property
+    def campos(self):
+        return CamposEntrada(self._corpus, self._fila)
+
+    @property
+    def entrada_completa(self):
+        return self._corpus.texto(self._fila)
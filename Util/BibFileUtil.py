@@ -1,61 +1,270 @@
 import re
 
+from Util.Metricas import Metricas
+
 class BibFileUtil:
+    # Patrones precompilados una sola vez para todo el archivo
+    # Cabecera de la entrada BibTeX (p. ej., "@article{clave,")
+    patron_clave = re.compile(r"@(\w+)\s*\{\s*([^,]+?)\s*,")
+    patron_tipo = re.compile(r"@(\w+)")
+    # Nombre de un campo seguido de '=' (p. ej., "abstract = ")
+    patron_campo = re.compile(r"([\w\-:.]+)\s*=\s*")
+    patron_llaves = re.compile(r"[{}]")
+    patron_comillas = re.compile(r'[{}"]')
+    # Línea (en bytes) con la que empieza una entrada nueva
+    patron_inicio = re.compile(rb"\s*@\w+\s*\{")
+
+    # Entradas especiales de BibTeX que no son referencias
+    tipos_ignorados = {"comment", "preamble", "string"}
+
+    # Tamaño del buffer de lectura (1 MiB)
+    tamano_buffer = 1 << 20
+
     class EntradaBib:
-        def __init__(self, entrada_completa, clave, entry_type, campos):
+        def __init__(self, entrada_completa, clave, entry_type, campos, inicio=None, fin=None):
             self.entrada_completa = entrada_completa
             self.clave = clave
             self.entry_type = entry_type
             self.campos = campos  # Diccionario que contiene todos los campos de la entrada
+            # Posición en bytes de la entrada dentro del archivo de origen (si se conoce)
+            self.inicio = inicio
+            self.fin = fin
 
     @staticmethod
-    def leer_archivo_bib(nombre_archivo):
-        entradas = []
-        entrada_actual = []
-        clave_actual = ""
-        entry_type_actual = ""
+    def _cierre(texto, inicio, patron):
+        """
+        Busca el delimitador que cierra el valor que empieza en `inicio`, respetando llaves anidadas.
+
+        Returns:
+            Índice del delimitador de cierre, o len(texto) si el valor no está balanceado.
+        """
+        apertura = texto[inicio]
+        if apertura == '{':
+            # Caso común: un valor sin llaves internas
+            cierre = texto.find('}', inicio + 1)
+            if cierre != -1 and texto.find('{', inicio + 1, cierre) == -1:
+                return cierre
+
+        profundidad = 0
+        for marca in patron.finditer(texto, inicio + 1):
+            caracter = marca.group()
+            if caracter == '{':
+                profundidad += 1
+            elif caracter == '}':
+                if profundidad == 0 and apertura == '{':
+                    return marca.start()
+                profundidad -= 1
+            elif profundidad == 0:  # Comilla de cierre fuera de llaves
+                return marca.start()
+        return len(texto)
+
+    @staticmethod
+    def parsear_campos(cuerpo):
+        """
+        Extrae todos los pares campo = valor del cuerpo de una entrada.
+
+        Admite valores entre llaves (con llaves anidadas y varias líneas), entre comillas y sin
+        delimitadores (números o macros como `jan`). Los saltos de línea dentro de un valor se
+        reemplazan por un único espacio.
+
+        Returns:
+            Diccionario con los nombres de campo en minúscula como claves.
+        """
         campos = {}
+        posicion = 0
+        longitud = len(cuerpo)
+        while True:
+            coincidencia_campo = BibFileUtil.patron_campo.search(cuerpo, posicion)
+            if not coincidencia_campo:
+                break
+            campo = coincidencia_campo.group(1).lower()  # Convertimos a minúscula para uniformidad
+            inicio = coincidencia_campo.end()
+            if inicio >= longitud:
+                break
+
+            delimitador = cuerpo[inicio]
+            if delimitador == '{':
+                fin = BibFileUtil._cierre(cuerpo, inicio, BibFileUtil.patron_llaves)
+                valor = cuerpo[inicio + 1:fin]
+                posicion = fin + 1
+            elif delimitador == '"':
+                fin = BibFileUtil._cierre(cuerpo, inicio, BibFileUtil.patron_comillas)
+                valor = cuerpo[inicio + 1:fin]
+                posicion = fin + 1
+            else:
+                fin = cuerpo.find(',', inicio)
+                if fin == -1:
+                    fin = longitud
+                valor = cuerpo[inicio:fin].strip()
+                posicion = fin
+
+            if '\n' in valor:
+                valor = ' '.join(valor.split())
+            campos[campo] = valor
+        return campos
+
+    @staticmethod
+    def texto_bloque(lineas):
+        """Texto de una entrada a partir de sus líneas en bytes, con saltos de línea normalizados."""
+        texto = b"".join(lineas).decode('utf-8')
+        if '\r' in texto:
+            texto = texto.replace('\r\n', '\n')
+        return texto
+
+    @staticmethod
+    def parsear_cabecera(texto):
+        """
+        Lee la cabecera "@tipo{clave," de una entrada sin parsear sus campos.
+
+        Returns:
+            Tupla (entry_type, clave, posición donde empieza el cuerpo).
+        """
+        coincidencia_clave = BibFileUtil.patron_clave.search(texto)
+        if coincidencia_clave:
+            # ENTRYTYPE como article, inproceedings, etc.
+            return coincidencia_clave.group(1), coincidencia_clave.group(2), coincidencia_clave.end()
+        coincidencia_tipo = BibFileUtil.patron_tipo.search(texto)
+        entry_type = coincidencia_tipo.group(1) if coincidencia_tipo else ""
+        return entry_type, "", texto.find('{') + 1
+
+    @staticmethod
+    def _crear_entrada(lineas, inicio=None, fin=None, texto=None, cabecera=None):
+        """Construye una EntradaBib a partir de las líneas (en bytes) de una entrada completa."""
+        if texto is None:
+            texto = BibFileUtil.texto_bloque(lineas)
+        entry_type, clave, inicio_cuerpo = cabecera or BibFileUtil.parsear_cabecera(texto)
+        if entry_type.lower() in BibFileUtil.tipos_ignorados:
+            return None
+
+        # El cuerpo termina en la última llave de cierre de la entrada
+        fin_cuerpo = texto.rfind('}')
+        if fin_cuerpo < inicio_cuerpo:
+            fin_cuerpo = len(texto)
+        campos = BibFileUtil.parsear_campos(texto[inicio_cuerpo:fin_cuerpo])
+        return BibFileUtil.EntradaBib(texto, clave, entry_type, campos, inicio, fin)
+
+    @staticmethod
+    def iter_bloques(nombre_archivo, inicio=0, fin=None):
+        """
+        Recorre un archivo .bib en una sola pasada y genera el texto sin parsear de cada entrada.
+
+        Usa una máquina de estados sobre la profundidad de llaves, de modo que las entradas y los
+        valores pueden ocupar varias líneas (abstracts largos, llaves anidadas). Solo se mantiene en
+        memoria la entrada actual, por lo que el consumo es constante sin importar el tamaño del archivo.
+
+        Args:
+            nombre_archivo: Ruta del archivo .bib.
+            inicio: Desplazamiento en bytes desde el que se lee (debe ser el inicio de una línea).
+            fin: Desplazamiento en bytes en el que se deja de leer; las líneas que empiezan en `fin`
+                o después no se procesan. Con los rangos de `dividir_en_rangos` cada entrada
+                pertenece exactamente a un rango.
+
+        Yields:
+            Tuplas (lista de líneas en bytes, inicio, fin) en el orden del archivo, incluidas las
+            entradas especiales (@comment, @string, @preamble).
+        """
+        lineas = []
+        profundidad = 0
+        llave_abierta = False
         dentro_de_entrada = False
-        
-        # Abrimos el archivo y recorremos cada línea
-        with open(nombre_archivo, 'r', encoding='utf-8') as archivo:
-            for linea in archivo:
-                if linea.strip().startswith("@"):
-                    # Almacenar la entrada anterior si ya estamos dentro de una entrada
-                    if dentro_de_entrada:
-                        entradas.append(BibFileUtil.EntradaBib("".join(entrada_actual), clave_actual, entry_type_actual, campos))
-                        entrada_actual = []
-                        clave_actual = ""
-                        entry_type_actual = ""
-                        campos = {}
-                    
+        posicion = inicio  # Desplazamiento en bytes del inicio de la línea actual
+        inicio_entrada = inicio
+
+        with open(nombre_archivo, 'rb', buffering=BibFileUtil.tamano_buffer) as archivo:
+            archivo.seek(inicio)
+            for numero, linea in enumerate(archivo):
+                inicio_linea = posicion
+                if fin is not None and inicio_linea >= fin:
+                    break
+                posicion += len(linea)
+                if numero == 0 and inicio == 0 and linea.startswith(b'\xef\xbb\xbf'):
+                    linea = linea[3:]  # Omitir el BOM de UTF-8
+                    inicio_linea += 3
+
+                if dentro_de_entrada:
+                    if BibFileUtil.patron_inicio.match(linea):
+                        # Entrada anterior sin cerrar: se emite tal como está
+                        yield lineas, inicio_entrada, inicio_linea
+                        lineas = []
+                        profundidad = 0
+                        llave_abierta = False
+                    else:
+                        lineas.append(linea)
+                        profundidad += linea.count(b'{') - linea.count(b'}')
+                elif linea.lstrip()[:1] == b'@':
                     dentro_de_entrada = True
-                    entrada_actual.append(linea)
-                    
-                    # Extraer ENTRYTYPE y clave de entrada BibTeX (p. ej., "@article{clave,")
-                    patron_clave = re.compile(r"@(\w+)\{([^,]+),")
-                    coincidencia_clave = patron_clave.search(linea)
-                    if coincidencia_clave:
-                        entry_type_actual = coincidencia_clave.group(1)  # ENTRYTYPE como article, inproceedings, etc.
-                        clave_actual = coincidencia_clave.group(2)
-                elif dentro_de_entrada:
-                    entrada_actual.append(linea)
-                    
-                    # Buscar todos los pares clave-valor dentro de la entrada
-                    patron_campo = re.compile(r"(\w+)\s*=\s*\{(.+?)\}")
-                    coincidencia_campo = patron_campo.search(linea)
-                    if coincidencia_campo:
-                        campo = coincidencia_campo.group(1).lower()  # Convertimos a minúscula para uniformidad
-                        valor = coincidencia_campo.group(2)
-                        campos[campo] = valor
-                    
-                    # Final de la entrada (línea que contiene '}')
-                    if linea.strip() == "}":
-                        entradas.append(BibFileUtil.EntradaBib("".join(entrada_actual), clave_actual, entry_type_actual, campos))
-                        entrada_actual = []
-                        clave_actual = ""
-                        entry_type_actual = ""
-                        campos = {}
-                        dentro_de_entrada = False
-        
-        return entradas
+                else:
+                    continue  # Texto entre entradas
+
+                if not lineas:
+                    # Primera línea de la entrada (cabecera "@tipo{clave,")
+                    lineas.append(linea)
+                    profundidad = linea.count(b'{') - linea.count(b'}')
+                    inicio_entrada = inicio_linea
+                llave_abierta = llave_abierta or b'{' in linea
+
+                # Final de la entrada: se cerraron todas las llaves abiertas
+                if llave_abierta and profundidad <= 0:
+                    yield lineas, inicio_entrada, posicion
+                    lineas = []
+                    profundidad = 0
+                    llave_abierta = False
+                    dentro_de_entrada = False
+
+        if dentro_de_entrada:
+            yield lineas, inicio_entrada, posicion
+
+    @staticmethod
+    def iter_entradas(nombre_archivo, inicio=0, fin=None):
+        """
+        Recorre un archivo .bib en una sola pasada y genera las entradas una por una
+        (ver `iter_bloques`; las entradas especiales se omiten).
+
+        Yields:
+            Objetos EntradaBib en el orden del archivo.
+        """
+        crear_entrada = BibFileUtil._crear_entrada
+        for lineas, inicio_entrada, fin_entrada in BibFileUtil.iter_bloques(nombre_archivo, inicio, fin):
+            entrada = crear_entrada(lineas, inicio_entrada, fin_entrada)
+            if entrada is not None:
+                yield entrada
+
+    @staticmethod
+    def dividir_en_rangos(nombre_archivo, partes):
+        """
+        Divide el archivo en hasta `partes` rangos de bytes de tamaño parecido.
+
+        Cada límite se mueve hacia adelante hasta una línea que empieza una entrada ("@tipo{"),
+        de modo que ninguna entrada queda partida entre dos rangos.
+
+        Returns:
+            Lista de tuplas (inicio, fin) que cubren todo el archivo.
+        """
+        with open(nombre_archivo, 'rb') as archivo:
+            archivo.seek(0, 2)
+            tamano = archivo.tell()
+            limites = [0]
+            for parte in range(1, max(1, partes)):
+                objetivo = max(tamano * parte // partes, limites[-1])
+                archivo.seek(objetivo)
+                if objetivo > 0:
+                    archivo.readline()  # Descartar la línea incompleta
+                limite = tamano
+                while True:
+                    posicion = archivo.tell()
+                    linea = archivo.readline()
+                    if not linea:
+                        break
+                    if BibFileUtil.patron_inicio.match(linea):
+                        limite = posicion
+                        break
+                if limite > limites[-1]:
+                    limites.append(limite)
+            limites.append(tamano)
+        return [(inicio, fin) for inicio, fin in zip(limites, limites[1:]) if fin > inicio]
+
+    @staticmethod
+    @Metricas.cronometrado
+    def leer_archivo_bib(nombre_archivo):
+        """Lee todas las entradas de un archivo .bib en una lista."""
+        return list(BibFileUtil.iter_entradas(nombre_archivo))
@@ -0,0 +1,254 @@
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from array import array
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+from Util.BibCorpus import BibCorpus, ColumnaTexto
+from Util.Enriquecimiento import ColumnasEnriquecidas
+
+
+class CacheCorpus:
+    """
+    Caché binaria del corpus ya procesado, pensada para compartirse entre workers de gunicorn.
+
+    El archivo guarda las columnas de BibCorpus como secciones binarias alineadas que se abren con
+    mmap: los workers leen las mismas páginas del page cache en lugar de volver a parsear el .bib.
+    Junto al corpus se guardan artefactos precalculados (frecuencias, imágenes en base64, ...).
+
+    La caché se identifica por el tamaño, la fecha de modificación y el SHA-256 del archivo de
+    origen; si cambia, se reconstruye automáticamente.
+
+    Formato: preludio (mágico, versión, longitud de los metadatos, desplazamiento de la cabecera) +
+    metadatos serializados con pickle + secciones binarias + cabecera serializada con pickle al
+    final del archivo. Los metadatos van aparte para comprobar la vigencia sin leer los artefactos.
+    """
+
+    MAGICO = b"BIBCACHE"
+    VERSION = 3
+    ALINEACION = 8
+    _preludio = struct.Struct("<8sIIQ")
+
+    @staticmethod
+    def huella_archivo(ruta, tamano_bloque=1 << 20):
+        """SHA-256 del archivo, calculado por bloques."""
+        huella = hashlib.sha256()
+        with open(ruta, 'rb') as archivo:
+            for bloque in iter(lambda: archivo.read(tamano_bloque), b""):
+                huella.update(bloque)
+        return huella.hexdigest()
+
+    @staticmethod
+    def _firma(ruta):
+        estado = os.stat(ruta)
+        return {"tamano": estado.st_size, "mtime_ns": estado.st_mtime_ns}
+
+    @staticmethod
+    def metadatos_archivo(archivo_bib):
+        """Metadatos que identifican el contenido del archivo .bib (tamaño, fecha y SHA-256)."""
+        return dict(CacheCorpus._firma(archivo_bib), sha256=CacheCorpus.huella_archivo(archivo_bib),
+                    archivo=os.path.abspath(archivo_bib))
+
+    @staticmethod
+    def vigente(archivo_bib, ruta_cache):
+        """True si la caché corresponde a la versión actual del archivo .bib (por tamaño y fecha)."""
+        metadatos = CacheCorpus.leer_metadatos(ruta_cache)
+        firma = CacheCorpus._firma(archivo_bib)
+        return bool(metadatos) and all(metadatos.get(clave) == valor for clave, valor in firma.items())
+
+    @staticmethod
+    def guardar(ruta_cache, corpus, artefactos=None, metadatos=None):
+        """
+        Escribe el corpus y los artefactos en `ruta_cache` de forma atómica.
+
+        Args:
+            ruta_cache: Ruta del archivo de caché.
+            corpus: Objeto BibCorpus.
+            artefactos: Diccionario con resultados precalculados serializables con pickle.
+            metadatos: Diccionario con la identificación del archivo de origen.
+        """
+        directorio = os.path.dirname(os.path.abspath(ruta_cache))
+        os.makedirs(directorio, exist_ok=True)
+        secciones = {}
+
+        descriptor, ruta_temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, 'wb') as archivo:
+                archivo.write(b"\0" * CacheCorpus._preludio.size)
+                datos_metadatos = pickle.dumps(metadatos or {}, protocol=pickle.HIGHEST_PROTOCOL)
+                archivo.write(datos_metadatos)
+
+                def escribir(nombre, datos, codigo_tipo):
+                    relleno = -archivo.tell() % CacheCorpus.ALINEACION
+                    archivo.write(b"\0" * relleno)
+                    datos = datos.tobytes() if isinstance(datos, (array, memoryview)) else bytes(datos)
+                    secciones[nombre] = (archivo.tell(), len(datos), codigo_tipo)
+                    archivo.write(datos)
+
+                def escribir_texto(nombre, valores):
+                    desplazamientos, datos = ColumnaTexto.codificar(valores)
+                    escribir(nombre + "#desplazamientos", desplazamientos, 'q')
+                    escribir(nombre + "#datos", datos, 'B')
+
+                escribir("tipos", corpus.tipos, 'H')
+                escribir("anios", corpus.anios, 'i')
+                escribir("inicios", corpus.inicios, 'q')
+                escribir("fines", corpus.fines, 'q')
+                escribir_texto("claves", corpus.claves)
+                for campo in corpus.CAMPOS_CODIFICADOS:
+                    escribir("codigos:" + campo, corpus.codigos[campo], 'i')
+                    escribir_texto("diccionario:" + campo, corpus.diccionarios[campo])
+                for campo, columna in corpus.otros.items():
+                    escribir_texto("otros:" + campo, columna)
+                if corpus.textos is not None:
+                    escribir_texto("textos", corpus.textos)
+                if corpus.enriquecimiento is not None:
+                    escribir("enriquecimiento:citas", corpus.enriquecimiento.citas, 'i')
+                    escribir("enriquecimiento:paises", corpus.enriquecimiento.paises, 'i')
+                    escribir_texto("enriquecimiento:valores_pais", corpus.enriquecimiento.valores_pais)
+
+                cabecera = {
+                    "secciones": secciones,
+                    "ruta_archivo": corpus.ruta_archivo,
+                    "valores_tipo": list(corpus.valores_tipo),
+                    "codigos_tipo": dict(corpus._codigos_tipo),
+                    "anios_crudos": dict(corpus._anios_crudos),
+                    "otros": list(corpus.otros),
+                    "con_textos": corpus.textos is not None,
+                    "con_enriquecimiento": corpus.enriquecimiento is not None,
+                    "artefactos": artefactos or {},
+                }
+                desplazamiento_cabecera = archivo.tell()
+                pickle.dump(cabecera, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+                archivo.seek(0)
+                archivo.write(CacheCorpus._preludio.pack(
+                    CacheCorpus.MAGICO, CacheCorpus.VERSION, len(datos_metadatos), desplazamiento_cabecera))
+            os.chmod(ruta_temporal, 0o644)
+            os.replace(ruta_temporal, ruta_cache)
+        except BaseException:
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+            raise
+
+    @staticmethod
+    def _leer_preludio(archivo):
+        """(metadatos, desplazamiento de la cabecera) leyendo solo el inicio del archivo."""
+        preludio = archivo.read(CacheCorpus._preludio.size)
+        if len(preludio) < CacheCorpus._preludio.size:
+            raise ValueError("Archivo de caché incompleto")
+        magico, version, longitud_metadatos, desplazamiento = CacheCorpus._preludio.unpack(preludio)
+        if magico != CacheCorpus.MAGICO or version != CacheCorpus.VERSION:
+            raise ValueError("Formato de caché desconocido")
+        return pickle.loads(archivo.read(longitud_metadatos)), desplazamiento
+
+    @staticmethod
+    def _leer_cabecera(archivo):
+        metadatos, desplazamiento = CacheCorpus._leer_preludio(archivo)
+        archivo.seek(desplazamiento)
+        return dict(pickle.load(archivo), metadatos=metadatos)
+
+    @staticmethod
+    def leer_metadatos(ruta_cache):
+        """Metadatos de una caché existente, o None si no existe o no es válida."""
+        try:
+            with open(ruta_cache, 'rb') as archivo:
+                return CacheCorpus._leer_preludio(archivo)[0]
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            return None
+
+    @staticmethod
+    def cargar(ruta_cache):
+        """
+        Abre la caché con mmap y reconstruye el corpus sobre vistas de solo lectura.
+
+        Returns:
+            Tupla (corpus, artefactos, metadatos).
+        """
+        with open(ruta_cache, 'rb') as archivo:
+            cabecera = CacheCorpus._leer_cabecera(archivo)
+            mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        vista = memoryview(mapa)
+        secciones = cabecera["secciones"]
+
+        def seccion(nombre):
+            desplazamiento, longitud, codigo_tipo = secciones[nombre]
+            datos = vista[desplazamiento:desplazamiento + longitud]
+            return datos if codigo_tipo == 'B' else datos.cast(codigo_tipo)
+
+        def texto(nombre):
+            return ColumnaTexto(seccion(nombre + "#desplazamientos"), seccion(nombre + "#datos"))
+
+        corpus = BibCorpus(cabecera["ruta_archivo"], texto_en_memoria=cabecera["con_textos"])
+        corpus.tipos = seccion("tipos")
+        corpus.anios = seccion("anios")
+        corpus.inicios = seccion("inicios")
+        corpus.fines = seccion("fines")
+        corpus.claves = texto("claves")
+        for campo in corpus.CAMPOS_CODIFICADOS:
+            corpus.codigos[campo] = seccion("codigos:" + campo)
+            corpus.diccionarios[campo] = texto("diccionario:" + campo)
+        corpus.otros = {campo: texto("otros:" + campo) for campo in cabecera["otros"]}
+        if cabecera["con_textos"]:
+            corpus.textos = texto("textos")
+        if cabecera.get("con_enriquecimiento"):
+            corpus.enriquecimiento = ColumnasEnriquecidas(
+                seccion("enriquecimiento:citas"), seccion("enriquecimiento:paises"),
+                texto("enriquecimiento:valores_pais"))
+        corpus.valores_tipo = cabecera["valores_tipo"]
+        corpus._codigos_tipo = cabecera["codigos_tipo"]
+        corpus._anios_crudos = cabecera["anios_crudos"]
+        corpus.solo_lectura = True
+        corpus._mapa = mapa  # Mantener el mapa vivo mientras exista el corpus
+
+        return corpus, cabecera["artefactos"], cabecera["metadatos"]
+
+    @staticmethod
+    def cargar_o_construir(archivo_bib, ruta_cache, construir_artefactos=None):
+        """
+        Devuelve el corpus y sus artefactos desde la caché, reconstruyéndola si el .bib cambió.
+
+        Args:
+            archivo_bib: Ruta del archivo .bib de origen.
+            ruta_cache: Ruta del archivo de caché.
+            construir_artefactos: Función que recibe el corpus y devuelve un diccionario de
+                artefactos precalculados. Solo se llama al reconstruir la caché.
+
+        Returns:
+            Tupla (corpus, artefactos).
+        """
+        firma = CacheCorpus._firma(archivo_bib)
+        metadatos = CacheCorpus.leer_metadatos(ruta_cache)
+        if metadatos and all(metadatos.get(clave) == valor for clave, valor in firma.items()):
+            corpus, artefactos, _ = CacheCorpus.cargar(ruta_cache)
+            return corpus, artefactos
+
+        os.makedirs(os.path.dirname(os.path.abspath(ruta_cache)), exist_ok=True)
+        with open(ruta_cache + ".lock", 'w') as bloqueo:
+            # Solo un proceso reconstruye; los demás esperan y reutilizan su resultado
+            if fcntl is not None:
+                fcntl.flock(bloqueo, fcntl.LOCK_EX)
+
+            metadatos = CacheCorpus.leer_metadatos(ruta_cache)
+            if metadatos and all(metadatos.get(clave) == valor for clave, valor in firma.items()):
+                corpus, artefactos, _ = CacheCorpus.cargar(ruta_cache)
+                return corpus, artefactos
+
+            huella = CacheCorpus.huella_archivo(archivo_bib)
+            nuevos_metadatos = dict(firma, sha256=huella, archivo=os.path.abspath(archivo_bib))
+            if metadatos and metadatos.get("sha256") == huella:
+                # Solo cambió la fecha de modificación: se reutiliza el contenido
+                corpus, artefactos, _ = CacheCorpus.cargar(ruta_cache)
+            else:
+                corpus = BibCorpus.desde_archivo(archivo_bib)
+                artefactos = construir_artefactos(corpus) if construir_artefactos else {}
+            CacheCorpus.guardar(ruta_cache, corpus, artefactos, nuevos_metadatos)
+
+        corpus, artefactos, _ = CacheCorpus.cargar(ruta_cache)
+        return corpus, artefactos
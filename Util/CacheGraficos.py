@@ -0,0 +1,133 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class CacheGraficos:
+    """
+    Caché LRU acotada (por cantidad y por tamaño) de gráficos ya renderizados en base64.
+
+    La clave incluye el tipo de gráfico, los campos, el límite y la versión del corpus, de modo que
+    un corpus nuevo nunca reutiliza imágenes viejas. Opcionalmente persiste las imágenes en disco
+    para que sobrevivan a reinicios y se compartan entre workers. Es segura entre hilos.
+    """
+
+    def __init__(self, max_elementos=64, max_bytes=32 * 2**20, directorio=None):
+        self.max_elementos = max_elementos
+        self.max_bytes = max_bytes
+        self.directorio = directorio
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+        self._imagenes = OrderedDict()
+        self._bytes = 0
+        self._bloqueo = threading.Lock()
+        self.aciertos = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    @staticmethod
+    def clave(tipo, campos, limite=None, version=None):
+        """Clave de caché: (tipo de gráfico, campos, límite, versión del corpus)."""
+        return (tipo, tuple(campos), limite, version)
+
+    def _ruta(self, clave):
+        nombre = hashlib.sha1(repr(clave).encode('utf-8')).hexdigest()
+        return os.path.join(self.directorio, nombre + ".b64")
+
+    def _insertar(self, clave, imagen):
+        # Debe llamarse con el bloqueo tomado
+        if clave in self._imagenes:
+            self._bytes -= len(self._imagenes.pop(clave))
+        if len(imagen) > self.max_bytes:
+            return
+        self._imagenes[clave] = imagen
+        self._bytes += len(imagen)
+        while len(self._imagenes) > self.max_elementos or self._bytes > self.max_bytes:
+            _, desalojada = self._imagenes.popitem(last=False)
+            self._bytes -= len(desalojada)
+            self.desalojos += 1
+
+    def obtener(self, clave):
+        """Devuelve la imagen en base64 o None si no está en memoria ni en disco."""
+        with self._bloqueo:
+            imagen = self._imagenes.get(clave)
+            if imagen is not None:
+                self._imagenes.move_to_end(clave)
+                self.aciertos += 1
+                return imagen
+
+        if self.directorio:
+            try:
+                with open(self._ruta(clave), 'r', encoding='ascii') as archivo:
+                    imagen = archivo.read()
+            except OSError:
+                imagen = None
+            if imagen:
+                with self._bloqueo:
+                    self._insertar(clave, imagen)
+                    self.aciertos_disco += 1
+                return imagen
+
+        with self._bloqueo:
+            self.fallos += 1
+        return None
+
+    def guardar(self, clave, imagen):
+        """Guarda una imagen en base64 en memoria y, si está configurado, en disco."""
+        with self._bloqueo:
+            self._insertar(clave, imagen)
+        if self.directorio:
+            descriptor, ruta_temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+            with os.fdopen(descriptor, 'w', encoding='ascii') as archivo:
+                archivo.write(imagen)
+            os.replace(ruta_temporal, self._ruta(clave))
+
+    def obtener_o_generar(self, clave, generar):
+        """
+        Devuelve la imagen de la caché o la genera con `generar()` y la guarda.
+        Si `generar` lanza una excepción no se guarda nada y la excepción se propaga.
+        """
+        imagen = self.obtener(clave)
+        if imagen is None:
+            imagen = generar()
+            self.guardar(clave, imagen)
+        return imagen
+
+    def precalentar(self, tareas, ejecutor=None):
+        """
+        Genera de antemano los gráficos más comunes.
+
+        Args:
+            tareas: Iterable de tuplas (clave, generar). Los errores se ignoran.
+            ejecutor: Pool opcional (concurrent.futures) para generarlos en paralelo.
+        """
+        def precalentar_uno(clave, generar):
+            try:
+                self.obtener_o_generar(clave, generar)
+            except Exception as e:
+                print(f"Advertencia: no se pudo precalentar el gráfico {clave[:2]}: {e}")
+
+        if ejecutor is None:
+            for clave, generar in tareas:
+                precalentar_uno(clave, generar)
+        else:
+            for futuro in [ejecutor.submit(precalentar_uno, clave, generar) for clave, generar in tareas]:
+                futuro.result()
+
+    def estadisticas(self):
+        """Contadores de aciertos, fallos y ocupación de la caché."""
+        with self._bloqueo:
+            consultas = self.aciertos + self.aciertos_disco + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "aciertos_disco": self.aciertos_disco,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "elementos": len(self._imagenes),
+                "bytes": self._bytes,
+                "tasa_aciertos": (self.aciertos + self.aciertos_disco) / consultas if consultas else 0.0,
+            }
@@ -0,0 +1,349 @@
+"""
+Detección de casi duplicados con firmas MinHash y LSH por bandas.
+
+UnirBib descarta las copias exactas (mismo DOI o mismo título y año), pero la misma referencia
+exportada desde varias bases de datos suele llegar con el título escrito de otra forma, los
+autores en otro formato o sin DOI. Aquí cada entrada se describe por los shingles (secuencias de
+`tamano_shingle` palabras) de su título y abstract normalizados; la firma MinHash estima la
+similitud de Jaccard entre dos conjuntos de shingles y el LSH por bandas propone como candidatas
+solo las entradas que coinciden en alguna banda de la firma, en tiempo casi lineal en lugar de
+comparar todos los pares. Los pares candidatos con similitud estimada >= `umbral` se unen en
+grupos, de los más parecidos a los menos, y de cada grupo se conserva una entrada canónica.
+
+Un grupo nunca junta entradas con DOI distintos ni años separados por más de `TOLERANCIA_ANIOS`, y
+las entradas con menos de `MIN_SHINGLES` shingles distintos (títulos genéricos como "Editorial"
+sin abstract) no se agrupan: su firma coincidiría con la de cualquier otra con el mismo texto.
+
+Uso (desde la raíz del repositorio):
+    python -m Util.CasiDuplicados Util/BaseDatos.bib --umbral 0.8 --reporte duplicados.json
+    python -m Util.CasiDuplicados Util/BaseDatos.bib --colapsar Util/BaseDatosSinDuplicados.bib
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import zlib
+
+import numpy as np
+from Util.UnirBib import UnirBib
+
+
+class CasiDuplicados:
+    """
+    Args:
+        umbral: Similitud de Jaccard estimada mínima para considerar dos entradas duplicadas.
+        n_permutaciones: Largo de la firma MinHash (más largo = estimación más precisa y más lenta).
+        tamano_shingle: Palabras por shingle.
+        bandas: Número de bandas del LSH; por defecto se elige según el umbral (ver `parametros_lsh`).
+        semilla: Semilla de las funciones de hash, para que las firmas sean reproducibles.
+    """
+
+    CAMPOS = ("title", "abstract")
+    UMBRAL = 0.8
+    N_PERMUTACIONES = 128
+    TAMANO_SHINGLE = 3
+    TAMANO_BLOQUE = 2000
+    MIN_SHINGLES = 3
+    TOLERANCIA_ANIOS = 1
+    # Las cubetas más grandes (textos repetidos muchas veces) se comparan solo con su primer miembro
+    MAX_CUBETA = 100
+    _MULTIPLICADOR = np.uint64(0x9E3779B97F4A7C15)
+
+    def __init__(self, umbral=UMBRAL, n_permutaciones=N_PERMUTACIONES, tamano_shingle=TAMANO_SHINGLE,
+                 bandas=None, semilla=1):
+        if not 0 < umbral <= 1:
+            raise ValueError("El umbral debe estar entre 0 y 1")
+        self.umbral = umbral
+        self.n_permutaciones = n_permutaciones
+        self.tamano_shingle = tamano_shingle
+        if bandas is None:
+            bandas, _ = CasiDuplicados.parametros_lsh(umbral, n_permutaciones)
+        self.bandas = bandas
+        self.filas_banda = n_permutaciones // bandas
+        generador = np.random.default_rng(semilla)
+        # Hash multiplicativo (a·x + b) >> 32 con `a` impar: una función por permutación
+        self._a = generador.integers(0, 2**63, n_permutaciones, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = generador.integers(0, 2**63, n_permutaciones, dtype=np.uint64)
+        self._hash_palabras = {}
+
+    @staticmethod
+    def parametros_lsh(umbral, n_permutaciones, peso_falsos_positivos=0.1, peso_falsos_negativos=0.9):
+        """
+        (bandas, filas por banda) que minimizan el error ponderado para el umbral: la probabilidad
+        de que un par sea candidato es 1 - (1 - s^filas)^bandas; los falsos positivos son el área
+        bajo esa curva para s < umbral y los falsos negativos, el área sobre ella para s >= umbral.
+        Los candidatos se verifican con la firma completa, así que un falso positivo solo cuesta
+        tiempo y por defecto pesan más los falsos negativos.
+        """
+        mejor, menor_error = None, None
+        for bandas in range(1, n_permutaciones + 1):
+            for filas in range(1, n_permutaciones // bandas + 1):
+                bajo = np.linspace(0, umbral, 200)
+                sobre = np.linspace(umbral, 1, 200)
+                falsos_positivos = np.trapezoid(1 - (1 - bajo ** filas) ** bandas, bajo)
+                falsos_negativos = np.trapezoid((1 - sobre ** filas) ** bandas, sobre)
+                error = peso_falsos_positivos * falsos_positivos + peso_falsos_negativos * falsos_negativos
+                if menor_error is None or error < menor_error:
+                    mejor, menor_error = (bandas, filas), error
+        return mejor
+
+    @staticmethod
+    def texto(entrada):
+        """Título y abstract normalizados (minúsculas, sin acentos ni puntuación), como UnirBib."""
+        return UnirBib.normalizar_titulo(" ".join(entrada.campos.get(campo, "") for campo in CasiDuplicados.CAMPOS))
+
+    def shingles(self, entrada):
+        """Hashes de 64 bits de los shingles de la entrada (un solo shingle si tiene pocas palabras)."""
+        hashes = self._hash_palabras
+        palabras = []
+        for palabra in CasiDuplicados.texto(entrada).split():
+            valor = hashes.get(palabra)
+            if valor is None:
+                valor = hashes[palabra] = zlib.crc32(palabra.encode('utf-8'))
+            palabras.append(valor)
+        if not palabras:
+            return np.zeros(0, dtype=np.uint64)
+        palabras = np.array(palabras, dtype=np.uint64)
+        k = min(self.tamano_shingle, len(palabras))
+        shingles = palabras[:len(palabras) - k + 1].copy()
+        for desplazamiento in range(1, k):
+            shingles = shingles * self._MULTIPLICADOR + palabras[desplazamiento:len(palabras) - k + 1 + desplazamiento]
+        return shingles
+
+    def firmas(self, entradas):
+        """
+        Firmas MinHash de las entradas.
+
+        Returns:
+            Tupla (matriz uint32 de entradas x n_permutaciones, máscara de las entradas con al menos
+            MIN_SHINGLES shingles distintos, las únicas que se agrupan).
+        """
+        n = len(entradas)
+        firmas = np.zeros((n, self.n_permutaciones), dtype=np.uint32)
+        con_texto = np.zeros(n, dtype=bool)
+        for inicio in range(0, n, self.TAMANO_BLOQUE):
+            # Los shingles del bloque se concatenan: cada permutación es una sola operación vectorial
+            filas, partes = [], []
+            for fila, entrada in enumerate(entradas[inicio:inicio + self.TAMANO_BLOQUE], start=inicio):
+                shingles = self.shingles(entrada)
+                if len(shingles) >= self.MIN_SHINGLES and len(np.unique(shingles)) >= self.MIN_SHINGLES:
+                    filas.append(fila)
+                    partes.append(shingles)
+            if not partes:
+                continue
+            comienzos = np.cumsum([0] + [len(parte) for parte in partes[:-1]])
+            todos = np.concatenate(partes)
+            filas = np.array(filas, dtype=np.intp)
+            for permutacion in range(self.n_permutaciones):
+                valores = (self._a[permutacion] * todos + self._b[permutacion]) >> np.uint64(32)
+                firmas[filas, permutacion] = np.minimum.reduceat(valores, comienzos)
+            con_texto[filas] = True
+        return firmas, con_texto
+
+    def candidatos(self, firmas, con_texto):
+        """Pares (i, j) con i < j que coinciden en al menos una banda de la firma."""
+        filas = np.flatnonzero(con_texto)
+        pares = []
+        for banda in range(self.bandas):
+            columnas = firmas[filas, banda * self.filas_banda:(banda + 1) * self.filas_banda].astype(np.uint64)
+            claves = columnas[:, 0].copy()
+            for columna in range(1, columnas.shape[1]):
+                claves = claves * self._MULTIPLICADOR + columnas[:, columna]
+            orden = np.argsort(claves, kind="stable")
+            ordenadas = claves[orden]
+            cortes = np.flatnonzero(np.diff(ordenadas)) + 1
+            inicios = np.concatenate(([0], cortes))
+            fines = np.concatenate((cortes, [len(ordenadas)]))
+            for inicio, fin in zip(inicios[fines - inicios > 1].tolist(), fines[fines - inicios > 1].tolist()):
+                miembros = filas[orden[inicio:fin]]
+                if len(miembros) <= self.MAX_CUBETA:
+                    i, j = np.triu_indices(len(miembros), k=1)
+                    pares.append(np.stack([miembros[i], miembros[j]], axis=1))
+                else:
+                    pares.append(np.stack([np.full(len(miembros) - 1, miembros[0]), miembros[1:]], axis=1))
+        if not pares:
+            return np.zeros((0, 2), dtype=np.intp)
+        pares = np.sort(np.concatenate(pares), axis=1)
+        return np.unique(pares, axis=0)
+
+    @staticmethod
+    def similitud(firmas, pares):
+        """Similitud de Jaccard estimada de cada par: fracción de posiciones iguales de las firmas."""
+        if not len(pares):
+            return np.zeros(0)
+        return (firmas[pares[:, 0]] == firmas[pares[:, 1]]).mean(axis=1)
+
+    @staticmethod
+    def canonica(entradas, filas):
+        """
+        Entrada que representa al grupo: la que tiene DOI, luego la de más campos, luego la de
+        abstract más largo y, a igualdad, la primera del corpus.
+        """
+        def completitud(fila):
+            campos = entradas[fila].campos
+            return (bool(campos.get("doi")), len(campos), len(campos.get("abstract", "")), -fila)
+        return max(filas, key=completitud)
+
+    @staticmethod
+    def anio(entrada):
+        """Año de la entrada como entero, o None si no tiene."""
+        anio = ''.join(filter(str.isdigit, entrada.campos.get("year", "")))
+        return int(anio) if anio else None
+
+    def agrupar(self, entradas, firmas=None):
+        """
+        Grupos de casi duplicados del corpus (lista de EntradaBib o BibCorpus).
+
+        Los pares con similitud >= umbral se unen de mayor a menor similitud (union-find), salvo
+        que el grupo resultante tenga dos DOI distintos o años separados por más de
+        TOLERANCIA_ANIOS: así tampoco se encadenan por una entrada intermedia sin DOI.
+
+        Args:
+            firmas: Resultado de `firmas(entradas)` si ya se calculó.
+
+        Returns:
+            Tupla (grupos, firmas): cada grupo es la lista de filas de sus entradas, con la canónica
+            primero y el resto en orden; solo se incluyen grupos de dos o más entradas.
+        """
+        firmas, con_texto = self.firmas(entradas) if firmas is None else firmas
+        pares = self.candidatos(firmas, con_texto)
+        similitudes = self.similitud(firmas, pares)
+        seleccion = similitudes >= self.umbral
+        pares = pares[seleccion][np.argsort(-similitudes[seleccion], kind="stable")]
+
+        # Por cada raíz: DOI normalizado del grupo (o "") y años mínimo y máximo (o None)
+        padre, dois, anios = {}, {}, {}
+
+        def raiz(fila):
+            while padre[fila] != fila:
+                padre[fila] = padre[padre[fila]]
+                fila = padre[fila]
+            return fila
+
+        for i, j in pares.tolist():
+            for fila in (i, j):
+                if fila not in padre:
+                    entrada = entradas[fila]
+                    padre[fila] = fila
+                    dois[fila] = UnirBib.normalizar_doi(entrada.campos.get("doi", ""))
+                    anio = CasiDuplicados.anio(entrada)
+                    anios[fila] = (anio, anio)
+            raiz_i, raiz_j = raiz(i), raiz(j)
+            if raiz_i == raiz_j:
+                continue
+            doi_i, doi_j = dois[raiz_i], dois[raiz_j]
+            if doi_i and doi_j and doi_i != doi_j:
+                continue
+            extremos = [anio for anio in anios[raiz_i] + anios[raiz_j] if anio is not None]
+            if extremos and max(extremos) - min(extremos) > self.TOLERANCIA_ANIOS:
+                continue
+            padre[raiz_j] = raiz_i
+            dois[raiz_i] = doi_i or doi_j
+            anios[raiz_i] = (min(extremos), max(extremos)) if extremos else (None, None)
+
+        grupos = {}
+        for fila in sorted(padre):
+            grupos.setdefault(raiz(fila), []).append(fila)
+        resultado = []
+        for filas in grupos.values():
+            if len(filas) > 1:
+                canonica = CasiDuplicados.canonica(entradas, filas)
+                resultado.append([canonica] + [fila for fila in filas if fila != canonica])
+        resultado.sort(key=lambda grupo: min(grupo))
+        return resultado, firmas
+
+    @staticmethod
+    def colapsar(entradas, grupos):
+        """Entradas sin los duplicados: de cada grupo queda solo la canónica, en el orden original."""
+        descartadas = {fila for grupo in grupos for fila in grupo[1:]}
+        return [entrada for fila, entrada in enumerate(entradas) if fila not in descartadas]
+
+    @staticmethod
+    def reporte(entradas, grupos, firmas):
+        """Grupos con la similitud estimada de cada entrada con la canónica, listos para JSON."""
+        reporte = []
+        for grupo in grupos:
+            similitudes = CasiDuplicados.similitud(firmas, np.array([[grupo[0], fila] for fila in grupo]))
+            miembros = []
+            for fila, similitud in zip(grupo, similitudes.tolist()):
+                entrada = entradas[fila]
+                miembros.append({
+                    "fila": fila,
+                    "clave": entrada.clave,
+                    "titulo": entrada.campos.get("title"),
+                    "anio": entrada.campos.get("year"),
+                    "doi": entrada.campos.get("doi"),
+                    "source": entrada.campos.get("source"),
+                    "similitud": round(similitud, 3),
+                })
+            reporte.append({"tamano": len(grupo), "canonica": miembros[0]["clave"], "entradas": miembros})
+        return reporte
+
+    def colapsar_archivo(self, archivo_bib, archivo_salida):
+        """
+        Escribe `archivo_salida` con las entradas de `archivo_bib` sin los casi duplicados (puede
+        ser el mismo archivo: se reemplaza al terminar).
+
+        Returns:
+            Tupla (resumen con entradas leídas, escritas, grupos y descartadas; reporte de grupos).
+        """
+        from Util.BibCorpus import BibCorpus
+
+        corpus = BibCorpus.desde_archivo(archivo_bib)
+        grupos, firmas = self.agrupar(corpus)
+        conservadas = CasiDuplicados.colapsar(range(len(corpus)), grupos)
+        directorio = os.path.dirname(os.path.abspath(archivo_salida))
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".bib.tmp")
+        try:
+            with open(archivo_bib, 'rb') as origen, os.fdopen(descriptor, 'w', encoding='utf-8') as salida:
+                for fila in conservadas:
+                    salida.write(UnirBib._leer_texto(origen, corpus.inicios[fila], corpus.fines[fila]))
+                    salida.write(UnirBib.separador)
+            os.replace(temporal, archivo_salida)
+        except BaseException:
+            os.unlink(temporal)
+            raise
+        resumen = {"leidas": len(corpus), "escritas": len(conservadas), "grupos": len(grupos),
+                   "descartadas": len(corpus) - len(conservadas)}
+        return resumen, CasiDuplicados.reporte(corpus, grupos, firmas)
+
+
+if __name__ == "__main__":
+    from Util.BibCorpus import BibCorpus
+
+    parser = argparse.ArgumentParser(description="Detecta y colapsa casi duplicados (MinHash + LSH) de un .bib.")
+    parser.add_argument("corpus")
+    parser.add_argument("--umbral", type=float, default=CasiDuplicados.UMBRAL, help="Similitud de Jaccard mínima")
+    parser.add_argument("--permutaciones", type=int, default=CasiDuplicados.N_PERMUTACIONES)
+    parser.add_argument("--shingle", type=int, default=CasiDuplicados.TAMANO_SHINGLE, help="Palabras por shingle")
+    parser.add_argument("--bandas", type=int, default=None, help="Bandas del LSH (por defecto, según el umbral)")
+    parser.add_argument("--reporte", default=None, help="Archivo JSON con los grupos encontrados")
+    parser.add_argument("--colapsar", default=None, metavar="SALIDA",
+                        help="Escribe el .bib con una sola entrada canónica por grupo")
+    parser.add_argument("--mostrar", type=int, default=10, help="Grupos a mostrar en pantalla")
+    args = parser.parse_args()
+
+    detector = CasiDuplicados(args.umbral, args.permutaciones, args.shingle, args.bandas)
+    print(f"LSH: {detector.bandas} bandas de {detector.filas_banda} filas para el umbral {args.umbral}")
+    inicio = time.perf_counter()
+    if args.colapsar:
+        resumen, reporte = detector.colapsar_archivo(args.corpus, args.colapsar)
+        print(f"{resumen['descartadas']} casi duplicados en {resumen['grupos']} grupos: {resumen['escritas']} "
+              f"de {resumen['leidas']} entradas escritas en {args.colapsar}")
+    else:
+        corpus = BibCorpus.desde_archivo(args.corpus)
+        grupos, firmas = detector.agrupar(corpus)
+        reporte = CasiDuplicados.reporte(corpus, grupos, firmas)
+        print(f"{sum(len(grupo) - 1 for grupo in grupos)} casi duplicados en {len(grupos)} grupos "
+              f"de {len(corpus)} entradas")
+    print(f"{time.perf_counter() - inicio:.2f} s")
+
+    for grupo in reporte[:args.mostrar]:
+        print(f"\n{grupo['tamano']} entradas (canónica: {grupo['canonica']})")
+        for miembro in grupo["entradas"]:
+            print(f"  {miembro['similitud']:.2f}  {miembro['clave']:<30} {miembro['anio'] or '':<5} "
+                  f"{(miembro['titulo'] or '')[:70]}")
+    if args.reporte:
+        with open(args.reporte, 'w', encoding='utf-8') as archivo:
+            json.dump(reporte, archivo, ensure_ascii=False, indent=2)
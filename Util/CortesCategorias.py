@@ -0,0 +1,119 @@
+"""
+Frecuencias de categorías por corte (año, tipo de entrada), calculadas en una sola pasada.
+
+Los abstracts se recorren una sola vez y los totales por variable se acumulan por separado para
+cada combinación (año, ENTRYTYPE). Las frecuencias de cualquier filtro por años y tipos se
+obtienen sumando los cortes que coinciden, sin volver a leer los abstracts; los resultados se
+memorizan en una caché LRU.
+
+El objeto se guarda en los artefactos de CacheCorpus junto con la huella (SHA-256) de
+Categorias.csv con la que se calculó: si el archivo de categorías cambia, server.py lo recalcula.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from Util.EmparejadorCategorias import EmparejadorCategorias
+
+
+class CortesCategorias:
+
+    def __init__(self, variables, huella_categorias=None, max_en_cache=64):
+        self.variables = list(variables)        # (categoría, variable), como EmparejadorCategorias
+        self.huella_categorias = huella_categorias
+        self.cortes = {}                        # (año, tipo) -> lista de totales por variable
+        self._max_en_cache = max_en_cache
+        self._memo = OrderedDict()
+        self._bloqueo = threading.Lock()
+
+    def __getstate__(self):
+        # La caché y el bloqueo no se serializan (los artefactos se guardan con pickle)
+        estado = self.__dict__.copy()
+        del estado["_memo"], estado["_bloqueo"]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._memo = OrderedDict()
+        self._bloqueo = threading.Lock()
+
+    @staticmethod
+    def calcular_huella(nombre_archivo):
+        """SHA-256 del archivo de categorías."""
+        with open(nombre_archivo, 'rb') as archivo:
+            return hashlib.sha256(archivo.read()).hexdigest()
+
+    @staticmethod
+    def desde_entradas(entradas, emparejador, huella_categorias=None, campo="abstract"):
+        """Calcula los cortes de todas las entradas con un EmparejadorCategorias ya construido."""
+        cortes = CortesCategorias(emparejador.variables, huella_categorias)
+        cortes.agregar(entradas, emparejador, campo)
+        return cortes
+
+    @staticmethod
+    def corte(entrada):
+        """Clave del corte de una entrada: (año solo con dígitos, tipo de entrada); "" si falta."""
+        anio = ''.join(filter(str.isdigit, entrada.campos.get("year", "")))
+        return anio, entrada.entry_type or ""
+
+    def agregar(self, entradas, emparejador, campo="abstract"):
+        """Suma a los cortes las apariciones de las entradas (por ejemplo, las nuevas de una actualización)."""
+        if emparejador.variables != self.variables:
+            raise ValueError("El emparejador no corresponde a las categorías de los cortes")
+        cortes = self.cortes
+        for entrada in entradas:
+            valor = entrada.campos.get(campo, '').strip()
+            if not valor:
+                continue
+            clave = CortesCategorias.corte(entrada)
+            totales = cortes.get(clave)
+            if totales is None:
+                totales = cortes[clave] = [0] * len(self.variables)
+            emparejador.contar_texto(valor, totales)
+        with self._bloqueo:
+            self._memo.clear()
+
+    def sumar(self, clave, totales):
+        """Suma a un corte totales por variable ya contados (CuboOLAP los cuenta en su misma pasada)."""
+        actuales = self.cortes.get(clave)
+        if actuales is None:
+            self.cortes[clave] = list(totales)
+        else:
+            self.cortes[clave] = [a + b for a, b in zip(actuales, totales)]
+        with self._bloqueo:
+            self._memo.clear()
+
+    def anios(self):
+        return sorted({anio for anio, _ in self.cortes if anio})
+
+    def tipos(self):
+        return sorted({tipo for _, tipo in self.cortes if tipo})
+
+    def frecuencias(self, anios=None, tipos=None):
+        """
+        Frecuencias de las entradas de los años y tipos indicados (None = todos), con la misma forma
+        que `contar_frecuencia_categorias`. Si ninguna entrada con abstract coincide, ambos
+        diccionarios quedan vacíos.
+        """
+        anios = None if anios is None else frozenset(anios)
+        tipos = None if tipos is None else frozenset(tipos)
+        clave = (anios, tipos)
+        with self._bloqueo:
+            if clave in self._memo:
+                self._memo.move_to_end(clave)
+                return self._memo[clave]
+
+        totales = None
+        for (anio, tipo), totales_corte in self.cortes.items():
+            if (anios is None or anio in anios) and (tipos is None or tipo in tipos):
+                if totales is None:
+                    totales = list(totales_corte)
+                else:
+                    totales = [a + b for a, b in zip(totales, totales_corte)]
+        resultado = EmparejadorCategorias.agrupar(self.variables, totales)
+
+        with self._bloqueo:
+            self._memo[clave] = resultado
+            if len(self._memo) > self._max_en_cache:
+                self._memo.popitem(last=False)
+        return resultado
@@ -0,0 +1,282 @@
+"""
+Cubo OLAP precalculado del corpus: año x tipo de entrada x journal x publisher x source x categoría.
+
+Las entradas se agrupan en celdas, una por combinación de valores de las cinco dimensiones del
+corpus que aparece en los datos. Cada celda guarda el número de entradas y, por cada categoría de
+Categorias.csv, cuántas de esas entradas la mencionan en el abstract y cuántas veces aparecen sus
+variables. Las consultas (roll-up, slice y drill-down) suman celdas con numpy, sin volver a
+recorrer las entradas ni los abstracts:
+
+    cubo.consultar(["year"])                                  # roll-up: entradas por año
+    cubo.consultar(["categoria"], {"ENTRYTYPE": ["article"]})  # slice: categorías de los artículos
+    cubo.consultar(["year", "categoria"], {"ENTRYTYPE": ["article"]}, "apariciones")  # drill-down
+
+El cubo se guarda en los artefactos de CacheCorpus (con la huella de Categorias.csv, como
+CortesCategorias) y se actualiza con `agregar` cuando llegan entradas nuevas.
+
+Uso (desde la raíz del repositorio):
+    python -m Util.CuboOLAP Util/outputFile/referencias_ordenadas_GnomeSort_year.bib \\
+        --agrupar year categoria --filtro ENTRYTYPE=article
+"""
+import argparse
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from Util.CortesCategorias import CortesCategorias
+from Util.Metricas import Metricas
+
+
+class CuboOLAP:
+
+    DIMENSIONES = ("year", "ENTRYTYPE", "journal", "publisher", "source")
+    CATEGORIA = "categoria"
+    MEDIDAS = ("entradas", "apariciones")
+    TAMANO_BLOQUE = 10000
+
+    def __init__(self, variables, huella_categorias=None, max_en_cache=64):
+        self.variables = list(variables)        # (categoría, variable), como EmparejadorCategorias
+        self.categorias = list(dict.fromkeys(categoria for categoria, _ in self.variables))
+        self.huella_categorias = huella_categorias
+        self.valores = {dimension: [] for dimension in self.DIMENSIONES}  # Código -> valor, por dimensión
+        n_categorias = len(self.categorias)
+        self.celdas = np.zeros((0, len(self.DIMENSIONES)), dtype=np.int32)   # Códigos de cada celda
+        self.entradas = np.zeros(0, dtype=np.int64)                          # Entradas por celda
+        self.entradas_categoria = np.zeros((0, n_categorias), dtype=np.int64)  # Entradas que mencionan la categoría
+        self.apariciones = np.zeros((0, n_categorias), dtype=np.int64)         # Apariciones de sus variables
+        self._max_en_cache = max_en_cache
+        self.__setstate__({})
+
+    def __getstate__(self):
+        # Los índices valor -> código se reconstruyen al cargar; la caché y el bloqueo no se serializan
+        estado = self.__dict__.copy()
+        del estado["_codigos"], estado["_memo"], estado["_bloqueo"]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._codigos = {dimension: {valor: codigo for codigo, valor in enumerate(valores)}
+                         for dimension, valores in self.valores.items()}
+        self._memo = OrderedDict()
+        self._bloqueo = threading.Lock()
+
+    def __len__(self):
+        return len(self.entradas)
+
+    @property
+    def n_entradas(self):
+        return int(self.entradas.sum())
+
+    @staticmethod
+    def valor(entrada, dimension):
+        """Valor de una entrada en una dimensión: el año solo con dígitos, como CortesCategorias; "" si falta."""
+        if dimension == "year":
+            return ''.join(filter(str.isdigit, entrada.campos.get("year", "")))
+        if dimension == "ENTRYTYPE":
+            return entrada.entry_type or ""
+        return entrada.campos.get(dimension, "").strip()
+
+    @staticmethod
+    def desde_entradas(entradas, emparejador, huella_categorias=None, cortes=None, campo="abstract"):
+        """Calcula el cubo de todas las entradas con un EmparejadorCategorias ya construido."""
+        cubo = CuboOLAP(emparejador.variables, huella_categorias)
+        cubo.agregar(entradas, emparejador, cortes, campo)
+        return cubo
+
+    def _codigo(self, dimension, valor):
+        codigos = self._codigos[dimension]
+        codigo = codigos.get(valor)
+        if codigo is None:
+            codigo = codigos[valor] = len(self.valores[dimension])
+            self.valores[dimension].append(valor)
+        return codigo
+
+    def agregar(self, entradas, emparejador, cortes=None, campo="abstract"):
+        """
+        Suma al cubo las entradas (por ejemplo, las nuevas de una actualización).
+
+        Si se pasan `cortes` (CortesCategorias con las mismas variables) se actualizan con los mismos
+        conteos por variable, de modo que los abstracts se recorren una sola vez para ambos.
+        """
+        if emparejador.variables != self.variables:
+            raise ValueError("El emparejador no corresponde a las categorías del cubo")
+        if cortes is not None and cortes.variables != self.variables:
+            raise ValueError("Los cortes no corresponden a las categorías del cubo")
+
+        # Matriz variable -> categoría para pasar de conteos por variable a conteos por categoría
+        posicion_categoria = {categoria: posicion for posicion, categoria in enumerate(self.categorias)}
+        a_categorias = np.zeros((len(self.variables), len(self.categorias)), dtype=np.int64)
+        for posicion, (categoria, _) in enumerate(self.variables):
+            a_categorias[posicion, posicion_categoria[categoria]] = 1
+
+        partes = [(self.celdas, self.entradas, self.entradas_categoria, self.apariciones)]
+        for inicio in range(0, len(entradas), self.TAMANO_BLOQUE):
+            bloque = entradas[inicio:inicio + self.TAMANO_BLOQUE]
+            codigos = np.array([[self._codigo(dimension, CuboOLAP.valor(entrada, dimension))
+                                 for dimension in self.DIMENSIONES] for entrada in bloque],
+                               dtype=np.int32).reshape(-1, len(self.DIMENSIONES))
+            # Conteos por variable solo de las entradas con texto
+            con_texto, totales = [], []
+            for fila, entrada in enumerate(bloque):
+                texto = entrada.campos.get(campo, '').strip()
+                if texto:
+                    conteos = [0] * len(self.variables)
+                    emparejador.contar_texto(texto, conteos)
+                    con_texto.append(fila)
+                    totales.append(conteos)
+            con_texto = np.array(con_texto, dtype=np.intp)
+            totales = np.array(totales, dtype=np.int64).reshape(-1, len(self.variables))
+
+            apariciones = np.zeros((len(bloque), len(self.categorias)), dtype=np.int64)
+            apariciones[con_texto] = totales @ a_categorias
+            partes.append((codigos, np.ones(len(bloque), dtype=np.int64), (apariciones > 0).astype(np.int64),
+                           apariciones))
+
+            if cortes is not None and len(con_texto):
+                # Los cortes (año, tipo) son las dos primeras dimensiones del cubo
+                claves, inversa = np.unique(codigos[con_texto, :2], axis=0, return_inverse=True)
+                sumas = np.zeros((len(claves), len(self.variables)), dtype=np.int64)
+                np.add.at(sumas, inversa.ravel(), totales)
+                for (anio, tipo), suma in zip(claves.tolist(), sumas.tolist()):
+                    cortes.sumar((self.valores["year"][anio], self.valores["ENTRYTYPE"][tipo]), suma)
+
+        # Las celdas repetidas entre bloques (y con las que ya había) se consolidan en una sola
+        celdas = np.concatenate([parte[0] for parte in partes])
+        self.celdas, inversa = np.unique(celdas, axis=0, return_inverse=True)
+        inversa = inversa.ravel()
+        self.entradas = np.bincount(inversa, weights=np.concatenate([parte[1] for parte in partes]),
+                                    minlength=len(self.celdas)).astype(np.int64)
+        for atributo, posicion in (("entradas_categoria", 2), ("apariciones", 3)):
+            suma = np.zeros((len(self.celdas), len(self.categorias)), dtype=np.int64)
+            np.add.at(suma, inversa, np.concatenate([parte[posicion] for parte in partes]))
+            setattr(self, atributo, suma)
+        with self._bloqueo:
+            self._memo.clear()
+
+    def miembros(self, dimension):
+        """Valores de una dimensión presentes en el cubo, ordenados."""
+        if dimension == self.CATEGORIA:
+            return list(self.categorias)
+        presentes = np.unique(self.celdas[:, self.DIMENSIONES.index(dimension)])
+        return sorted(self.valores[dimension][codigo] for codigo in presentes.tolist())
+
+    @Metricas.cronometrado
+    def consultar(self, agrupar=(), filtros=None, medida="entradas", limite=None):
+        """
+        Suma una medida agrupando por las dimensiones indicadas, sobre las celdas que pasan los filtros.
+
+        Args:
+            agrupar: Dimensiones del resultado (DIMENSIONES y "categoria"); vacío = total general.
+            filtros: {dimensión: valores permitidos}; las dimensiones sin filtro se suman todas.
+            medida: "entradas" (entradas; con la categoría, entradas que la mencionan) o
+                "apariciones" (apariciones de las variables de las categorías en los abstracts).
+            limite: Número máximo de filas del resultado.
+
+        Returns:
+            Lista de diccionarios {dimensión: valor, ..., medida: total}, de mayor a menor total.
+
+        Raises:
+            ValueError: Si una dimensión o la medida no existen, o si se piden las entradas de
+                varias categorías sin agrupar por categoría (una entrada puede mencionar varias).
+        """
+        agrupar = tuple(agrupar)
+        filtros = {dimension: frozenset(valores) for dimension, valores in (filtros or {}).items()}
+        for dimension in agrupar + tuple(filtros):
+            if dimension not in self.DIMENSIONES and dimension != self.CATEGORIA:
+                raise ValueError(f"Dimensión desconocida: '{dimension}'")
+        if medida not in self.MEDIDAS:
+            raise ValueError(f"Medida desconocida: '{medida}'")
+        if len(set(agrupar)) != len(agrupar):
+            raise ValueError("Las dimensiones a agrupar no pueden repetirse")
+
+        clave = (agrupar, frozenset(filtros.items()), medida, limite)
+        with self._bloqueo:
+            if clave in self._memo:
+                self._memo.move_to_end(clave)
+                return self._memo[clave]
+
+        # Slice: celdas cuyos valores están entre los permitidos de cada dimensión filtrada
+        seleccion = np.ones(len(self.celdas), dtype=bool)
+        for dimension, valores in filtros.items():
+            if dimension == self.CATEGORIA:
+                continue
+            codigos = [self._codigos[dimension][valor] for valor in valores if valor in self._codigos[dimension]]
+            seleccion &= np.isin(self.celdas[:, self.DIMENSIONES.index(dimension)], codigos)
+
+        categorias = np.arange(len(self.categorias))
+        if self.CATEGORIA in filtros:
+            categorias = np.array([posicion for posicion, categoria in enumerate(self.categorias)
+                                   if categoria in filtros[self.CATEGORIA]], dtype=np.intp)
+        por_categoria = self.CATEGORIA in agrupar or self.CATEGORIA in filtros or medida == "apariciones"
+        if por_categoria:
+            matriz = self.apariciones if medida == "apariciones" else self.entradas_categoria
+            valores_medida = matriz[seleccion][:, categorias]
+            if self.CATEGORIA not in agrupar:
+                if medida == "entradas" and len(categorias) > 1:
+                    raise ValueError("Las entradas de varias categorías se consultan agrupando por categoría")
+                valores_medida = valores_medida.sum(axis=1, keepdims=True)
+        else:
+            valores_medida = self.entradas[seleccion][:, None]
+
+        # Roll-up: celdas agrupadas por las dimensiones pedidas (sin categoría)
+        dimensiones = [dimension for dimension in agrupar if dimension != self.CATEGORIA]
+        columnas = [self.DIMENSIONES.index(dimension) for dimension in dimensiones]
+        if columnas:
+            grupos, inversa = np.unique(self.celdas[seleccion][:, columnas], axis=0, return_inverse=True)
+        else:
+            grupos = np.zeros((1 if seleccion.any() else 0, 0), dtype=np.int32)
+            inversa = np.zeros(int(seleccion.sum()), dtype=np.intp)
+        sumas = np.zeros((len(grupos), valores_medida.shape[1]), dtype=np.int64)
+        np.add.at(sumas, inversa.ravel(), valores_medida)
+
+        filas = []
+        for grupo, totales in zip(grupos.tolist(), sumas.tolist()):
+            fila_base = {dimension: self.valores[dimension][codigo] for dimension, codigo in zip(dimensiones, grupo)}
+            if self.CATEGORIA in agrupar:
+                for posicion, total in zip(categorias.tolist(), totales):
+                    filas.append({**fila_base, self.CATEGORIA: self.categorias[posicion], medida: total})
+            else:
+                filas.append({**fila_base, medida: totales[0]})
+        # Orden estable de mayor a menor total y, a igualdad, por los valores de las dimensiones
+        filas.sort(key=lambda fila: (-fila[medida], [fila[dimension] for dimension in agrupar]))
+        resultado = filas[:max(limite, 0)] if limite is not None else filas
+
+        with self._bloqueo:
+            self._memo[clave] = resultado
+            if len(self._memo) > self._max_en_cache:
+                self._memo.popitem(last=False)
+        return resultado
+
+
+if __name__ == "__main__":
+    from app import EstadisticasDescriptivas
+    from Util.BibCorpus import BibCorpus
+    from Util.EmparejadorCategorias import EmparejadorCategorias
+
+    parser = argparse.ArgumentParser(description="Consultas sobre el cubo OLAP de un corpus .bib.")
+    parser.add_argument("corpus")
+    parser.add_argument("--categorias", default="Util/Categorias.csv")
+    parser.add_argument("--agrupar", nargs="*", default=[], help="Dimensiones del resultado")
+    parser.add_argument("--filtro", action="append", default=[], help="dimensión=valor (se puede repetir)")
+    parser.add_argument("--medida", choices=CuboOLAP.MEDIDAS, default="entradas")
+    parser.add_argument("--limite", type=int, default=20)
+    args = parser.parse_args()
+
+    filtros = {}
+    for filtro in args.filtro:
+        dimension, _, valor = filtro.partition("=")
+        filtros.setdefault(dimension, []).append(valor)
+
+    entradas = BibCorpus.desde_archivo(args.corpus)
+    emparejador = EmparejadorCategorias(EstadisticasDescriptivas.cargar_datos(args.categorias))
+    inicio = time.perf_counter()
+    cubo = CuboOLAP.desde_entradas(entradas, emparejador, CortesCategorias.calcular_huella(args.categorias))
+    construccion = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    filas = cubo.consultar(args.agrupar, filtros, args.medida, args.limite)
+    print(f"{cubo.n_entradas} entradas en {len(cubo)} celdas: construcción {construccion:.2f} s, "
+          f"consulta {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    for fila in filas:
+        print("  ".join(str(fila[columna]) for columna in args.agrupar + [args.medida]))
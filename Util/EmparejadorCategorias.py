@@ -0,0 +1,98 @@
+import re
+from collections import Counter, defaultdict
+
+
+class EmparejadorCategorias:
+    """
+    Índice precompilado token -> (categoría, variable) para contar categorías en una sola pasada.
+
+    Se construye una vez a partir del diccionario de `EstadisticasDescriptivas.cargar_datos` y
+    recorre cada texto una sola vez: en vez de llamar a `palabras.count(...)` por cada sinónimo,
+    cuenta las palabras del texto y busca cada palabra distinta en el índice.
+
+    Con `frases=False` (por defecto) reproduce exactamente el conteo original: cada parte de un
+    sinónimo se compara con palabras sueltas, por lo que las partes de varias palabras nunca
+    coinciden. Con `frases=True` las partes de varias palabras ("Logical thinking") se buscan
+    como secuencias de palabras consecutivas.
+    """
+
+    patron_palabra = re.compile(r'\b\w+\b')
+
+    def __init__(self, categorias, frases=False):
+        self.frases = frases
+        # Una posición por variable, en el mismo orden en que aparecen en Categorias.csv
+        self.variables = []
+        # palabra -> Counter {posición de la variable: veces que la palabra forma parte de ella}
+        self._indice = defaultdict(Counter)
+        # primera palabra -> [(tupla de palabras, posición de la variable)]
+        self._frases = defaultdict(list)
+
+        for categoria, variables in categorias.items():
+            for variable_lista in variables:
+                posicion = len(self.variables)
+                self.variables.append((categoria, " - ".join(variable_lista)))
+                for parte in variable_lista:
+                    parte = parte.lower()
+                    if not frases:
+                        self._indice[parte][posicion] += 1
+                        continue
+                    palabras = tuple(self.patron_palabra.findall(parte))
+                    if len(palabras) == 1:
+                        self._indice[palabras[0]][posicion] += 1
+                    elif palabras:
+                        self._frases[palabras[0]].append((palabras, posicion))
+
+        self._indice = dict(self._indice)
+        self._frases = dict(self._frases)
+
+    def contar_texto(self, texto, totales):
+        """Suma en `totales` (lista por variable) las apariciones de cada variable en `texto`."""
+        palabras = self.patron_palabra.findall(texto.lower())
+        indice = self._indice
+        for palabra, veces in Counter(palabras).items():
+            destinos = indice.get(palabra)
+            if destinos:
+                for posicion, multiplicidad in destinos.items():
+                    totales[posicion] += veces * multiplicidad
+
+        if self._frases:
+            frases = self._frases
+            for inicio, palabra in enumerate(palabras):
+                candidatas = frases.get(palabra)
+                if candidatas:
+                    for secuencia, posicion in candidatas:
+                        if tuple(palabras[inicio:inicio + len(secuencia)]) == secuencia:
+                            totales[posicion] += 1
+
+    def contar(self, entradas, campo="abstract"):
+        """
+        Calcula la frecuencia de cada categoría y cada variable en el campo indicado.
+
+        Returns:
+            Dos diccionarios con la misma forma que `contar_frecuencia_categorias`:
+            - frecuencias_categorias: Counter con la frecuencia total de cada categoría.
+            - frecuencias_variables: defaultdict(Counter) con la frecuencia de cada variable por categoría.
+        """
+        totales = [0] * len(self.variables)
+        hay_textos = False
+        for entrada in entradas:
+            valor = entrada.campos.get(campo, '').strip()
+            if valor:
+                hay_textos = True
+                self.contar_texto(valor, totales)
+        return self.resultados(totales if hay_textos else None)
+
+    def resultados(self, totales):
+        """Convierte la lista de totales por variable en (frecuencias_categorias, frecuencias_variables)."""
+        return EmparejadorCategorias.agrupar(self.variables, totales)
+
+    @staticmethod
+    def agrupar(variables, totales):
+        """Agrupa por categoría los totales de la lista de variables (categoría, variable); None = sin textos."""
+        frecuencias_categorias = Counter()
+        frecuencias_variables = defaultdict(Counter)
+        if totales is not None:
+            for (categoria, variable), total in zip(variables, totales):
+                frecuencias_variables[categoria][variable] += total
+                frecuencias_categorias[categoria] += total
+        return frecuencias_categorias, frecuencias_variables
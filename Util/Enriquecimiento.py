@@ -0,0 +1,160 @@
+"""
+Enriquecimiento del corpus en una sola pasada: citaciones y país del primer autor como columnas tipadas.
+
+Las citaciones se leen del campo `note` ("Cited by: N") con un patrón precompilado y el país del
+primer autor de `first_author_country` o de su afiliación (`affiliations`/`affiliation`), buscando
+sus partes en el gazetteer de Util/Paises.csv (nombres y variantes de cada país). No hay valores
+aleatorios: si un dato no está, la columna lo marca como desconocido (-1), de modo que los
+resultados se pueden reproducir y guardar en caché.
+
+Para un BibCorpus las columnas se guardan en `corpus.enriquecimiento` (y CacheCorpus las persiste);
+las filas agregadas después se enriquecen de forma incremental.
+"""
+import csv
+import heapq
+import os
+import re
+import unicodedata
+from array import array
+
+ARCHIVO_PAISES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Paises.csv")
+
+
+class ColumnasEnriquecidas:
+    """Citaciones (-1 = desconocidas) y códigos de país (-1 = desconocido) por fila."""
+
+    def __init__(self, citas=None, paises=None, valores_pais=None):
+        self.citas = array('i') if citas is None else citas
+        self.paises = array('i') if paises is None else paises
+        self.valores_pais = [] if valores_pais is None else valores_pais
+        self._codigos_pais = {valor: codigo for codigo, valor in enumerate(self.valores_pais)}
+
+    def __len__(self):
+        return len(self.citas)
+
+    def agregar(self, citas, pais):
+        if not isinstance(self.citas, array):
+            # Columnas de solo lectura (mmap de CacheCorpus): se copian antes de escribir
+            self.citas, self.paises = array('i', self.citas), array('i', self.paises)
+            self.valores_pais = list(self.valores_pais)
+        self.citas.append(-1 if citas is None else citas)
+        codigo = -1
+        if pais is not None:
+            codigo = self._codigos_pais.get(pais)
+            if codigo is None:
+                codigo = self._codigos_pais[pais] = len(self.valores_pais)
+                self.valores_pais.append(pais)
+        self.paises.append(codigo)
+
+    def citas_de(self, fila):
+        citas = self.citas[fila]
+        return citas if citas >= 0 else None
+
+    def pais_de(self, fila):
+        codigo = self.paises[fila]
+        return self.valores_pais[codigo] if codigo >= 0 else None
+
+
+class Enriquecimiento:
+
+    patron_citas = re.compile(r"Cited by: (\d+)")
+    patron_no_alfabetico = re.compile(r"[^a-z ]+")
+    patron_espacios = re.compile(r"\s+")
+
+    _gazetteer = None
+
+    @staticmethod
+    def normalizar(texto):
+        """Texto en minúsculas, sin acentos, dígitos ni signos de puntuación."""
+        texto = unicodedata.normalize('NFKD', texto.lower())
+        texto = ''.join(caracter for caracter in texto if not unicodedata.combining(caracter))
+        texto = Enriquecimiento.patron_no_alfabetico.sub(' ', texto.replace('.', '').replace("'", ''))
+        return Enriquecimiento.patron_espacios.sub(' ', texto).strip()
+
+    @staticmethod
+    def gazetteer(nombre_archivo=ARCHIVO_PAISES):
+        """Diccionario variante normalizada -> nombre del país, cargado una sola vez."""
+        if Enriquecimiento._gazetteer is None:
+            gazetteer = {}
+            with open(nombre_archivo, mode='r', encoding='utf-8') as archivo_csv:
+                for fila in csv.DictReader(archivo_csv):
+                    pais = fila['Pais'].strip()
+                    gazetteer[Enriquecimiento.normalizar(fila['Variante'])] = pais
+                    gazetteer[Enriquecimiento.normalizar(pais)] = pais
+            Enriquecimiento._gazetteer = gazetteer
+        return Enriquecimiento._gazetteer
+
+    @staticmethod
+    def citas(entrada):
+        """Citaciones de la nota "Cited by: N", o None si no aparecen."""
+        coincidencia = Enriquecimiento.patron_citas.search(entrada.campos.get("note", ""))
+        return int(coincidencia.group(1)) if coincidencia else None
+
+    @staticmethod
+    def pais_de_afiliacion(afiliacion, gazetteer=None):
+        """País de una afiliación: la última de sus partes (separadas por comas) que está en el gazetteer."""
+        gazetteer = gazetteer or Enriquecimiento.gazetteer()
+        for parte in reversed(afiliacion.split(",")):
+            pais = gazetteer.get(Enriquecimiento.normalizar(parte))
+            if pais:
+                return pais
+        return None
+
+    @staticmethod
+    def pais_primer_autor(entrada, gazetteer=None):
+        """País del primer autor: `first_author_country` o la primera afiliación, o None."""
+        gazetteer = gazetteer or Enriquecimiento.gazetteer()
+        pais = entrada.campos.get("first_author_country", "").strip()
+        if pais:
+            return gazetteer.get(Enriquecimiento.normalizar(pais), pais)
+        afiliaciones = entrada.campos.get("affiliations") or entrada.campos.get("affiliation") or ""
+        if not afiliaciones.strip():
+            return None
+        return Enriquecimiento.pais_de_afiliacion(afiliaciones.split(";", 1)[0], gazetteer)
+
+    @staticmethod
+    def enriquecer(entradas, columnas=None, desde=0):
+        """
+        Calcula las columnas de citaciones y país para las entradas a partir de la fila `desde`.
+
+        Returns:
+            Las ColumnasEnriquecidas (las recibidas, extendidas, o unas nuevas).
+        """
+        columnas = ColumnasEnriquecidas() if columnas is None else columnas
+        gazetteer = Enriquecimiento.gazetteer()
+        paises_por_afiliacion = {}  # Muchas entradas repiten la afiliación del primer autor
+        for fila in range(desde, len(entradas)):
+            entrada = entradas[fila]
+            campos = entrada.campos
+            clave = (campos.get("first_author_country"), campos.get("affiliations"), campos.get("affiliation"))
+            if clave in paises_por_afiliacion:
+                pais = paises_por_afiliacion[clave]
+            else:
+                pais = paises_por_afiliacion[clave] = Enriquecimiento.pais_primer_autor(entrada, gazetteer)
+            columnas.agregar(Enriquecimiento.citas(entrada), pais)
+        return columnas
+
+    @staticmethod
+    def de(entradas):
+        """
+        Columnas enriquecidas de las entradas. En un BibCorpus se calculan una vez, se guardan en
+        `corpus.enriquecimiento` y solo se extienden con las filas agregadas después.
+        """
+        columnas = getattr(entradas, "enriquecimiento", None)
+        if columnas is not None and len(columnas) == len(entradas):
+            return columnas
+        if columnas is not None and len(columnas) < len(entradas):
+            return Enriquecimiento.enriquecer(entradas, columnas, len(columnas))
+        columnas = Enriquecimiento.enriquecer(entradas)
+        if hasattr(entradas, "enriquecimiento"):
+            entradas.enriquecimiento = columnas
+        return columnas
+
+    @staticmethod
+    def mas_citados(filas, columnas, k):
+        """
+        Las k filas con más citaciones en O(n log k); las citaciones desconocidas cuentan como 0 y
+        los empates se resuelven por posición en el corpus.
+        """
+        citas = columnas.citas
+        return heapq.nsmallest(k, filas, key=lambda fila: (-max(citas[fila], 0), fila))
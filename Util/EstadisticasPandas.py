@@ -0,0 +1,216 @@
+"""
+Backend vectorizado (pandas/NumPy) para las estadísticas de uno y dos campos.
+
+Construye un DataFrame a partir del corpus con columnas categóricas para los campos de texto y
+limpia los años con operaciones de cadena vectorizadas. Las frecuencias se calculan con los
+códigos de las categorías (`np.bincount`) y los empates se ordenan por primera aparición, de modo
+que los resultados son idénticos a los de EstadisticasDescriptivas y FieldIndex, con la misma
+forma de diccionario que consume server.py.
+
+Se activa en server.py con la variable de entorno BACKEND_ESTADISTICAS=pandas.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from Util.Autores import Autores
+
+
+class EstadisticasPandas:
+
+    # Mismos campos del formulario que FieldIndex
+    CAMPOS_NUMERICOS = ("year",)
+    CAMPOS_PRIMER_DATO = ("author", "journal", "publisher")
+    CAMPOS_COMPLETOS = ("ENTRYTYPE", "source")
+
+    def __init__(self, entradas, n_top=15, max_pares_en_cache=128):
+        self.entradas = entradas
+        self.n_top = n_top
+        self._max_pares_en_cache = max_pares_en_cache
+        self._bloqueo = threading.Lock()  # El DataFrame recibe columnas nuevas bajo demanda
+        self._construir()
+
+    def _construir(self):
+        """Construye el DataFrame con los campos del formulario y el conjunto de campos disponibles."""
+        columnas = {campo: [] for campo in ("year",) + self.CAMPOS_PRIMER_DATO + ("source",)}
+        tipos = []
+        self.campos_disponibles = {'ENTRYTYPE'}
+        for entrada in self.entradas:
+            campos = entrada.campos
+            self.campos_disponibles.update(campos.keys())
+            tipos.append(entrada.entry_type)
+            for campo, valores in columnas.items():
+                valores.append(campos.get(campo, ''))
+
+        marco = pd.DataFrame({"ENTRYTYPE": self._categorica(pd.Series(tipos, dtype=object))})
+        for campo, valores in columnas.items():
+            crudos = pd.Series(valores, dtype=object).str.strip()
+            marco[campo] = self._categorica(crudos)
+            if campo in self.CAMPOS_PRIMER_DATO:
+                # Primer autor o primer dato antes de la coma (como calcular_estadisticas_max15)
+                marco[campo + "__primero"] = self._categorica(self._primer_dato(campo, crudos))
+
+        # Limpieza vectorizada del año: solo sus dígitos (como limpiar_anio)
+        digitos = marco["year"].astype(object).fillna('').str.replace(r"\D+", "", regex=True)
+        marco["year__numero"] = pd.to_numeric(digitos.where(digitos != ''), errors="coerce").astype("Int64")
+        self.marco = marco
+
+        self._estadisticas = {"year": self._resumen_numerico(marco["year__numero"])}
+        for campo in self.CAMPOS_PRIMER_DATO:
+            self._estadisticas[campo] = self._resumen_categorico(marco[campo + "__primero"], self.n_top)
+        for campo in self.CAMPOS_COMPLETOS:
+            resumen = self._resumen_categorico(marco[campo])
+            self._estadisticas[campo] = resumen if resumen['cantidad'] else None
+        self._pares = OrderedDict()
+
+    @staticmethod
+    def _primer_dato(campo, crudos):
+        """Autores.primer_dato de cada valor, calculado una sola vez por valor distinto."""
+        if campo != "author":
+            return crudos.str.split(",", n=1).str[0].str.strip()
+        return crudos.map({valor: Autores.primer_autor(valor) for valor in crudos.dropna().unique()})
+
+    @staticmethod
+    def _categorica(serie):
+        """Columna categórica (categorías en orden alfabético); las cadenas vacías quedan como NaN."""
+        return pd.Categorical(serie.where(serie != ''))
+
+    def _columna(self, campo, modo):
+        """Columna categórica de un campo; los campos que no están en el DataFrame se agregan."""
+        if campo == "ENTRYTYPE":
+            return self.marco["ENTRYTYPE"]
+        nombre = campo + "__primero" if modo == "primero" else campo
+        if nombre not in self.marco:
+            crudos = pd.Series([entrada.campos.get(campo, '') for entrada in self.entradas], dtype=object).str.strip()
+            if modo == "primero":
+                crudos = self._primer_dato(campo, crudos)
+            self.marco[nombre] = self._categorica(crudos)
+        return self.marco[nombre]
+
+    @staticmethod
+    def _conteos(codigos, n_categorias):
+        """
+        Conteos por código y orden de "most_common": por frecuencia descendente y, ante empate,
+        por primera aparición (como Counter.most_common).
+
+        Returns:
+            Tupla (conteos por código, códigos presentes ordenados, primera aparición por código).
+        """
+        posiciones = np.flatnonzero(codigos >= 0)
+        validos = codigos[posiciones]
+        conteos = np.bincount(validos, minlength=n_categorias)
+        primera = np.full(n_categorias, len(codigos), dtype=np.int64)
+        np.minimum.at(primera, validos, posiciones)
+        presentes = np.flatnonzero(conteos)
+        orden = presentes[np.lexsort((primera[presentes], -conteos[presentes]))]
+        return conteos, orden, primera
+
+    @staticmethod
+    def _en_posicion(conteos, posicion):
+        """Código en la posición `posicion` de los datos ordenados (las categorías ya están ordenadas)."""
+        return int(np.searchsorted(np.cumsum(conteos), posicion, side="right"))
+
+    @staticmethod
+    def _resumen_numerico(anios):
+        """Mismo resultado que calcular_estadisticas_anio."""
+        valores = anios.dropna().to_numpy(dtype=np.int64)
+        if not len(valores):
+            return None
+        unicos, codigos = np.unique(valores, return_inverse=True)
+        conteos, orden, _ = EstadisticasPandas._conteos(codigos.ravel(), len(unicos))
+
+        cantidad = len(valores)
+        mitad = cantidad // 2
+        if cantidad % 2:
+            mediana = int(unicos[EstadisticasPandas._en_posicion(conteos, mitad)])
+        else:
+            mediana = (int(unicos[EstadisticasPandas._en_posicion(conteos, mitad - 1)]) +
+                       int(unicos[EstadisticasPandas._en_posicion(conteos, mitad)])) / 2
+        minimo, maximo = int(unicos[0]), int(unicos[-1])
+        return {
+            'cantidad': cantidad,
+            'mediana': mediana,
+            'moda': int(unicos[orden[0]]),
+            'rango': maximo - minimo,
+            'minimo': minimo,
+            'maximo': maximo,
+            'frecuencias': dict(zip(unicos.tolist(), conteos.tolist())),
+        }
+
+    @staticmethod
+    def _resumen_categorico(columna, n_top=None):
+        """Mismo resultado que calcular_estadisticas (n_top=None) o calcular_estadisticas_max15."""
+        categorias = columna.cat.categories
+        conteos, orden, primera = EstadisticasPandas._conteos(columna.cat.codes.to_numpy(np.int64), len(categorias))
+        cantidad = int(conteos.sum())
+        if not cantidad:
+            return {'cantidad': 0, 'frecuencias': {}, 'moda': None, 'mediana': None}
+
+        if n_top:
+            seleccion = orden[:n_top]
+        else:
+            # dict(Counter) conserva el orden de primera aparición
+            seleccion = orden[np.argsort(primera[orden], kind="stable")]
+        return {
+            'cantidad': cantidad,
+            'frecuencias': {categorias[codigo]: int(conteos[codigo]) for codigo in seleccion},
+            'moda': (categorias[orden[0]], int(conteos[orden[0]])),
+            'mediana': categorias[EstadisticasPandas._en_posicion(conteos, cantidad // 2)],
+        }
+
+    def estadisticas(self, campo):
+        """Estadísticas de un campo del formulario principal (mismo resultado que FieldIndex)."""
+        return self._estadisticas.get(campo)
+
+    def estadisticas_dos_campos(self, campo1, campo2, limite=15):
+        """Mismo resultado que EstadisticasDescriptivas.calcular_estadisticas_dos_campos."""
+        with self._bloqueo:
+            return self._estadisticas_dos_campos(campo1, campo2, limite)
+
+    def _estadisticas_dos_campos(self, campo1, campo2, limite):
+        clave = (campo1, campo2, limite)
+        if clave in self._pares:
+            self._pares.move_to_end(clave)
+            return self._pares[clave]
+
+        # Como en calcular_estadisticas_dos_campos: solo el primer autor y el ENTRYTYPE del encabezado
+        columna1 = self._columna(campo1, "primero" if campo1 == "author" else "completo")
+        columna2 = self._columna(campo2, "primero" if campo2 == "author" else "completo")
+        categorias1, categorias2 = columna1.cat.categories, columna2.cat.categories
+        codigos1 = columna1.cat.codes.to_numpy(np.int64)
+        codigos2 = columna2.cat.codes.to_numpy(np.int64)
+        n2 = len(categorias2)
+
+        # Código del par monótono con el orden lexicográfico (las categorías están ordenadas)
+        pares = np.where((codigos1 >= 0) & (codigos2 >= 0), codigos1 * n2 + codigos2, -1)
+        unicos, inversos = np.unique(pares[pares >= 0], return_inverse=True)
+        stats = None
+        if len(unicos):
+            codigos_pares = np.full(len(pares), -1, dtype=np.int64)
+            codigos_pares[pares >= 0] = inversos.ravel()
+            conteos, orden, _ = self._conteos(codigos_pares, len(unicos))
+
+            def valor(codigo):
+                par = int(unicos[codigo])
+                return categorias1[par // n2], categorias2[par % n2]
+
+            mas_comunes = [(valor(codigo), int(conteos[codigo])) for codigo in orden[:limite]]
+            cantidad = int(conteos.sum())
+            stats = {
+                'cantidad': cantidad,
+                'frecuencias': {f"{k[0]} - {k[1]}": v for k, v in mas_comunes},
+                'moda': f"{mas_comunes[0][0][0]} - {mas_comunes[0][0][1]}",
+                'mediana': valor(self._en_posicion(conteos, cantidad // 2)),
+            }
+
+        self._pares[clave] = stats
+        if len(self._pares) > self._max_pares_en_cache:
+            self._pares.popitem(last=False)
+        return stats
+
+    def agregar_filas(self, desde):
+        """Vuelve a construir el DataFrame después de agregar entradas al corpus."""
+        with self._bloqueo:
+            self._construir()
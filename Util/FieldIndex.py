@@ -0,0 +1,244 @@
+import threading
+from array import array
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from itertools import accumulate
+
+from Util.AgregadorFrecuencias import AgregadorFrecuencias
+from Util.Autores import Autores
+
+
+class FrecuenciasCampo:
+    """
+    Frecuencias de los valores de un campo con los valores distintos ordenados y sus conteos
+    acumulados, para obtener la mediana y la moda sin recorrer los datos.
+    """
+
+    def __init__(self, contador):
+        self.contador = contador  # Counter en orden de primera aparición (define los desempates)
+        self.ordenados = sorted(contador)
+        self.acumulados = list(accumulate(contador[valor] for valor in self.ordenados))
+        self.cantidad = self.acumulados[-1] if self.acumulados else 0
+        self.moda = contador.most_common(1)[0] if contador else None
+
+    def valor_en_posicion(self, posicion):
+        """Valor en la posición `posicion` (desde 0) de los datos ordenados, en O(log k)."""
+        return self.ordenados[bisect_right(self.acumulados, posicion)]
+
+    def mediana_numerica(self):
+        """Mediana como la calcula statistics.median (promedio de los centrales si n es par)."""
+        mitad = self.cantidad // 2
+        if self.cantidad % 2:
+            return self.valor_en_posicion(mitad)
+        return (self.valor_en_posicion(mitad - 1) + self.valor_en_posicion(mitad)) / 2
+
+    def mediana_categorica(self):
+        """Valor central en orden alfabético, como sorted(valores)[n // 2]."""
+        return self.valor_en_posicion(self.cantidad // 2) if self.cantidad else None
+
+
+class FieldIndex:
+    """
+    Índice de frecuencias por campo que se construye una vez al cargar el corpus.
+
+    Guarda, para los campos del formulario principal, los conteos por valor, los valores distintos
+    ordenados con conteos acumulados (mediana y moda en O(log k)), la extracción del primer autor y
+    el conjunto de campos disponibles. Las consultas de uno y dos campos se responden desde el
+    índice con el mismo resultado que las funciones de EstadisticasDescriptivas, sin recorrer las
+    entradas. Los campos poco usados se indexan la primera vez que se piden.
+    """
+
+    # Campos del formulario y la función de EstadisticasDescriptivas que los calcula en server.py
+    CAMPOS_NUMERICOS = ("year",)                         # calcular_estadisticas_anio
+    CAMPOS_PRIMER_DATO = ("author", "journal", "publisher")  # calcular_estadisticas_max15
+    CAMPOS_COMPLETOS = ("ENTRYTYPE", "source")           # calcular_estadisticas
+
+    def __init__(self, entradas, n_top=15, max_pares_en_cache=128):
+        self.entradas = entradas
+        self.n_top = n_top
+        self.campos_disponibles = set()
+        # (campo, modo) -> (array de códigos por entrada, lista de valores); -1 = sin valor
+        self._columnas = {}
+        self._estadisticas = {}
+        self._pares = OrderedDict()
+        self._max_pares_en_cache = max_pares_en_cache
+        # Las consultas pueden llegar desde varios hilos; reentrante porque agregar_filas recalcula
+        # los resúmenes (que leen columnas) con el bloqueo tomado
+        self._bloqueo = threading.RLock()
+
+        # Una sola pasada sobre las entradas para todos los campos del formulario
+        columnas = [(campo, "primero") for campo in self.CAMPOS_PRIMER_DATO]
+        columnas += [(campo, "completo") for campo in self.CAMPOS_COMPLETOS]
+        columnas += [(campo, "par") for campo in self.CAMPOS_NUMERICOS + self.CAMPOS_PRIMER_DATO + self.CAMPOS_COMPLETOS]
+        self._anios = Counter()
+        self._construir_columnas(columnas, self._anios)
+        self.campos_disponibles.add('ENTRYTYPE')
+        self._calcular_estadisticas()
+
+    def _calcular_estadisticas(self):
+        """Resúmenes de los campos del formulario a partir de las columnas indexadas."""
+        self._estadisticas["year"] = self._resumen_numerico(FrecuenciasCampo(self._anios))
+        for campo in self.CAMPOS_PRIMER_DATO:
+            self._estadisticas[campo] = self._resumen_categorico(self.frecuencias(campo, "primero"), self.n_top)
+        for campo in self.CAMPOS_COMPLETOS:
+            frecuencias = self.frecuencias(campo, "completo")
+            self._estadisticas[campo] = self._resumen_categorico(frecuencias) if frecuencias.cantidad else None
+
+    @staticmethod
+    def _valor(entrada, campo, modo):
+        """
+        Valor de un campo según cómo lo extrae cada función de EstadisticasDescriptivas:
+        - "completo": el valor sin espacios en los extremos (ENTRYTYPE usa el tipo de entrada).
+        - "primero": el primer autor o, en los demás campos, el texto antes de la primera coma
+          (calcular_estadisticas_max15).
+        - "par": el valor usado en calcular_estadisticas_dos_campos (primer autor para 'author').
+        """
+        if campo == "ENTRYTYPE" and modo != "primero":
+            return entrada.entry_type
+        valor = entrada.campos.get(campo, '').strip()
+        if modo == "primero" or (modo == "par" and campo == "author" and valor):
+            valor = Autores.primer_dato(campo, valor)
+        return valor
+
+    def _construir_columnas(self, claves, anios=None, desde=0):
+        """
+        Construye en una sola pasada las columnas de códigos (campo, modo) indicadas. En la pasada
+        inicial también registra los campos disponibles y cuenta los años numéricos. Con `desde`
+        las columnas ya construidas se extienden con las entradas a partir de esa posición.
+        """
+        construidas = []
+        for clave in claves:
+            codigos, valores = self._columnas.get(clave) or (array('i'), [])
+            construidas.append((clave, codigos, valores, {valor: i for i, valor in enumerate(valores)}))
+        valor_de = self._valor
+        for entrada in (self.entradas[desde:] if desde else self.entradas):
+            if anios is not None:
+                campos = entrada.campos
+                self.campos_disponibles.update(campos.keys())
+                anio = ''.join(filter(str.isdigit, campos.get("year", '').strip()))
+                if anio:
+                    anios[int(anio)] += 1
+            for (campo, modo), codigos, valores, indices in construidas:
+                valor = valor_de(entrada, campo, modo)
+                if not valor:
+                    codigos.append(-1)
+                    continue
+                codigo = indices.get(valor)
+                if codigo is None:
+                    codigo = indices[valor] = len(valores)
+                    valores.append(valor)
+                codigos.append(codigo)
+        for clave, codigos, valores, _ in construidas:
+            self._columnas[clave] = (codigos, valores)
+
+    def _columna(self, campo, modo):
+        """Columna de códigos de un campo; los campos no indexados se indexan la primera vez."""
+        columna = self._columnas.get((campo, modo))
+        if columna is None:
+            with self._bloqueo:
+                # Otro hilo pudo construirla (o agregar_filas extender el corpus) mientras se esperaba
+                columna = self._columnas.get((campo, modo))
+                if columna is None:
+                    self._construir_columnas([(campo, modo)])
+                    columna = self._columnas[(campo, modo)]
+        return columna
+
+    def frecuencias(self, campo, modo="completo"):
+        """FrecuenciasCampo de un campo (Counter en orden de primera aparición)."""
+        codigos, valores = self._columna(campo, modo)
+        conteos = [0] * len(valores)
+        for codigo in codigos:
+            if codigo >= 0:
+                conteos[codigo] += 1
+        # Los códigos se asignan en orden de primera aparición, igual que las claves de un Counter
+        return FrecuenciasCampo(Counter(dict(zip(valores, conteos))))
+
+    def primer_autor(self, fila):
+        """Primer autor de la entrada en la posición `fila` (como en calcular_estadisticas_max15)."""
+        codigos, valores = self._columna("author", "primero")
+        codigo = codigos[fila]
+        return valores[codigo] if codigo >= 0 else None
+
+    @staticmethod
+    def _resumen_numerico(frecuencias):
+        if not frecuencias.cantidad:
+            return None
+        minimo, maximo = frecuencias.ordenados[0], frecuencias.ordenados[-1]
+        return {
+            'cantidad': frecuencias.cantidad,
+            'mediana': frecuencias.mediana_numerica(),
+            'moda': frecuencias.moda[0],
+            'rango': maximo - minimo,
+            'minimo': minimo,
+            'maximo': maximo,
+            'frecuencias': {valor: frecuencias.contador[valor] for valor in frecuencias.ordenados},
+        }
+
+    @staticmethod
+    def _resumen_categorico(frecuencias, n_top=None):
+        contador = frecuencias.contador
+        return {
+            'cantidad': frecuencias.cantidad,
+            'frecuencias': dict(contador.most_common(n_top)) if n_top else dict(contador),
+            'moda': frecuencias.moda,
+            'mediana': frecuencias.mediana_categorica(),
+        }
+
+    def estadisticas(self, campo):
+        """
+        Estadísticas de un campo del formulario principal, con el mismo resultado que la función de
+        EstadisticasDescriptivas que server.py usa para ese campo. None si el campo no se admite.
+        """
+        return self._estadisticas.get(campo)
+
+    def estadisticas_dos_campos(self, campo1, campo2, limite=15):
+        """Mismo resultado que EstadisticasDescriptivas.calcular_estadisticas_dos_campos, desde el índice."""
+        clave = (campo1, campo2, limite)
+        with self._bloqueo:
+            if clave in self._pares:
+                self._pares.move_to_end(clave)
+                return self._pares[clave]
+
+        codigos1, valores1 = self._columna(campo1, "par")
+        codigos2, valores2 = self._columna(campo2, "par")
+        pares = Counter(
+            (codigo1, codigo2) for codigo1, codigo2 in zip(codigos1, codigos2) if codigo1 >= 0 and codigo2 >= 0)
+
+        stats = None
+        if pares:
+            # Top-k con heap y mediana con selección lineal: los pares distintos no se ordenan
+            frecuencias = Counter(
+                {(valores1[codigo1], valores2[codigo2]): veces for (codigo1, codigo2), veces in pares.items()})
+            cantidad = sum(frecuencias.values())
+            mas_comunes = frecuencias.most_common(limite)
+            stats = {
+                'cantidad': cantidad,
+                'frecuencias': {f"{k[0]} - {k[1]}": v for k, v in mas_comunes},
+                'moda': f"{mas_comunes[0][0][0]} - {mas_comunes[0][0][1]}" if mas_comunes else None,
+                'mediana': AgregadorFrecuencias.valor_en_posicion(frecuencias, cantidad // 2),
+            }
+
+        with self._bloqueo:
+            self._pares[clave] = stats
+            if len(self._pares) > self._max_pares_en_cache:
+                self._pares.popitem(last=False)
+        return stats
+
+    def agregar_filas(self, desde):
+        """
+        Indexa las entradas agregadas al final del corpus a partir de la posición `desde`.
+
+        Las columnas se extienden y los conteos de años se actualizan solo con las entradas nuevas;
+        los valores que aparecen por primera vez quedan al final del orden de primera aparición.
+        """
+        with self._bloqueo:
+            # Una columna construida bajo demanda después de agregar las entradas ya las incluye:
+            # cada columna se extiende desde su propio largo
+            por_largo = {}
+            for clave, (codigos, _) in self._columnas.items():
+                por_largo.setdefault(len(codigos), []).append(clave)
+            self._construir_columnas(por_largo.pop(desde, []), self._anios, desde)
+            for largo, claves in por_largo.items():
+                self._construir_columnas(claves, desde=largo)
+            self._calcular_estadisticas()
+            self._pares.clear()
@@ -0,0 +1,248 @@
+"""
+Filtros componibles sobre el recorrido en streaming de un archivo .bib.
+
+Cada predicado se evalúa por etapas, de la más barata a la más cara:
+1. `por_cabecera(entry_type, clave)`: solo con la cabecera "@tipo{clave,".
+2. `por_texto(texto)`: sobre el texto sin parsear (p. ej. si aparece el nombre de un campo).
+3. `por_entrada(entrada)`: sobre la EntradaBib con todos sus campos parseados.
+
+Las dos primeras etapas devuelven True (cumple con seguridad), False (no cumple con seguridad) o
+None (no se puede decidir todavía). Una entrada solo se parsea si las etapas baratas no deciden, y
+las que cumplen se escriben tal como están en el archivo de origen.
+
+Ejemplo:
+    filtro = FiltroBib(Y(TieneCampo("doi"), RangoAnios(2015, 2020), TiposEntrada("article")))
+    filtro.escribir("Util/BaseDatos.bib", "Util/filtrado.bib")
+"""
+import re
+from abc import ABC, abstractmethod
+
+from Util.BibFileUtil import BibFileUtil
+
+
+class Predicado(ABC):
+    """Predicado base: sin información en las etapas baratas; las subclases definen `por_entrada`."""
+
+    def por_cabecera(self, entry_type, clave):
+        return None
+
+    def por_texto(self, texto):
+        return None
+
+    @abstractmethod
+    def por_entrada(self, entrada):
+        """True si la entrada (EntradaBib) cumple el predicado."""
+
+    def __and__(self, otro):
+        return Y(self, otro)
+
+    def __or__(self, otro):
+        return O(self, otro)
+
+    def __invert__(self):
+        return No(self)
+
+
+class Y(Predicado):
+    """Cumple si cumplen todos los predicados."""
+
+    def __init__(self, *predicados):
+        self.predicados = predicados
+
+    @staticmethod
+    def _combinar(resultados):
+        decidido = True
+        for resultado in resultados:
+            if resultado is False:
+                return False
+            if resultado is None:
+                decidido = None
+        return decidido
+
+    def por_cabecera(self, entry_type, clave):
+        return self._combinar(p.por_cabecera(entry_type, clave) for p in self.predicados)
+
+    def por_texto(self, texto):
+        return self._combinar(p.por_texto(texto) for p in self.predicados)
+
+    def por_entrada(self, entrada):
+        return all(p.por_entrada(entrada) for p in self.predicados)
+
+
+class O(Predicado):
+    """Cumple si cumple alguno de los predicados."""
+
+    def __init__(self, *predicados):
+        self.predicados = predicados
+
+    @staticmethod
+    def _combinar(resultados):
+        decidido = False
+        for resultado in resultados:
+            if resultado is True:
+                return True
+            if resultado is None:
+                decidido = None
+        return decidido
+
+    def por_cabecera(self, entry_type, clave):
+        return self._combinar(p.por_cabecera(entry_type, clave) for p in self.predicados)
+
+    def por_texto(self, texto):
+        return self._combinar(p.por_texto(texto) for p in self.predicados)
+
+    def por_entrada(self, entrada):
+        return any(p.por_entrada(entrada) for p in self.predicados)
+
+
+class No(Predicado):
+    """Cumple si el predicado no cumple."""
+
+    def __init__(self, predicado):
+        self.predicado = predicado
+
+    def por_cabecera(self, entry_type, clave):
+        resultado = self.predicado.por_cabecera(entry_type, clave)
+        return None if resultado is None else not resultado
+
+    def por_texto(self, texto):
+        resultado = self.predicado.por_texto(texto)
+        return None if resultado is None else not resultado
+
+    def por_entrada(self, entrada):
+        return not self.predicado.por_entrada(entrada)
+
+
+class TieneCampo(Predicado):
+    """La entrada tiene el campo (como `'doi' in entry` en scripts/Filter.py)."""
+
+    def __init__(self, campo):
+        self.campo = campo.lower()
+        # Nombre del campo seguido de '=': si no aparece en el texto, la entrada no lo tiene
+        self._patron = re.compile(r"(?<![\w\-:.])" + re.escape(self.campo) + r"\s*=", re.IGNORECASE)
+
+    def por_texto(self, texto):
+        return None if self._patron.search(texto) else False
+
+    def por_entrada(self, entrada):
+        return self.campo in entrada.campos
+
+
+class TiposEntrada(Predicado):
+    """El tipo de entrada (ENTRYTYPE) es uno de los indicados, sin distinguir mayúsculas."""
+
+    def __init__(self, *tipos):
+        self.tipos = {tipo.lower() for tipo in tipos}
+
+    def por_cabecera(self, entry_type, clave):
+        return entry_type.lower() in self.tipos
+
+    def por_entrada(self, entrada):
+        return entrada.entry_type.lower() in self.tipos
+
+
+class RangoAnios(Predicado):
+    """El año (solo sus dígitos) está entre `desde` y `hasta`, ambos incluidos y opcionales."""
+
+    def __init__(self, desde=None, hasta=None):
+        self.desde = desde
+        self.hasta = hasta
+        self._campo = TieneCampo("year")
+
+    def por_texto(self, texto):
+        return self._campo.por_texto(texto)
+
+    def por_entrada(self, entrada):
+        digitos = ''.join(filter(str.isdigit, entrada.campos.get("year", '')))
+        if not digitos:
+            return False
+        anio = int(digitos)
+        return (self.desde is None or anio >= self.desde) and (self.hasta is None or anio <= self.hasta)
+
+
+class Journal(Predicado):
+    """El journal es uno de los indicados (sin distinguir mayúsculas ni espacios en los extremos)."""
+
+    def __init__(self, *journals):
+        self.journals = {journal.strip().lower() for journal in journals}
+        self._campo = TieneCampo("journal")
+
+    def por_texto(self, texto):
+        if self._campo.por_texto(texto) is False:
+            return False
+        texto = texto.lower()
+        # Los valores de varias líneas se unen con espacios al parsear; se busca la primera palabra
+        return None if any(journal.split()[0] in texto for journal in self.journals if journal) else False
+
+    def por_entrada(self, entrada):
+        return entrada.campos.get("journal", '').strip().lower() in self.journals
+
+
+class Regex(Predicado):
+    """Alguno de los campos (por defecto título y abstract) coincide con la expresión regular."""
+
+    def __init__(self, patron, campos=("title", "abstract"), flags=re.IGNORECASE):
+        self.patron = re.compile(patron, flags) if isinstance(patron, str) else patron
+        self.campos = campos
+        self._campos = O(*(TieneCampo(campo) for campo in campos))
+
+    def por_texto(self, texto):
+        return self._campos.por_texto(texto)
+
+    def por_entrada(self, entrada):
+        return any(self.patron.search(entrada.campos.get(campo, '')) for campo in self.campos)
+
+
+class FiltroBib:
+    """Aplica un predicado a un archivo .bib en streaming, parseando solo lo necesario."""
+
+    def __init__(self, predicado):
+        self.predicado = predicado
+        self.estadisticas = {}
+
+    def filtrar_textos(self, nombre_archivo):
+        """
+        Genera el texto de las entradas que cumplen el predicado, en el orden del archivo.
+        Al terminar, `estadisticas` indica cuántas se decidieron en cada etapa.
+        """
+        predicado = self.predicado
+        estadisticas = self.estadisticas = {
+            "leidas": 0, "cumplen": 0, "decididas_cabecera": 0, "decididas_texto": 0, "parseadas": 0}
+        for lineas, inicio, fin in BibFileUtil.iter_bloques(nombre_archivo):
+            texto = BibFileUtil.texto_bloque(lineas)
+            cabecera = BibFileUtil.parsear_cabecera(texto)
+            entry_type, clave, _ = cabecera
+            if entry_type.lower() in BibFileUtil.tipos_ignorados:
+                continue
+            estadisticas["leidas"] += 1
+
+            resultado = predicado.por_cabecera(entry_type, clave)
+            if resultado is not None:
+                estadisticas["decididas_cabecera"] += 1
+            else:
+                resultado = predicado.por_texto(texto)
+                if resultado is not None:
+                    estadisticas["decididas_texto"] += 1
+                else:
+                    estadisticas["parseadas"] += 1
+                    entrada = BibFileUtil._crear_entrada(lineas, inicio, fin, texto, cabecera)
+                    resultado = predicado.por_entrada(entrada)
+
+            if resultado:
+                estadisticas["cumplen"] += 1
+                yield texto
+
+    def filtrar(self, nombre_archivo):
+        """Genera las EntradaBib que cumplen el predicado."""
+        for texto in self.filtrar_textos(nombre_archivo):
+            yield BibFileUtil._crear_entrada(None, texto=texto)
+
+    def escribir(self, nombre_archivo, archivo_salida):
+        """Escribe en `archivo_salida`, a medida que se leen, las entradas que cumplen el predicado."""
+        with open(archivo_salida, 'w', encoding='utf-8') as salida:
+            for texto in self.filtrar_textos(nombre_archivo):
+                salida.write(texto)
+                if not texto.endswith('\n'):
+                    salida.write('\n')
+                salida.write('\n')
+        return self.estadisticas
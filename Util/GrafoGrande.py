@@ -0,0 +1,300 @@
+"""
+Redes grandes del corpus (journal–país y coautoría) con layout espectral disperso y caché.
+
+A diferencia de EstadisticasDescriptivas.generar_grafo_journals (10 journals, spring_layout de
+networkx en cada llamada), las aristas se construyen con todo el corpus en una sola pasada y las
+posiciones se calculan por componente conexa con los vectores propios de la matriz de adyacencia
+normalizada (scipy.sparse.linalg.eigsh), lo que escala a miles de nodos. Las posiciones se guardan
+en memoria y en disco con una huella de los nodos y las aristas, de modo que los renders siguientes
+(otro formato, otra resolución u otro proceso) no vuelven a calcular el layout.
+
+Uso (desde la raíz del repositorio):
+    python -m Util.GrafoGrande Util/outputFile/referencias_ordenadas_GnomeSort_year.bib --tipo coautores --salida coautores.png
+"""
+import argparse
+import base64
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import eigsh
+
+from Util.Enriquecimiento import Enriquecimiento
+from Util.RedCoautoria import RedCoautoria
+
+
+class GrafoDisperso:
+    """Grafo no dirigido con pesos: nombres y tipos de los nodos, y aristas en arreglos de NumPy."""
+
+    def __init__(self, nombres, tipos, tamanos, origen, destino, pesos):
+        self.nombres = nombres
+        self.tipos = tipos
+        self.tamanos = np.asarray(tamanos, dtype=np.float64)
+        self.origen = np.asarray(origen, dtype=np.int64)
+        self.destino = np.asarray(destino, dtype=np.int64)
+        self.pesos = np.asarray(pesos, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.nombres)
+
+    @property
+    def n_aristas(self):
+        return len(self.origen)
+
+    def matriz(self):
+        """Matriz de adyacencia simétrica (CSR) con los pesos de las aristas."""
+        n = len(self.nombres)
+        filas = np.concatenate([self.origen, self.destino])
+        columnas = np.concatenate([self.destino, self.origen])
+        return sparse.csr_matrix((np.concatenate([self.pesos, self.pesos]), (filas, columnas)), shape=(n, n))
+
+    def huella(self, tipo):
+        """Huella de los nodos y las aristas: identifica el layout en la caché."""
+        resumen = hashlib.sha1(tipo.encode('utf-8'))
+        resumen.update("\x00".join(self.nombres).encode('utf-8'))
+        for arreglo in (self.origen, self.destino, self.pesos):
+            resumen.update(np.ascontiguousarray(arreglo).tobytes())
+        return resumen.hexdigest()
+
+
+class GrafoGrande:
+
+    TIPOS = ("journal_pais", "coautores")
+    COLORES = {"journal": "skyblue", "country": "lightcoral", "author": "mediumseagreen"}
+
+    # Componentes de hasta este tamaño se ubican en un círculo o se resuelven con eigh densa
+    UMBRAL_CIRCULO = 8
+    UMBRAL_DENSO = 300
+    # Los artículos con más autores (consorcios) no generan aristas de coautoría: serían O(n²)
+    MAX_AUTORES_POR_ENTRADA = RedCoautoria.MAX_AUTORES_POR_ENTRADA
+
+    _layouts = OrderedDict()  # huella -> posiciones, compartido entre llamadas
+    _max_layouts = 8
+    _bloqueo = threading.Lock()
+
+    @staticmethod
+    def construir(entradas, tipo="journal_pais", min_peso=1):
+        """
+        Construye el grafo con todo el corpus en una sola pasada.
+
+        Args:
+            entradas: Entradas del corpus (lista de EntradaBib o BibCorpus).
+            tipo: "journal_pais" (journal o ISSN con el país del primer autor, de Util.Enriquecimiento)
+                o "coautores".
+            min_peso: Peso mínimo (número de artículos) para conservar una arista.
+
+        Returns:
+            Un GrafoDisperso; el tamaño de cada nodo es su número de artículos.
+        """
+        if tipo not in GrafoGrande.TIPOS:
+            raise ValueError(f"Tipo de grafo no soportado: '{tipo}'")
+
+        if tipo == "coautores":
+            # Matriz dispersa de artículos en común entre autores normalizados (Util.RedCoautoria)
+            red = RedCoautoria.construir(entradas, GrafoGrande.MAX_AUTORES_POR_ENTRADA)
+            aristas = sparse.triu(red.matriz, k=1).tocoo()
+            conservar = aristas.data >= min_peso
+            return GrafoDisperso(red.autores, ["author"] * len(red), red.articulos, aristas.row[conservar],
+                                 aristas.col[conservar], aristas.data[conservar])
+
+        indices = {}
+        tipos = []
+        articulos = Counter()
+        aristas = Counter()
+
+        def nodo(nombre, tipo_nodo):
+            clave = (tipo_nodo, nombre)
+            indice = indices.get(clave)
+            if indice is None:
+                indice = indices[clave] = len(tipos)
+                tipos.append(tipo_nodo)
+            return indice
+
+        columnas = Enriquecimiento.de(entradas)
+        for fila, entrada in enumerate(entradas):
+            journal = entrada.campos.get("journal") or entrada.campos.get("issn")
+            pais = columnas.pais_de(fila)
+            if not journal or not pais:
+                continue
+            a, b = nodo(journal, "journal"), nodo(pais, "country")
+            articulos[a] += 1
+            articulos[b] += 1
+            aristas[a, b] += 1
+
+        nombres = [nombre for _, nombre in indices]
+        pares = [(par, peso) for par, peso in aristas.items() if peso >= min_peso]
+        origen = [a for (a, _), _ in pares]
+        destino = [b for (_, b), _ in pares]
+        pesos = [peso for _, peso in pares]
+        tamanos = [articulos[indice] for indice in range(len(nombres))]
+        return GrafoDisperso(nombres, tipos, tamanos, origen, destino, pesos)
+
+    @staticmethod
+    def _layout_componente(normalizada, grados):
+        """
+        Posiciones 2D de una componente conexa: segundo y tercer vector propio del paseo aleatorio
+        (los de D^-1/2 A D^-1/2 con mayor valor propio, escalados por D^-1/2), en [-1, 1].
+        """
+        n = len(grados)
+        if n <= GrafoGrande.UMBRAL_CIRCULO:
+            # Las componentes pequeñas (casi siempre cliques de coautores) no tienen estructura
+            # espectral: se ubican en un círculo
+            angulos = 2 * np.pi * np.arange(n) / n
+            return np.column_stack([np.cos(angulos), np.sin(angulos)]) if n > 1 else np.zeros((1, 2))
+
+        if n <= GrafoGrande.UMBRAL_DENSO:
+            _, vectores = np.linalg.eigh(normalizada.toarray())
+            vectores = vectores[:, ::-1][:, :3]
+        else:
+            # Vector inicial fijo: el mismo grafo siempre da el mismo layout
+            v0 = np.random.default_rng(0).random(n)
+            valores, vectores = eigsh(normalizada, k=3, which="LA", v0=v0, tol=1e-6)
+            vectores = vectores[:, np.argsort(valores)[::-1]]
+
+        posiciones = vectores[:, 1:3] / np.sqrt(grados)[:, None]
+        # El signo de los vectores propios es arbitrario: se fija para que el layout sea estable
+        signos = np.sign(posiciones[np.argmax(np.abs(posiciones), axis=0), [0, 1]])
+        posiciones = posiciones * np.where(signos == 0, 1, signos)
+        posiciones -= posiciones.mean(axis=0)
+        escala = np.abs(posiciones).max()
+        return posiciones / escala if escala > 0 else posiciones
+
+    @staticmethod
+    def layout_espectral(grafo):
+        """
+        Layout de todo el grafo: cada componente conexa se ubica con su layout espectral y las
+        componentes se acomodan por filas, de mayor a menor, con un área proporcional a su tamaño.
+
+        Returns:
+            Arreglo (n, 2) con las posiciones de los nodos.
+        """
+        n = len(grafo)
+        posiciones = np.zeros((n, 2))
+        if not n:
+            return posiciones
+        matriz = grafo.matriz()
+        n_componentes, etiquetas = connected_components(matriz, directed=False)
+        grados = np.asarray(matriz.sum(axis=1)).ravel()
+        raices = np.sqrt(np.where(grados > 0, grados, 1))
+        normalizada = (sparse.diags(1 / raices) @ matriz @ sparse.diags(1 / raices)).tocsr()
+        miembros = np.argsort(etiquetas, kind="stable")
+        cortes = np.cumsum(np.bincount(etiquetas, minlength=n_componentes))[:-1]
+        componentes = sorted(np.split(miembros, cortes), key=len, reverse=True)
+
+        # Empaquetado por filas: el lado de cada componente crece con la raíz de su tamaño
+        ancho_total = np.sqrt(sum((2 * np.sqrt(len(nodos))) ** 2 for nodos in componentes))
+        x = y = alto_fila = 0.0
+        for nodos in componentes:
+            lado = 2 * np.sqrt(len(nodos))
+            if x > 0 and x + lado > ancho_total:
+                x, y = 0.0, y - alto_fila
+                alto_fila = 0.0
+            locales = GrafoGrande._layout_componente(
+                normalizada[nodos][:, nodos] if len(nodos) > GrafoGrande.UMBRAL_CIRCULO else None, grados[nodos])
+            posiciones[nodos] = locales * (lado * 0.45) + [x + lado / 2, y - lado / 2]
+            x += lado
+            alto_fila = max(alto_fila, lado)
+        return posiciones
+
+    @staticmethod
+    def posiciones(grafo, tipo, directorio_cache=None):
+        """
+        Posiciones del grafo desde la caché (memoria, luego disco) o calculadas y guardadas.
+
+        Returns:
+            Tupla (posiciones, segundos del layout, origen: "memoria", "disco" o "calculado").
+        """
+        huella = grafo.huella(tipo)
+        with GrafoGrande._bloqueo:
+            if huella in GrafoGrande._layouts:
+                GrafoGrande._layouts.move_to_end(huella)
+                posiciones, segundos = GrafoGrande._layouts[huella]
+                return posiciones, segundos, "memoria"
+
+        ruta = os.path.join(directorio_cache, f"layout-{huella}.npz") if directorio_cache else None
+        origen = "disco"
+        try:
+            with np.load(ruta) as datos:
+                posiciones, segundos = datos["posiciones"], float(datos["segundos"])
+        except (TypeError, OSError, KeyError, ValueError):
+            origen = "calculado"
+            inicio = time.perf_counter()
+            posiciones = GrafoGrande.layout_espectral(grafo)
+            segundos = time.perf_counter() - inicio
+            if ruta:
+                os.makedirs(directorio_cache, exist_ok=True)
+                descriptor, ruta_temporal = tempfile.mkstemp(dir=directorio_cache, suffix=".tmp")
+                with os.fdopen(descriptor, 'wb') as archivo:
+                    np.savez(archivo, posiciones=posiciones, segundos=segundos)
+                os.replace(ruta_temporal, ruta)
+
+        with GrafoGrande._bloqueo:
+            GrafoGrande._layouts[huella] = (posiciones, segundos)
+            if len(GrafoGrande._layouts) > GrafoGrande._max_layouts:
+                GrafoGrande._layouts.popitem(last=False)
+        return posiciones, segundos, origen
+
+    @staticmethod
+    def generar(entradas, tipo="journal_pais", formato="png", dpi=None, directorio_cache=None,
+                min_peso=1, n_etiquetas=20):
+        """
+        Construye el grafo, obtiene su layout y lo dibuja.
+
+        Returns:
+            Tupla (imagen en base64, resumen con nodos, aristas, origen del layout y tiempos en segundos).
+        """
+        from Util.Renderizado import Renderizado
+
+        inicio = time.perf_counter()
+        grafo = GrafoGrande.construir(entradas, tipo, min_peso)
+        segundos_construccion = time.perf_counter() - inicio
+        posiciones, segundos_layout, origen = GrafoGrande.posiciones(grafo, tipo, directorio_cache)
+
+        inicio = time.perf_counter()
+        etiquetas = {int(i): grafo.nombres[i] for i in np.argsort(-grafo.tamanos, kind="stable")[:n_etiquetas]}
+        titulo = (f"{len(grafo)} nodos, {grafo.n_aristas} aristas · layout espectral {segundos_layout:.2f} s"
+                  + (f" ({origen})" if origen != "calculado" else ""))
+        # Los nodos se achican a medida que crece el grafo para que no se tapen entre sí
+        escala = min(1.0, 30 / np.sqrt(max(len(grafo), 1)))
+        tamanos = escala * (10 + 90 * np.sqrt(grafo.tamanos / max(grafo.tamanos.max(initial=0), 1)))
+        imagen = Renderizado.grafo_grande(
+            posiciones, grafo.origen, grafo.destino, tamanos,
+            [GrafoGrande.COLORES[tipo_nodo] for tipo_nodo in grafo.tipos], etiquetas, formato, dpi, titulo)
+        resumen = {
+            "tipo": tipo,
+            "nodos": len(grafo),
+            "aristas": grafo.n_aristas,
+            "layout": origen,
+            "segundos_construccion": round(segundos_construccion, 3),
+            "segundos_layout": round(segundos_layout, 3),
+            "segundos_dibujo": round(time.perf_counter() - inicio, 3),
+        }
+        return imagen, resumen
+
+
+if __name__ == "__main__":
+    from Util.BibCorpus import BibCorpus
+
+    parser = argparse.ArgumentParser(description="Dibuja la red journal–país o de coautoría de un corpus .bib.")
+    parser.add_argument("corpus")
+    parser.add_argument("--tipo", choices=GrafoGrande.TIPOS, default="journal_pais")
+    parser.add_argument("--salida", default=None, help="Imagen de salida (por defecto, grafo_<tipo>.<formato>)")
+    parser.add_argument("--formato", choices=("png", "svg"), default="png")
+    parser.add_argument("--min-peso", type=int, default=1, help="Artículos mínimos por arista")
+    parser.add_argument("--cache", default=None, help="Directorio de la caché de layouts")
+    args = parser.parse_args()
+
+    imagen, resumen = GrafoGrande.generar(BibCorpus.desde_archivo(args.corpus), args.tipo, args.formato,
+                                          directorio_cache=args.cache, min_peso=args.min_peso)
+    salida = args.salida or f"grafo_{args.tipo}.{args.formato}"
+    with open(salida, 'wb') as archivo:
+        archivo.write(base64.b64decode(imagen))
+    print(f"{resumen['nodos']} nodos, {resumen['aristas']} aristas -> {salida}")
+    print(f"construcción {resumen['segundos_construccion']} s, layout {resumen['segundos_layout']} s "
+          f"({resumen['layout']}), dibujo {resumen['segundos_dibujo']} s")
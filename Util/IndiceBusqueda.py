@@ -0,0 +1,473 @@
+"""
+Índice invertido de texto completo sobre `title`, `abstract` y `keywords`, guardado en disco.
+
+Para cada término se guardan tres listas comprimidas con varint (7 bits por byte) y codificación
+delta: las filas que lo contienen, la frecuencia en cada fila y sus posiciones dentro de la fila.
+Los términos quedan ordenados en una columna de texto y se buscan por bisección. Las consultas
+se puntúan con BM25 y aceptan frases entre comillas (los términos deben aparecer consecutivos) y
+filtros por año y tipo de entrada. La decodificación y el puntaje se hacen con NumPy sobre el
+archivo abierto con mmap, de modo que los workers de gunicorn comparten las mismas páginas.
+
+Uso (desde la raíz del repositorio):
+    python -m Util.IndiceBusqueda construir Util/outputFile/referencias_ordenadas_GnomeSort_year.bib indice.idx
+    python -m Util.IndiceBusqueda buscar indice.idx '"computational thinking" students' --tipo article
+"""
+import argparse
+import mmap
+import os
+import pickle
+import re
+import struct
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+from Util.BibCorpus import ColumnaTexto
+from Util.Metricas import Metricas
+
+
+class Varint:
+    """Codificación varint vectorizada: 7 bits por byte, el bit alto indica que el número sigue."""
+
+    @staticmethod
+    def codificar(valores):
+        """
+        Returns:
+            Tupla (bytes codificados, array con los bytes que ocupa cada valor).
+        """
+        valores = np.asarray(valores, dtype=np.uint64)
+        longitudes = np.ones(len(valores), dtype=np.int64)
+        resto = valores >> np.uint64(7)
+        while resto.any():
+            longitudes += resto > 0
+            resto >>= np.uint64(7)
+        inicios = np.cumsum(longitudes) - longitudes
+        salida = np.empty(int(longitudes.sum()), dtype=np.uint8)
+        for k in range(int(longitudes.max()) if len(valores) else 0):
+            mascara = longitudes > k
+            byte = (valores[mascara] >> np.uint64(7 * k)) & np.uint64(0x7F)
+            continua = (longitudes[mascara] > k + 1).astype(np.uint64) << np.uint64(7)
+            salida[inicios[mascara] + k] = byte | continua
+        return salida.tobytes(), longitudes
+
+    @staticmethod
+    def decodificar(datos):
+        """Decodifica un búfer de varints en un array de enteros sin signo."""
+        octetos = np.frombuffer(datos, dtype=np.uint8)
+        if not len(octetos):
+            return np.zeros(0, dtype=np.int64)
+        fines = np.flatnonzero(octetos < 0x80)
+        inicios = np.empty_like(fines)
+        inicios[0] = 0
+        inicios[1:] = fines[:-1] + 1
+        if (fines == inicios).all():  # Caso común: todos los valores caben en un byte
+            return octetos.astype(np.int64)
+        grupo = np.repeat(np.arange(len(fines)), fines - inicios + 1)
+        desplazamientos = (np.arange(len(octetos)) - inicios[grupo]).astype(np.uint64) * np.uint64(7)
+        valores = (octetos & 0x7F).astype(np.uint64) << desplazamientos
+        return np.add.reduceat(valores, inicios).astype(np.int64)
+
+
+class IndiceBusqueda:
+
+    MAGICO = b"BIBINDEX"
+    VERSION = 1
+    ALINEACION = 8
+    _preludio = struct.Struct("<8sIIQ")
+
+    CAMPOS = ("title", "abstract", "keywords")
+    SEPARACION = 8        # Posiciones libres entre campos: las frases no cruzan de un campo a otro
+    K1 = 1.2
+    B = 0.75
+    MAX_RESULTADOS = 100
+
+    patron_token = re.compile(r"\w+")
+    patron_frase = re.compile(r'"([^"]*)"')
+
+    def __init__(self, cabecera, mapa):
+        self.metadatos = cabecera["metadatos"]
+        self.n_documentos = cabecera["n_documentos"]
+        self.longitud_media = cabecera["longitud_media"] or 1.0
+        self.valores_tipo = cabecera["valores_tipo"]
+        self._codigos_tipo = {valor: codigo for codigo, valor in enumerate(self.valores_tipo)}
+        self._mapa = mapa  # Mantener el mapa vivo mientras exista el índice
+        vista = memoryview(mapa)
+        secciones = cabecera["secciones"]
+
+        def seccion(nombre, tipo=None):
+            desplazamiento, longitud = secciones[nombre]
+            datos = vista[desplazamiento:desplazamiento + longitud]
+            return datos if tipo is None else np.frombuffer(datos, dtype=tipo)
+
+        self.terminos = ColumnaTexto(seccion("terminos#desplazamientos").cast('q'), seccion("terminos#datos"))
+        self.df = seccion("df", np.uint32)
+        self._inicios = {flujo: seccion(flujo + "#inicios", np.int64) for flujo in ("filas", "frecuencias", "posiciones")}
+        self._flujos = {flujo: seccion(flujo) for flujo in ("filas", "frecuencias", "posiciones")}
+        self.longitudes = seccion("longitudes", np.uint32)
+        self.anios = seccion("anios", np.int32)
+        self.tipos = seccion("tipos", np.uint16)
+        # Normalización por longitud de BM25, calculada una sola vez
+        self._normalizacion = self.K1 * (1 - self.B + self.B * self.longitudes / self.longitud_media)
+
+    def __len__(self):
+        return len(self.terminos)
+
+    @staticmethod
+    def tokens(texto):
+        """Términos de un texto: palabras en minúsculas."""
+        return IndiceBusqueda.patron_token.findall(texto.lower())
+
+    @staticmethod
+    def _escribir(ruta_indice, secciones_datos, cabecera):
+        """Escribe las secciones alineadas y la cabecera (pickle) de forma atómica."""
+        directorio = os.path.dirname(os.path.abspath(ruta_indice))
+        os.makedirs(directorio, exist_ok=True)
+        descriptor, ruta_temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, 'wb') as archivo:
+                archivo.write(b"\0" * IndiceBusqueda._preludio.size)
+                secciones = {}
+                for nombre, datos in secciones_datos:
+                    archivo.write(b"\0" * (-archivo.tell() % IndiceBusqueda.ALINEACION))
+                    datos = datos.tobytes() if hasattr(datos, "tobytes") else bytes(datos)
+                    secciones[nombre] = (archivo.tell(), len(datos))
+                    archivo.write(datos)
+                cabecera = dict(cabecera, secciones=secciones)
+                desplazamiento_cabecera = archivo.tell()
+                pickle.dump(cabecera, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+                archivo.seek(0)
+                archivo.write(IndiceBusqueda._preludio.pack(
+                    IndiceBusqueda.MAGICO, IndiceBusqueda.VERSION, 0, desplazamiento_cabecera))
+            os.chmod(ruta_temporal, 0o644)
+            os.replace(ruta_temporal, ruta_indice)
+        except BaseException:
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+            raise
+
+    @staticmethod
+    def _deltas(valores, tamanos, anteriores=0):
+        """
+        Diferencias entre valores consecutivos de cada grupo; el primero de cada grupo se resta de
+        `anteriores` (el último valor del grupo en el bloque anterior, o 0).
+        """
+        deltas = valores.copy()
+        deltas[1:] -= valores[:-1]
+        inicios = np.cumsum(tamanos) - tamanos
+        deltas[inicios] = valores[inicios] - anteriores
+        return deltas
+
+    @staticmethod
+    def _codificar_flujo(valores, tamanos):
+        """Codifica los valores de todos los términos y devuelve (bytes, desplazamiento de cada término)."""
+        datos, longitudes = Varint.codificar(valores)
+        bytes_acumulados = np.concatenate(([0], np.cumsum(longitudes)))
+        return datos, bytes_acumulados[np.concatenate(([0], np.cumsum(tamanos)))]
+
+    @staticmethod
+    def _volcar(bloque, postings):
+        """Codifica las listas del bloque y las agrega a las listas comprimidas de cada término."""
+        if not bloque:
+            return
+        terminos = list(bloque)
+        df = np.array([len(bloque[termino][0]) for termino in terminos], dtype=np.int64)
+        filas = np.concatenate([np.frombuffer(bloque[termino][0], dtype=np.uint32) for termino in terminos]).astype(np.int64)
+        frecuencias = np.concatenate([np.frombuffer(bloque[termino][1], dtype=np.uint32) for termino in terminos]).astype(np.int64)
+        posiciones = np.concatenate([np.frombuffer(bloque[termino][2], dtype=np.uint32) for termino in terminos]).astype(np.int64)
+        anteriores = np.array([postings[termino][4] if termino in postings else 0 for termino in terminos], dtype=np.int64)
+
+        datos_filas, inicios_filas = IndiceBusqueda._codificar_flujo(IndiceBusqueda._deltas(filas, df, anteriores), df)
+        datos_frecuencias, inicios_frecuencias = IndiceBusqueda._codificar_flujo(frecuencias, df)
+        # Las posiciones se reinician en cada fila; por término ocupan la suma de sus frecuencias
+        tamanos_posiciones = np.add.reduceat(frecuencias, np.cumsum(df) - df)
+        datos_posiciones, inicios_posiciones = IndiceBusqueda._codificar_flujo(
+            IndiceBusqueda._deltas(posiciones, frecuencias), tamanos_posiciones)
+
+        for i, termino in enumerate(terminos):
+            destino = postings.get(termino)
+            if destino is None:
+                destino = postings[termino] = [bytearray(), bytearray(), bytearray(), 0, 0]
+            destino[0] += datos_filas[inicios_filas[i]:inicios_filas[i + 1]]
+            destino[1] += datos_frecuencias[inicios_frecuencias[i]:inicios_frecuencias[i + 1]]
+            destino[2] += datos_posiciones[inicios_posiciones[i]:inicios_posiciones[i + 1]]
+            destino[3] += len(bloque[termino][0])
+            destino[4] = bloque[termino][0][-1]
+
+    @staticmethod
+    def construir(entradas, ruta_indice, metadatos=None, tamano_bloque=10000):
+        """
+        Indexa las entradas (lista de EntradaBib o BibCorpus) y guarda el índice en `ruta_indice`.
+
+        Las listas se acumulan sin comprimir solo para `tamano_bloque` entradas; luego se codifican
+        y se agregan a las listas comprimidas, de modo que la memoria crece con el tamaño del
+        índice y no con el número de posiciones.
+
+        Args:
+            metadatos: Diccionario que identifica el corpus indexado (por ejemplo su SHA-256).
+        """
+        postings = {}  # término -> [filas, frecuencias, posiciones (comprimidas), df, última fila]
+        bloque = {}    # término -> (filas, frecuencias, posiciones) del bloque actual
+        longitudes, anios, tipos = array('I'), array('i'), array('H')
+        valores_tipo, codigos_tipo = [], {}
+        tokens = IndiceBusqueda.tokens
+        for fila, entrada in enumerate(entradas):
+            campos = entrada.campos
+            posiciones_fila = {}
+            posicion = longitud = 0
+            for campo in IndiceBusqueda.CAMPOS:
+                valor = campos.get(campo)
+                if not valor:
+                    continue
+                tokens_campo = tokens(valor)
+                for token in tokens_campo:
+                    lista = posiciones_fila.get(token)
+                    if lista is None:
+                        posiciones_fila[token] = [posicion]
+                    else:
+                        lista.append(posicion)
+                    posicion += 1
+                longitud += len(tokens_campo)
+                posicion += IndiceBusqueda.SEPARACION
+            for termino, lista in posiciones_fila.items():
+                datos = bloque.get(termino)
+                if datos is None:
+                    datos = bloque[termino] = (array('I'), array('I'), array('I'))
+                datos[0].append(fila)
+                datos[1].append(len(lista))
+                datos[2].extend(lista)
+
+            longitudes.append(longitud)
+            anio = ''.join(filter(str.isdigit, campos.get("year", "")))[:4]
+            anios.append(int(anio) if anio else 0)
+            tipo = entrada.entry_type or ""
+            codigo = codigos_tipo.get(tipo)
+            if codigo is None:
+                codigo = codigos_tipo[tipo] = len(valores_tipo)
+                valores_tipo.append(tipo)
+            tipos.append(codigo)
+
+            if (fila + 1) % tamano_bloque == 0:
+                IndiceBusqueda._volcar(bloque, postings)
+                bloque = {}
+        IndiceBusqueda._volcar(bloque, postings)
+        del bloque
+
+        terminos = sorted(postings)
+        df = array('I', (postings[termino][3] for termino in terminos))
+        flujos = []
+        for posicion_lista in range(3):
+            inicios = array('q', [0])
+            for termino in terminos:
+                inicios.append(inicios[-1] + len(postings[termino][posicion_lista]))
+            datos = b"".join(postings[termino][posicion_lista] for termino in terminos)
+            for termino in terminos:
+                postings[termino][posicion_lista] = None  # Liberar cada lista en cuanto se copia
+            flujos.append((inicios, datos))
+        del postings
+        (inicios_filas, datos_filas), (inicios_frecuencias, datos_frecuencias), (inicios_posiciones, datos_posiciones) = flujos
+
+        desplazamientos, datos_terminos = ColumnaTexto.codificar(terminos)
+        n_documentos = len(longitudes)
+        IndiceBusqueda._escribir(ruta_indice, [
+            ("terminos#desplazamientos", desplazamientos),
+            ("terminos#datos", datos_terminos),
+            ("df", df),
+            ("filas#inicios", inicios_filas),
+            ("frecuencias#inicios", inicios_frecuencias),
+            ("posiciones#inicios", inicios_posiciones),
+            ("filas", datos_filas),
+            ("frecuencias", datos_frecuencias),
+            ("posiciones", datos_posiciones),
+            ("longitudes", longitudes),
+            ("anios", anios),
+            ("tipos", tipos),
+        ], {
+            "metadatos": metadatos or {},
+            "n_documentos": n_documentos,
+            "longitud_media": sum(longitudes) / n_documentos if n_documentos else 0.0,
+            "valores_tipo": valores_tipo,
+        })
+
+    @staticmethod
+    def _leer_cabecera(archivo):
+        preludio = archivo.read(IndiceBusqueda._preludio.size)
+        if len(preludio) < IndiceBusqueda._preludio.size:
+            raise ValueError("Archivo de índice incompleto")
+        magico, version, _, desplazamiento = IndiceBusqueda._preludio.unpack(preludio)
+        if magico != IndiceBusqueda.MAGICO or version != IndiceBusqueda.VERSION:
+            raise ValueError("Formato de índice desconocido")
+        archivo.seek(desplazamiento)
+        return pickle.load(archivo)
+
+    @staticmethod
+    def leer_metadatos(ruta_indice):
+        """Metadatos de un índice existente, o None si no existe o no es válido."""
+        try:
+            with open(ruta_indice, 'rb') as archivo:
+                return IndiceBusqueda._leer_cabecera(archivo)["metadatos"]
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            return None
+
+    @staticmethod
+    def cargar(ruta_indice):
+        """Abre el índice con mmap; las listas se decodifican solo al consultarlas."""
+        with open(ruta_indice, 'rb') as archivo:
+            cabecera = IndiceBusqueda._leer_cabecera(archivo)
+            mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        return IndiceBusqueda(cabecera, mapa)
+
+    @staticmethod
+    def cargar_o_construir(entradas, ruta_indice, metadatos):
+        """Carga el índice si corresponde a `metadatos`; si no, lo construye (un solo proceso a la vez)."""
+        if IndiceBusqueda.leer_metadatos(ruta_indice) == metadatos:
+            return IndiceBusqueda.cargar(ruta_indice)
+
+        os.makedirs(os.path.dirname(os.path.abspath(ruta_indice)), exist_ok=True)
+        with open(ruta_indice + ".lock", 'w') as bloqueo:
+            if fcntl is not None:
+                fcntl.flock(bloqueo, fcntl.LOCK_EX)
+            if IndiceBusqueda.leer_metadatos(ruta_indice) != metadatos:
+                IndiceBusqueda.construir(entradas, ruta_indice, metadatos)
+        return IndiceBusqueda.cargar(ruta_indice)
+
+    def _posicion_termino(self, termino):
+        indice = bisect_left(self.terminos, termino)
+        if indice < len(self.terminos) and self.terminos[indice] == termino:
+            return indice
+        return None
+
+    def _lista(self, flujo, indice):
+        inicios = self._inicios[flujo]
+        return Varint.decodificar(self._flujos[flujo][inicios[indice]:inicios[indice + 1]])
+
+    def _filas_y_frecuencias(self, indice):
+        return np.cumsum(self._lista("filas", indice)), self._lista("frecuencias", indice)
+
+    def _claves_posiciones(self, indice, desfase):
+        """Claves fila << 32 | (posición - desfase) de todas las apariciones del término."""
+        filas, frecuencias = self._filas_y_frecuencias(indice)
+        deltas = self._lista("posiciones", indice)
+        acumuladas = np.cumsum(deltas)
+        inicios = np.cumsum(frecuencias) - frecuencias
+        posiciones = acumuladas - np.repeat(acumuladas[inicios] - deltas[inicios], frecuencias)
+        validas = posiciones >= desfase
+        return (np.repeat(filas, frecuencias)[validas] << 32) | (posiciones[validas] - desfase)
+
+    @staticmethod
+    def _interseccion(a, b):
+        """Intersección de dos arrays ordenados y sin repetidos, con búsqueda binaria en lugar de ordenar."""
+        if len(a) > len(b):
+            a, b = b, a
+        posiciones = np.searchsorted(b, a)
+        posiciones[posiciones == len(b)] = 0
+        return a[b[posiciones] == a] if len(b) else a[:0]
+
+    def _filas_frase(self, indices):
+        """Filas donde los términos aparecen consecutivos, intersecando claves (fila, posición inicial)."""
+        # Las claves de cada término ya salen ordenadas (filas y posiciones crecientes)
+        claves = None
+        for desfase, indice in enumerate(indices):
+            claves_termino = self._claves_posiciones(indice, desfase)
+            claves = claves_termino if claves is None else IndiceBusqueda._interseccion(claves, claves_termino)
+            if not len(claves):
+                break
+        filas = claves >> 32
+        return filas[np.concatenate(([True], filas[1:] != filas[:-1]))] if len(filas) else filas
+
+    @Metricas.cronometrado
+    def buscar(self, consulta, limite=10, anio_min=None, anio_max=None, tipos=None):
+        """
+        Busca la consulta y devuelve las filas mejor puntuadas con BM25.
+
+        Los términos sueltos suman puntaje (basta con que aparezca uno); cada frase entre comillas
+        es obligatoria y sus términos también puntúan.
+
+        Returns:
+            Diccionario con el total de filas que coinciden y la lista de (fila, puntaje).
+        """
+        frases = [IndiceBusqueda.tokens(frase) for frase in IndiceBusqueda.patron_frase.findall(consulta)]
+        frases = [frase for frase in frases if frase]
+        sueltos = IndiceBusqueda.tokens(IndiceBusqueda.patron_frase.sub(" ", consulta))
+        vacio = {"total": 0, "resultados": []}
+
+        indices = {}
+        for termino in dict.fromkeys(sueltos + [termino for frase in frases for termino in frase]):
+            indice = self._posicion_termino(termino)
+            if indice is not None:
+                indices[termino] = indice
+        if not indices or any(termino not in indices for frase in frases for termino in frase):
+            return vacio
+
+        puntajes = np.zeros(self.n_documentos, dtype=np.float64)
+        normalizacion = self._normalizacion
+        for indice in indices.values():
+            filas, frecuencias = self._filas_y_frecuencias(indice)
+            df = len(filas)
+            idf = np.log(1 + (self.n_documentos - df + 0.5) / (df + 0.5))
+            puntajes[filas] += idf * frecuencias * (self.K1 + 1) / (frecuencias + normalizacion[filas])
+
+        mascara = puntajes > 0
+        for frase in frases:
+            en_frase = np.zeros(self.n_documentos, dtype=bool)
+            en_frase[self._filas_frase([indices[termino] for termino in frase])] = True
+            mascara &= en_frase
+        if anio_min is not None:
+            mascara &= self.anios >= anio_min
+        if anio_max is not None:
+            mascara &= (self.anios <= anio_max) & (self.anios > 0)
+        if tipos:
+            codigos = [self._codigos_tipo[tipo] for tipo in tipos if tipo in self._codigos_tipo]
+            mascara &= np.isin(self.tipos, codigos)
+
+        filas = np.flatnonzero(mascara)
+        if not len(filas):
+            return vacio
+        limite = max(1, min(limite, self.MAX_RESULTADOS))
+        if len(filas) > limite:
+            filas = filas[np.argpartition(-puntajes[filas], limite - 1)[:limite]]
+        # Mayor puntaje primero; los empates, por posición en el corpus
+        filas = filas[np.lexsort((filas, -puntajes[filas]))]
+        return {
+            "total": int(mascara.sum()),
+            "resultados": [(int(fila), float(puntajes[fila])) for fila in filas],
+        }
+
+
+if __name__ == "__main__":
+    from Util.BibCorpus import BibCorpus
+
+    parser = argparse.ArgumentParser(description="Índice invertido de búsqueda sobre un corpus .bib.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    construir = subcomandos.add_parser("construir", help="Indexa un archivo .bib")
+    construir.add_argument("corpus")
+    construir.add_argument("indice")
+    buscar = subcomandos.add_parser("buscar", help="Consulta un índice ya construido")
+    buscar.add_argument("indice")
+    buscar.add_argument("consulta")
+    buscar.add_argument("--limite", type=int, default=10)
+    buscar.add_argument("--anio-min", type=int)
+    buscar.add_argument("--anio-max", type=int)
+    buscar.add_argument("--tipo", action="append", help="Tipo de entrada (se puede repetir)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    if args.comando == "construir":
+        IndiceBusqueda.construir(BibCorpus.desde_archivo(args.corpus), args.indice,
+                                 {"archivo": os.path.abspath(args.corpus)})
+        indice = IndiceBusqueda.cargar(args.indice)
+        print(f"{indice.n_documentos} entradas, {len(indice)} términos, "
+              f"{os.path.getsize(args.indice) / 2**20:.1f} MB en {time.perf_counter() - inicio:.1f} s")
+    else:
+        indice = IndiceBusqueda.cargar(args.indice)
+        resultado = indice.buscar(args.consulta, args.limite, args.anio_min, args.anio_max, args.tipo)
+        print(f"{resultado['total']} resultados en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        for fila, puntaje in resultado["resultados"]:
+            print(f"{puntaje:8.3f}  fila {fila}")
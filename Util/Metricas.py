@@ -0,0 +1,223 @@
+"""
+Métricas ligeras del servidor: latencia por etapa y por petición, tasas de acierto de las cachés y
+memoria del proceso.
+
+Las etapas se miden con el decorador `Metricas.cronometrado` o el gestor de contexto
+`Metricas.etapa(nombre)`. Cada medición se suma a un histograma acumulativo (formato de texto de
+Prometheus en `Metricas.exportar`) y, si ocurre dentro de una petición, a las fases de esa
+petición, que server.py devuelve en la cabecera Server-Timing.
+
+Con METRICAS=0 en el entorno el decorador devuelve la función sin envolver y `etapa` no mide
+nada, de modo que el costo es prácticamente nulo. Las métricas son de cada proceso: con varios
+workers de gunicorn cada uno expone las suyas.
+"""
+import contextvars
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+
+class HistogramaLatencia:
+    """Histograma de latencias en segundos con límites fijos (cubos acumulativos al exportar)."""
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.cubos = [0] * (len(limites) + 1)  # El último cubo es +Inf
+        self.suma = 0.0
+        self.cantidad = 0
+
+    def observar(self, segundos):
+        # Debe llamarse con el bloqueo de Metricas tomado
+        self.cubos[bisect_left(self.limites, segundos)] += 1
+        self.suma += segundos
+        self.cantidad += 1
+
+
+class Metricas:
+
+    habilitadas = os.environ.get("METRICAS", "1") != "0"
+
+    PREFIJO = "bibliometria"
+    LIMITES = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    _bloqueo = threading.Lock()
+    _etapas = {}            # etapa -> HistogramaLatencia
+    _peticiones = {}        # ruta -> HistogramaLatencia
+    _contadores = {}        # (nombre, etiquetas) -> valor
+    _caches = {}            # nombre -> función que devuelve aciertos, aciertos_disco, fallos, ...
+    _fases = contextvars.ContextVar("fases_peticion", default=None)
+
+    @staticmethod
+    def _observar(tabla, nombre, segundos):
+        with Metricas._bloqueo:
+            histograma = tabla.get(nombre)
+            if histograma is None:
+                histograma = tabla[nombre] = HistogramaLatencia(Metricas.LIMITES)
+            histograma.observar(segundos)
+
+    @staticmethod
+    def registrar(etapa, segundos):
+        """Agrega una medición a la etapa y a las fases de la petición en curso."""
+        Metricas._observar(Metricas._etapas, etapa, segundos)
+        fases = Metricas._fases.get()
+        if fases is not None:
+            fases[etapa] = fases.get(etapa, 0.0) + segundos
+
+    @staticmethod
+    @contextmanager
+    def etapa(nombre):
+        """Mide el bloque como la etapa `nombre`."""
+        if not Metricas.habilitadas:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            Metricas.registrar(nombre, time.perf_counter() - inicio)
+
+    @staticmethod
+    def cronometrado(funcion):
+        """Decorador: mide cada llamada a la función como una etapa con su nombre."""
+        if not Metricas.habilitadas:
+            return funcion
+        nombre = funcion.__name__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                Metricas.registrar(nombre, time.perf_counter() - inicio)
+        return envoltura
+
+    @staticmethod
+    def contar(nombre, veces=1, **etiquetas):
+        """Incrementa un contador, por ejemplo peticiones por ruta y código de estado."""
+        if not Metricas.habilitadas:
+            return
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with Metricas._bloqueo:
+            Metricas._contadores[clave] = Metricas._contadores.get(clave, 0) + veces
+
+    @staticmethod
+    def registrar_cache(nombre, estadisticas):
+        """Registra una caché cuya función `estadisticas()` se consulta al exportar (ver CacheGraficos)."""
+        Metricas._caches[nombre] = estadisticas
+
+    @staticmethod
+    def segundos_por_etapa():
+        """Tiempo acumulado de cada etapa (el informe de arranque de gunicorn.conf.py lo usa)."""
+        with Metricas._bloqueo:
+            return {etapa: histograma.suma for etapa, histograma in Metricas._etapas.items()}
+
+    @staticmethod
+    def memoria_proceso(pid="self"):
+        """
+        Memoria de un proceso en bytes según /proc/<pid>/smaps_rollup (Linux): rss, pss (las páginas
+        compartidas repartidas entre los procesos que las usan), compartida y privada; {} si no se puede leer.
+        """
+        campos = {}
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as archivo:
+                for linea in archivo:
+                    partes = linea.split()
+                    if len(partes) == 3 and partes[2] == "kB":
+                        campos[partes[0].rstrip(":")] = int(partes[1]) * 1024
+        except OSError:
+            return {}
+        return {
+            "rss": campos.get("Rss", 0),
+            "pss": campos.get("Pss", 0),
+            "compartida": campos.get("Shared_Clean", 0) + campos.get("Shared_Dirty", 0),
+            "privada": campos.get("Private_Clean", 0) + campos.get("Private_Dirty", 0),
+        }
+
+    @staticmethod
+    def iniciar_peticion():
+        """Empieza a acumular las fases de la petición actual; devuelve el instante de inicio."""
+        if not Metricas.habilitadas:
+            return None
+        Metricas._fases.set({})
+        return time.perf_counter()
+
+    @staticmethod
+    def terminar_peticion(inicio, ruta, codigo):
+        """
+        Registra la latencia total de la petición y devuelve el valor de la cabecera Server-Timing
+        (fases en milisegundos, en el orden en que se midieron, y el total), o None si no se midió.
+        """
+        if inicio is None:
+            return None
+        total = time.perf_counter() - inicio
+        fases = Metricas._fases.get() or {}
+        Metricas._fases.set(None)
+        Metricas._observar(Metricas._peticiones, ruta, total)
+        Metricas.contar("peticiones_total", ruta=ruta, codigo=str(codigo))
+        partes = [f"{nombre};dur={segundos * 1000:.2f}" for nombre, segundos in fases.items()]
+        partes.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(partes)
+
+    @staticmethod
+    def _etiquetas(**etiquetas):
+        partes = []
+        for clave, valor in etiquetas.items():
+            valor = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            partes.append(f'{clave}="{valor}"')
+        return "{" + ",".join(partes) + "}" if partes else ""
+
+    @staticmethod
+    def _exportar_histogramas(lineas, nombre, etiqueta, tabla, ayuda):
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} histogram")
+        for clave, histograma in sorted(tabla.items()):
+            acumulado = 0
+            for limite, cantidad in zip(Metricas.LIMITES + ("+Inf",), histograma.cubos):
+                acumulado += cantidad
+                etiquetas = Metricas._etiquetas(**{etiqueta: clave, "le": limite})
+                lineas.append(f"{nombre}_bucket{etiquetas} {acumulado}")
+            etiquetas = Metricas._etiquetas(**{etiqueta: clave})
+            lineas.append(f"{nombre}_sum{etiquetas} {histograma.suma:.6f}")
+            lineas.append(f"{nombre}_count{etiquetas} {histograma.cantidad}")
+
+    @staticmethod
+    def exportar():
+        """Todas las métricas en el formato de texto de Prometheus (versión 0.0.4)."""
+        prefijo = Metricas.PREFIJO
+        lineas = []
+        with Metricas._bloqueo:
+            Metricas._exportar_histogramas(lineas, f"{prefijo}_etapa_segundos", "etapa", Metricas._etapas,
+                                           "Latencia de cada etapa del pipeline (carga, estadísticas, gráficos, plantillas).")
+            Metricas._exportar_histogramas(lineas, f"{prefijo}_peticion_segundos", "ruta", Metricas._peticiones,
+                                           "Latencia total de las peticiones HTTP por ruta.")
+            contadores = sorted(Metricas._contadores.items())
+
+        tipos_declarados = set()
+        for (nombre, etiquetas), valor in contadores:
+            if nombre not in tipos_declarados:
+                lineas.append(f"# TYPE {prefijo}_{nombre} counter")
+                tipos_declarados.add(nombre)
+            lineas.append(f"{prefijo}_{nombre}{Metricas._etiquetas(**dict(etiquetas))} {valor}")
+
+        if Metricas._caches:
+            estadisticas = {nombre: funcion() for nombre, funcion in sorted(Metricas._caches.items())}
+            for clave, tipo in (("aciertos", "counter"), ("aciertos_disco", "counter"), ("fallos", "counter"),
+                                ("desalojos", "counter"), ("elementos", "gauge"), ("bytes", "gauge"),
+                                ("tasa_aciertos", "gauge")):
+                sufijo = "_total" if tipo == "counter" else ""
+                lineas.append(f"# TYPE {prefijo}_cache_{clave}{sufijo} {tipo}")
+                for nombre, datos in estadisticas.items():
+                    if clave in datos:
+                        lineas.append(f"{prefijo}_cache_{clave}{sufijo}{Metricas._etiquetas(cache=nombre)} {datos[clave]}")
+
+        # Memoria de este proceso: con preload_app, la compartida con el maestro es la que no se copió
+        memoria = Metricas.memoria_proceso()
+        if memoria:
+            lineas.append(f"# TYPE {prefijo}_proceso_memoria_bytes gauge")
+            for tipo, valor in memoria.items():
+                lineas.append(f"{prefijo}_proceso_memoria_bytes{Metricas._etiquetas(tipo=tipo)} {valor}")
+        return "\n".join(lineas) + "\n"
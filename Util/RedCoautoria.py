@@ -0,0 +1,166 @@
+"""
+Red de coautoría como matriz dispersa de scipy, para cientos de miles de autores.
+
+En una sola pasada sobre el corpus se normalizan los autores (Util.Autores) y se arma la matriz
+de incidencia B (entradas x autores). La matriz de coautoría es A = BᵀB: A[i, j] es el número de
+artículos que comparten los autores i y j, y la diagonal, los artículos de cada autor. El grado,
+el PageRank y las componentes conexas se calculan de forma vectorial sobre A, sin crear un grafo
+de networkx con un objeto por nodo y por arista.
+
+Uso (desde la raíz del repositorio):
+    python -m Util.RedCoautoria Util/outputFile/referencias_ordenadas_GnomeSort_year.bib --k 20
+"""
+import argparse
+import time
+from array import array
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from Util.Autores import Autores
+
+
+class RedCoautoria:
+    """
+    Args:
+        autores: Nombres canónicos de los autores, en orden de primera aparición.
+        matriz: Matriz CSR simétrica (autores x autores) de artículos en común, con diagonal 0.
+        articulos: Número de artículos de cada autor.
+    """
+
+    # Los artículos con más autores (consorcios) no generan aristas: aportarían O(n²) pares
+    MAX_AUTORES_POR_ENTRADA = 50
+
+    def __init__(self, autores, matriz, articulos):
+        self.autores = autores
+        self.matriz = matriz
+        self.articulos = articulos
+        self._componentes = None
+        self._pagerank = None
+
+    def __len__(self):
+        return len(self.autores)
+
+    @property
+    def n_aristas(self):
+        return self.matriz.nnz // 2
+
+    @staticmethod
+    def construir(entradas, max_autores=MAX_AUTORES_POR_ENTRADA):
+        """Construye la red de todo el corpus (lista de EntradaBib o BibCorpus) en una sola pasada."""
+        indices = {}
+        filas, columnas = array('i'), array('i')      # Incidencia entrada -> autor (solo para aristas)
+        articulos = array('i')
+        fila = 0
+        for entrada in entradas:
+            autores = Autores.normalizar(entrada.campos.get("author", ""))
+            if not autores:
+                continue
+            codigos = []
+            for autor in autores:
+                codigo = indices.get(autor)
+                if codigo is None:
+                    codigo = indices[autor] = len(articulos)
+                    articulos.append(0)
+                articulos[codigo] += 1
+                codigos.append(codigo)
+            if 1 < len(codigos) <= max_autores:
+                filas.extend([fila] * len(codigos))
+                columnas.extend(codigos)
+                fila += 1
+
+        n = len(articulos)
+        incidencia = sparse.csr_matrix(
+            (np.ones(len(filas), dtype=np.int32), (np.frombuffer(filas, dtype=np.int32), np.frombuffer(columnas, dtype=np.int32))),
+            shape=(fila, n))
+        matriz = (incidencia.T @ incidencia).tocsr()
+        matriz.setdiag(0)
+        matriz.eliminate_zeros()
+        return RedCoautoria(list(indices), matriz, np.frombuffer(articulos, dtype=np.int32).copy())
+
+    def grado(self):
+        """Número de coautores distintos de cada autor."""
+        return np.diff(self.matriz.indptr)
+
+    def grado_ponderado(self):
+        """Número de colaboraciones (artículo, coautor) de cada autor."""
+        return np.asarray(self.matriz.sum(axis=1)).ravel()
+
+    def componentes(self):
+        """Tupla (número de componentes conexas, componente de cada autor)."""
+        if self._componentes is None:
+            self._componentes = connected_components(self.matriz, directed=False)
+        return self._componentes
+
+    def tamanos_componentes(self):
+        """Tamaño de la componente de cada autor."""
+        _, etiquetas = self.componentes()
+        return np.bincount(etiquetas)[etiquetas]
+
+    def pagerank(self, alfa=0.85, tolerancia=1e-10, max_iteraciones=100):
+        """
+        PageRank ponderado por artículos en común (método de potencias sobre la matriz dispersa).
+        Los autores sin coautores reparten su puntaje entre todos, como en networkx.pagerank.
+        """
+        if self._pagerank is not None:
+            return self._pagerank
+        n = len(self)
+        if n == 0:
+            return np.zeros(0)
+        salida = self.grado_ponderado().astype(np.float64)
+        colgantes = salida == 0
+        inversa = np.divide(1.0, salida, out=np.zeros(n), where=~colgantes)
+        transicion = sparse.diags(inversa) @ self.matriz  # Fila i: probabilidad de pasar de i a cada coautor
+        transpuesta = transicion.T.tocsr()
+        puntajes = np.full(n, 1.0 / n)
+        for _ in range(max_iteraciones):
+            anteriores = puntajes
+            puntajes = alfa * (transpuesta @ anteriores) + (alfa * anteriores[colgantes].sum() + 1 - alfa) / n
+            if np.abs(puntajes - anteriores).sum() < n * tolerancia:
+                break
+        self._pagerank = puntajes
+        return puntajes
+
+    def resumen(self, k=20):
+        """Tamaño de la red y los k autores con mayor PageRank, con su grado, artículos y componente."""
+        n_componentes, _ = self.componentes()
+        tamanos = self.tamanos_componentes()
+        pagerank = self.pagerank()
+        grado = self.grado()
+        mejores = np.argsort(-pagerank, kind="stable")[:k]
+        return {
+            "autores": len(self),
+            "aristas": self.n_aristas,
+            "componentes": int(n_componentes),
+            "componente_mayor": int(tamanos.max()) if len(self) else 0,
+            "aislados": int((grado == 0).sum()),
+            "principales": [{
+                "autor": self.autores[i],
+                "pagerank": float(pagerank[i]),
+                "coautores": int(grado[i]),
+                "articulos": int(self.articulos[i]),
+                "tamano_componente": int(tamanos[i]),
+            } for i in mejores],
+        }
+
+
+if __name__ == "__main__":
+    from Util.BibCorpus import BibCorpus
+
+    parser = argparse.ArgumentParser(description="Red de coautoría dispersa de un corpus .bib.")
+    parser.add_argument("corpus")
+    parser.add_argument("--k", type=int, default=20, help="Autores con mayor PageRank a mostrar")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    red = RedCoautoria.construir(BibCorpus.desde_archivo(args.corpus))
+    construccion = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    resumen = red.resumen(args.k)
+    print(f"{resumen['autores']} autores, {resumen['aristas']} aristas, {resumen['componentes']} componentes "
+          f"(mayor: {resumen['componente_mayor']}, aislados: {resumen['aislados']})")
+    print(f"construcción {construccion:.2f} s, métricas {time.perf_counter() - inicio:.2f} s")
+    for autor in resumen["principales"]:
+        print(f"{autor['pagerank']:.6f}  {autor['autor']:<40} coautores {autor['coautores']:>4}  "
+              f"artículos {autor['articulos']:>4}")
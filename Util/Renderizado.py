@@ -0,0 +1,157 @@
+import base64
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class Renderizado:
+    """
+    Renderizado de gráficos con objetos Figure/FigureCanvasAgg, sin el estado global de pyplot.
+
+    Cada llamada crea su propia figura, por lo que se pueden generar varios gráficos a la vez desde
+    distintos hilos (workers de gunicorn con hilos o el pool de `en_paralelo`). Todas las funciones
+    aceptan el formato de salida ("png" o "svg") y, para PNG, la resolución en DPI.
+
+    matplotlib (y wordcloud y networkx) se importan con el primer gráfico: un arranque con la caché
+    de gráficos llena no los carga.
+    """
+
+    FORMATOS = {"png": "image/png", "svg": "image/svg+xml"}
+    DPI = 100
+    HILOS = 4
+
+    _ejecutor = None
+    _bloqueo_ejecutor = threading.Lock()
+
+    @staticmethod
+    def mime(formato):
+        """Tipo MIME del formato, para las URI data: y las respuestas HTTP."""
+        return Renderizado.FORMATOS[formato]
+
+    @staticmethod
+    def figura_a_base64(figura, formato="png", dpi=None, ajustar=True):
+        """Codifica una figura en base64 en el formato indicado."""
+        if formato not in Renderizado.FORMATOS:
+            raise ValueError(f"Formato de imagen no soportado: '{formato}'")
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        FigureCanvasAgg(figura)
+        buffer = io.BytesIO()
+        figura.savefig(buffer, format=formato, dpi=dpi or Renderizado.DPI,
+                       bbox_inches="tight" if ajustar else None)
+        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+    @staticmethod
+    def histograma(frecuencias, etiqueta_x, formato="png", dpi=None):
+        """Histograma de barras de un diccionario valor -> frecuencia, en base64."""
+        from matplotlib.figure import Figure
+
+        figura = Figure(figsize=(10, 6))
+        ejes = figura.add_subplot()
+        ejes.bar(list(frecuencias.keys()), list(frecuencias.values()), color='skyblue')
+        ejes.set_xlabel(etiqueta_x)
+        ejes.set_ylabel('Frecuencia')
+        ejes.grid(axis='y', linestyle='--', alpha=0.7)
+
+        # Rotar las etiquetas del eje X para que aparezcan verticalmente
+        ejes.tick_params(axis='x', labelrotation=90)
+        return Renderizado.figura_a_base64(figura, formato, dpi)
+
+    @staticmethod
+    def nube_palabras(palabras_frecuencias, formato="png", dpi=None):
+        """Nube de palabras a partir de un diccionario palabra -> frecuencia, en base64."""
+        from matplotlib.figure import Figure
+        from wordcloud import WordCloud
+
+        nube = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(palabras_frecuencias)
+        if formato == "svg":
+            # SVG vectorial nativo de wordcloud: mucho más liviano que una imagen incrustada
+            return base64.b64encode(nube.to_svg().encode('utf-8')).decode('utf-8')
+
+        figura = Figure(figsize=(10, 5))
+        ejes = figura.add_subplot()
+        ejes.imshow(nube.to_array(), interpolation='bilinear')
+        ejes.axis('off')
+        return Renderizado.figura_a_base64(figura, formato, dpi)
+
+    @staticmethod
+    def grafo(grafo, posiciones, tamanos, colores, formato="png", dpi=None, titulo=None):
+        """Dibuja un grafo de networkx sobre una figura propia, en base64."""
+        import networkx as nx
+        from matplotlib.figure import Figure
+
+        figura = Figure(figsize=(12, 8))
+        ejes = figura.add_subplot()
+        nx.draw_networkx(grafo, posiciones, ax=ejes, with_labels=True, node_size=tamanos,
+                         node_color=colores, font_size=8, font_weight="bold")
+        ejes.set_axis_off()
+        if titulo:
+            ejes.set_title(titulo)
+        return Renderizado.figura_a_base64(figura, formato, dpi, ajustar=False)
+
+    @staticmethod
+    def grafo_grande(posiciones, origen, destino, tamanos, colores, etiquetas=None, formato="png", dpi=None,
+                     titulo=None):
+        """
+        Dibuja un grafo de miles de nodos: todas las aristas en una sola LineCollection y los nodos
+        en un solo scatter, en lugar de un artista por elemento como nx.draw.
+
+        Args:
+            posiciones: Arreglo (n, 2) con las posiciones de los nodos.
+            origen, destino: Índices de los extremos de cada arista.
+            etiquetas: Diccionario índice -> texto de los nodos que se rotulan.
+        """
+        from matplotlib.collections import LineCollection
+        from matplotlib.figure import Figure
+
+        figura = Figure(figsize=(12, 8))
+        ejes = figura.add_subplot()
+        segmentos = posiciones[np.stack([origen, destino], axis=1)] if len(origen) else np.zeros((0, 2, 2))
+        ejes.add_collection(LineCollection(segmentos, colors="gray", linewidths=0.3, alpha=0.4, zorder=1))
+        ejes.scatter(posiciones[:, 0], posiciones[:, 1], s=tamanos, c=colores, linewidths=0, zorder=2)
+        for indice, texto in (etiquetas or {}).items():
+            ejes.annotate(texto, posiciones[indice], fontsize=7, fontweight="bold", zorder=3)
+        ejes.autoscale_view()
+        ejes.set_axis_off()
+        if titulo:
+            ejes.set_title(titulo)
+        return Renderizado.figura_a_base64(figura, formato, dpi, ajustar=False)
+
+    @staticmethod
+    def _reiniciar_ejecutor():
+        # Los hilos del pool no sobreviven a un fork (workers de gunicorn con preload_app): el
+        # proceso hijo crea su propio pool la primera vez que lo necesita
+        Renderizado._ejecutor = None
+        Renderizado._bloqueo_ejecutor = threading.Lock()
+
+    @staticmethod
+    def ejecutor():
+        """Pool de hilos compartido para renderizar gráficos en paralelo."""
+        with Renderizado._bloqueo_ejecutor:
+            if Renderizado._ejecutor is None:
+                Renderizado._ejecutor = ThreadPoolExecutor(
+                    max_workers=Renderizado.HILOS, thread_name_prefix="renderizado")
+            return Renderizado._ejecutor
+
+    @staticmethod
+    def en_paralelo(tareas):
+        """
+        Ejecuta varias funciones de renderizado a la vez.
+
+        Args:
+            tareas: Lista de tuplas (función, argumentos[, kwargs]).
+
+        Returns:
+            Lista de resultados en el mismo orden que las tareas.
+        """
+        ejecutor = Renderizado.ejecutor()
+        futuros = [ejecutor.submit(tarea[0], *tarea[1], **(tarea[2] if len(tarea) > 2 else {}))
+                   for tarea in tareas]
+        return [futuro.result() for futuro in futuros]
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=Renderizado._reiniciar_ejecutor)
@@ -1,11 +1,34 @@
-import bibtexparser
-import os
+"""
+Unión de los archivos .bib de las bases de datos en un único archivo.
+
+Hay dos modos:
+- `unir_archivos_bib`: el original, que carga todo con bibtexparser y no elimina duplicados.
+- `unir_archivos_bib_streaming`: parsea los archivos en paralelo, elimina los duplicados (la misma
+  referencia exportada desde varias bases de datos) y escribe la salida de forma incremental,
+  opcionalmente ya ordenada por uno o varios campos (sin el paso posterior de GnomeSort).
+
+Uso (desde la raíz del repositorio):
+    python -m Util.UnirBib "Bases de datos separadas" Util/BaseDatos.bib --ordenar-por year --workers 4
+"""
+import argparse
 import glob
+import hashlib
+import heapq
+import math
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+from Util.BibFileUtil import BibFileUtil
+
 
 # Función para cargar y unir archivos .bib
 def unir_archivos_bib(directorio, archivo_salida):
+    import bibtexparser
+
     entradas_totales = []
-    
+
     # Buscar todos los archivos .bib en la carpeta
     archivos_bib = glob.glob(os.path.join(directorio, '*.bib'))
 
@@ -24,11 +47,246 @@ def unir_archivos_bib(directorio, archivo_salida):
     print(f'Archivos unidos en: {archivo_salida}')
 
 
-# Directorio donde están los archivos .bib
-directorio_bib = '../Bases de datos separadas'
+class FiltroBloom:
+    """
+    Filtro de Bloom sobre huellas enteras de 64 bits, para deduplicar entradas muy grandes con
+    memoria fija. Puede dar falsos positivos (una entrada única descartada como duplicada) con
+    probabilidad `tasa_error`, pero nunca falsos negativos.
+    """
+
+    def __init__(self, capacidad, tasa_error=1e-6):
+        bits = max(64, int(-capacidad * math.log(tasa_error) / (math.log(2) ** 2)))
+        self.n_bits = bits
+        self.n_hashes = max(1, round(bits / capacidad * math.log(2)))
+        self.bits = bytearray((bits + 7) // 8)
+
+    def _posiciones(self, huella):
+        # Doble hashing (Kirsch-Mitzenmacher) a partir de las dos mitades de la huella
+        h1 = huella & 0xFFFFFFFF
+        h2 = (huella >> 32) | 1
+        return ((h1 + i * h2) % self.n_bits for i in range(self.n_hashes))
+
+    def __contains__(self, huella):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._posiciones(huella))
+
+    def add(self, huella):
+        for p in self._posiciones(huella):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+
+class TablaSinCombinantes(dict):
+    """Tabla de str.translate que elimina los caracteres combinantes (acentos tras NFKD), calculada bajo demanda."""
+
+    def __missing__(self, codigo):
+        valor = self[codigo] = None if unicodedata.combining(chr(codigo)) else codigo
+        return valor
+
+
+class UnirBib:
+
+    patron_prefijo_doi = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+    patron_no_alfanumerico = re.compile(r"[\W_]+")
+    sin_combinantes = TablaSinCombinantes()
+
+    # Separador entre entradas en el archivo de salida (como bibtexparser.dump)
+    separador = "\n"
+
+    @staticmethod
+    def normalizar_doi(doi):
+        """DOI en minúsculas y sin prefijos de URL ("https://doi.org/", "doi:")."""
+        return UnirBib.patron_prefijo_doi.sub('', doi.strip()).strip().lower()
+
+    @staticmethod
+    def normalizar_titulo(titulo):
+        """Título en minúsculas, sin llaves, acentos ni signos de puntuación."""
+        titulo = titulo.lower()
+        if not titulo.isascii():
+            # Los textos ASCII (la mayoría) no tienen acentos que quitar
+            titulo = unicodedata.normalize('NFKD', titulo).translate(UnirBib.sin_combinantes)
+        return UnirBib.patron_no_alfanumerico.sub(' ', titulo).strip()
+
+    @staticmethod
+    def _hash(texto):
+        return int.from_bytes(hashlib.blake2b(texto.encode('utf-8'), digest_size=8).digest(), 'little')
+
+    @staticmethod
+    def _huellas(entrada):
+        """
+        Huellas de deduplicación de una entrada: (huellas a consultar, huellas a registrar).
+
+        Dos entradas son duplicadas si tienen el mismo DOI normalizado o, cuando al menos una de
+        las dos no tiene DOI, el mismo título+año. Dos entradas con DOI distintos nunca lo son,
+        aunque compartan título y año ("Editorial", "Preface"): por eso el título+año se registra
+        distinguiendo si la entrada tiene DOI, y una entrada con DOI solo lo consulta entre las
+        registradas sin DOI.
+        """
+        consultas, registros = [], []
+        doi = UnirBib.normalizar_doi(entrada.campos.get("doi", ""))
+        if doi:
+            huella_doi = UnirBib._hash("doi:" + doi)
+            consultas.append(huella_doi)
+            registros.append(huella_doi)
+        titulo = UnirBib.normalizar_titulo(entrada.campos.get("title", ""))
+        if titulo:
+            anio = ''.join(filter(str.isdigit, entrada.campos.get("year", "")))
+            sin_doi = UnirBib._hash(f"titulo:{titulo}|{anio}")
+            con_doi = UnirBib._hash(f"titulo-doi:{titulo}|{anio}")
+            consultas.append(sin_doi)
+            if doi:
+                registros.append(con_doi)
+            else:
+                consultas.append(con_doi)
+                registros.append(sin_doi)
+        return tuple(consultas), tuple(registros)
+
+    @staticmethod
+    def huellas(entrada):
+        """Huellas que registra una entrada conservada (ver `_huellas`)."""
+        return UnirBib._huellas(entrada)[1]
+
+    @staticmethod
+    def huellas_consulta(entrada):
+        """Huellas que, si ya están registradas, marcan la entrada como duplicada (ver `_huellas`)."""
+        return UnirBib._huellas(entrada)[0]
+
+    @staticmethod
+    def _indexar_archivo(argumentos):
+        """
+        Tarea de cada proceso: parsea un archivo y devuelve, por entrada, su clave de orden, sus
+        huellas y su posición en bytes. Los textos no se devuelven; se copian al escribir la salida.
+        """
+        from Ordenamiento import MotorOrdenamiento
+
+        ruta, campos_orden = argumentos
+        registros = []
+        for entrada in BibFileUtil.iter_entradas(ruta):
+            clave_orden = None
+            if campos_orden:
+                # La misma clave que MotorOrdenamiento.ordenar: (valor_orden, clave de la entrada)
+                clave_orden = (tuple(MotorOrdenamiento.valor_campo(entrada, campo) for campo in campos_orden),
+                               entrada.clave)
+            registros.append((clave_orden, UnirBib._huellas(entrada), entrada.inicio, entrada.fin))
+        return registros
+
+    @staticmethod
+    def _leer_texto(archivo, inicio, fin):
+        """Texto de una entrada a partir de su posición, igual que EntradaBib.entrada_completa."""
+        archivo.seek(inicio)
+        texto = archivo.read(fin - inicio).decode('utf-8')
+        return texto.replace('\r\n', '\n') if '\r' in texto else texto
+
+    @staticmethod
+    def unir_archivos_bib_streaming(directorio, archivo_salida, workers=1, deduplicar=True,
+                                    campos_orden=None, capacidad_bloom=None):
+        """
+        Une los archivos .bib del directorio eliminando duplicados y escribiendo la salida por partes.
+
+        Los archivos se parsean en paralelo (un proceso por archivo); cada proceso devuelve solo las
+        huellas y posiciones de sus entradas. Dos entradas son duplicadas si comparten DOI o, si a
+        alguna le falta el DOI, título y año (ver `_huellas`). Ante duplicados se conserva la primera aparición en
+        el orden de los archivos (alfabético). Con `campos_orden` cada archivo se ordena por
+        separado y las listas se combinan con un merge de k vías, dando el mismo resultado que
+        MotorOrdenamiento.ordenar sobre las entradas conservadas.
+
+        Args:
+            directorio: Carpeta con los archivos .bib.
+            archivo_salida: Ruta del archivo unificado.
+            workers: Número de procesos para parsear los archivos.
+            deduplicar: Si es False se conservan todas las entradas.
+            campos_orden: Campos por los que ordenar la salida (p. ej. ("year",)), o None para
+                mantener el orden de los archivos.
+            capacidad_bloom: Si se indica, se usa un filtro de Bloom con esa capacidad en lugar
+                de un conjunto (memoria fija, con una tasa de falsos positivos de 1e-6).
+
+        Returns:
+            Diccionario con el número de archivos, entradas leídas, escritas y duplicadas.
+        """
+        archivos = sorted(glob.glob(os.path.join(directorio, '*.bib')))
+        ruta_salida = os.path.abspath(archivo_salida)
+        archivos = [archivo for archivo in archivos if os.path.abspath(archivo) != ruta_salida]
+        tareas = [(archivo, tuple(campos_orden) if campos_orden else None) for archivo in archivos]
+
+        vistas = FiltroBloom(capacidad_bloom) if capacidad_bloom else set()
+        resumen = {"archivos": len(archivos), "leidas": 0, "escritas": 0, "duplicadas": 0}
+
+        def conservar(huellas):
+            resumen["leidas"] += 1
+            if deduplicar:
+                consultas, registros = huellas
+                if any(huella in vistas for huella in consultas):
+                    resumen["duplicadas"] += 1
+                    return False
+                for huella in registros:
+                    vistas.add(huella)
+            return True
+
+        if workers > 1 and len(tareas) > 1:
+            ejecutor = ProcessPoolExecutor(max_workers=workers)
+            indexados = ejecutor.map(UnirBib._indexar_archivo, tareas)
+        else:
+            ejecutor = None
+            indexados = map(UnirBib._indexar_archivo, tareas)
+
+        fuentes = [open(archivo, 'rb') for archivo in archivos]
+        try:
+            with open(archivo_salida, 'w', encoding='utf-8') as salida:
+                def escribir(indice_archivo, inicio, fin):
+                    salida.write(UnirBib._leer_texto(fuentes[indice_archivo], inicio, fin))
+                    salida.write(UnirBib.separador)
+                    resumen["escritas"] += 1
+
+                if not campos_orden:
+                    # Cada archivo se escribe en cuanto su proceso termina, en el orden de los archivos
+                    for indice_archivo, registros in enumerate(indexados):
+                        for _, huellas, inicio, fin in registros:
+                            if conservar(huellas):
+                                escribir(indice_archivo, inicio, fin)
+                else:
+                    # La deduplicación sigue el orden de los archivos; luego merge de k vías ordenado
+                    listas = []
+                    for indice_archivo, registros in enumerate(indexados):
+                        conservados = [(clave_orden, indice_archivo, inicio, fin)
+                                       for clave_orden, huellas, inicio, fin in registros if conservar(huellas)]
+                        conservados.sort(key=lambda registro: registro[0])
+                        listas.append(conservados)
+                    for _, indice_archivo, inicio, fin in heapq.merge(*listas, key=lambda registro: registro[0]):
+                        escribir(indice_archivo, inicio, fin)
+        finally:
+            for fuente in fuentes:
+                fuente.close()
+            if ejecutor is not None:
+                ejecutor.shutdown()
+
+        return resumen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Une los archivos .bib de un directorio en un único archivo.")
+    # Directorio donde están los archivos .bib y archivo de salida (las rutas originales del proyecto)
+    directorio_util = os.path.dirname(os.path.abspath(__file__))
+    parser.add_argument("directorio", nargs="?", default=os.path.join(directorio_util, '..', 'Bases de datos separadas'))
+    parser.add_argument("salida", nargs="?", default=os.path.join(directorio_util, 'BaseDatos.bib'))
+    parser.add_argument("--modo", choices=("bibtexparser", "streaming"), default="streaming")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--sin-deduplicar", action="store_true")
+    parser.add_argument("--ordenar-por", nargs="+", default=None, metavar="CAMPO")
+    parser.add_argument("--bloom", type=int, default=None, metavar="CAPACIDAD",
+                        help="Deduplicar con un filtro de Bloom de esta capacidad en lugar de un conjunto")
+    parser.add_argument("--casi-duplicados", type=float, default=None, metavar="UMBRAL",
+                        help="Después de unir, colapsa los casi duplicados (MinHash + LSH) con esta similitud mínima")
+    args = parser.parse_args()
+
+    if args.modo == "bibtexparser":
+        unir_archivos_bib(args.directorio, args.salida)
+    else:
+        resumen = UnirBib.unir_archivos_bib_streaming(
+            args.directorio, args.salida, args.workers, not args.sin_deduplicar, args.ordenar_por, args.bloom)
+        print(f"{resumen['escritas']} entradas de {resumen['archivos']} archivos unidas en: {args.salida} "
+              f"({resumen['duplicadas']} duplicadas descartadas de {resumen['leidas']})")
 
-# Archivo de salida
-archivo_unido = 'BaseDatos.bib'
+    if args.casi_duplicados is not None:
+        from Util.CasiDuplicados import CasiDuplicados
 
-# Llamada a la función
-unir_archivos_bib(directorio_bib, archivo_unido)
+        resumen, _ = CasiDuplicados(args.casi_duplicados).colapsar_archivo(args.salida, args.salida)
+        print(f"{resumen['descartadas']} casi duplicados descartados en {resumen['grupos']} grupos: "
+              f"quedan {resumen['escritas']} entradas en {args.salida}")
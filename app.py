@@ -2,19 +2,16 @@ import os
 import sys
 from collections import defaultdict, Counter
 import statistics
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import re
-import io
-import base64
 import csv
-from wordcloud import WordCloud
-from io import BytesIO
 from Ordenamiento import GnomeSort
+from Util.AgregadorFrecuencias import AgregadorFrecuencias
+from Util.Autores import Autores
 from Util.BibFileUtil import BibFileUtil
-import random
-import networkx as nx
+from Util.EmparejadorCategorias import EmparejadorCategorias
+from Util.Enriquecimiento import Enriquecimiento
+from Util.Metricas import Metricas
+from Util.Renderizado import Renderizado
 
 # Añadir el directorio actual al path de Python
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -25,6 +22,7 @@ class EstadisticasDescriptivas:
         """Elimina caracteres no numéricos de un valor de año."""
         return ''.join(filter(str.isdigit, valor_anio))
     
+    @Metricas.cronometrado
     def calcular_estadisticas_anio(entradas, campo):
         """
         Calcula estadísticas descriptivas para un campo específico del archivo BibTeX.            
@@ -72,7 +70,8 @@ class EstadisticasDescriptivas:
             print(f"Error al calcular estadísticas: {str(e)}")
             return None
 
-    def calcular_estadisticas_max15(entradas, campo, n_top=15):
+    @Metricas.cronometrado
+    def calcular_estadisticas_max15(entradas, campo, n_top=15, modo="exacto"):
         """
         Encuentra los autores más frecuentes en el primer puesto de autoría y calcula estadísticas adicionales.
         
@@ -80,21 +79,22 @@ class EstadisticasDescriptivas:
             entradas: Lista de entradas de un archivo BibTeX.
             campo: El campo sobre el cual se realiza el análisis, generalmente 'author'.
             n_top: Número de autores principales a retornar en el análisis.
+            modo: "exacto" o "aproximado" (memoria fija con Space-Saving/Count-Min, ver AgregadorFrecuencias).
         """
         # Expresión regular para verificar que el nombre del autor no esté vacío o sea solo espacios
         regex_autor_valido = re.compile(r'\S')  # Busca al menos un carácter no blanco
 
-        # Extraer el primer autor de cada entrada
-        primeros_datos = []
+        # Agregar el primer autor de cada entrada a medida que se recorren, sin guardarlos en una lista
+        agregador = AgregadorFrecuencias(n_top, modo)
         for entrada in entradas:
             try:
                 valor = entrada.campos.get(campo, '').strip()
-                # Dividir el campo 'author' para obtener solo el primer autor
-                primer_dato = valor.split(",")[0].strip()
+                # Solo el primer autor (los autores BibTeX se separan con " and ", ver Util.Autores)
+                primer_dato = Autores.primer_dato(campo, valor)
 
                 # Verificar que el primer autor no esté vacío usando la expresión regular
                 if regex_autor_valido.search(primer_dato):
-                    primeros_datos.append(primer_dato)
+                    agregador.agregar(primer_dato)
             except KeyError:
                 print(f"Advertencia: El campo '{campo}' no está presente en una entrada.")
                 continue
@@ -102,30 +102,17 @@ class EstadisticasDescriptivas:
                 print(f"Advertencia: El campo '{campo}' no tiene el formato esperado en una entrada.")
                 continue
 
-        # Calcular la frecuencia de cada primer autor
-        contador_autores = Counter(primeros_datos)
-        
-        # Seleccionar los 'n_top' autores más frecuentes
-        autores_frecuentes = dict(contador_autores.most_common(n_top))
-
-        # Calcular estadísticas adicionales
-        total_autores = len(primeros_datos)
-        moda = contador_autores.most_common(1)[0] if contador_autores else None
-        
-        # Ordenar los autores alfabéticamente para calcular la mediana
-        datos_ordenados = sorted(primeros_datos)
-        mediana = datos_ordenados[len(datos_ordenados) // 2] if datos_ordenados else None
-
-        # Crear el diccionario de estadísticas
+        # Seleccionar los 'n_top' autores más frecuentes (heap) y la mediana alfabética (selección lineal)
         stats = {
-            'cantidad': total_autores,
-            'frecuencias': autores_frecuentes,
-            'moda': moda,
-            'mediana': mediana,
+            'cantidad': agregador.cantidad,
+            'frecuencias': dict(agregador.mas_comunes()),
+            'moda': agregador.moda(),
+            'mediana': agregador.mediana(),
         }  
 
         return stats
     
+    @Metricas.cronometrado
     def calcular_estadisticas(entradas, campo):
         """
         Calcula estadísticas descriptivas para el tipo de producto (ENTRYTYPE) u otro campo en un archivo BibTeX.
@@ -165,7 +152,8 @@ class EstadisticasDescriptivas:
             print(f"Error al calcular estadísticas: {str(e)}")
             return None
         
-    def calcular_estadisticas_dos_campos(entradas, campo1, campo2, limite=15):
+    @Metricas.cronometrado
+    def calcular_estadisticas_dos_campos(entradas, campo1, campo2, limite=15, modo="exacto"):
         """
         Calcula estadísticas descriptivas para dos campos en un archivo BibTeX, como (author, journal),
         tomando solo el primer autor si uno de los campos es 'author'.
@@ -175,12 +163,14 @@ class EstadisticasDescriptivas:
             campo1: Primer campo para la estadística (por ejemplo, 'author').
             campo2: Segundo campo para la estadística (por ejemplo, 'year').
             limite: Número máximo de combinaciones más frecuentes a mostrar.
+            modo: "exacto" o "aproximado" (memoria fija para combinaciones de alta cardinalidad
+                como (author, title), ver AgregadorFrecuencias).
 
         Returns:
             Diccionario con estadísticas descriptivas para la combinación de ambos campos.
         """
         try:
-            combinaciones = []
+            agregador = AgregadorFrecuencias(limite, modo)
 
             # Filtramos las combinaciones válidas de campo1 y campo2, procesando solo el primer autor si campo1 o campo2 es "author"
             for entrada in entradas:
@@ -189,11 +179,11 @@ class EstadisticasDescriptivas:
                 
                 # Si campo1 es 'author', tomamos solo el primer autor
                 if campo1 == 'author' and valor1:
-                    valor1 = valor1.split(',')[0].strip()
+                    valor1 = Autores.primer_autor(valor1)
                 
                 # Si campo2 es 'author', tomamos solo el primer autor
                 if campo2 == 'author' and valor2:
-                    valor2 = valor2.split(',')[0].strip()
+                    valor2 = Autores.primer_autor(valor2)
 
                 if campo1 == "ENTRYTYPE":
                     valor1 = entrada.entry_type
@@ -203,24 +193,20 @@ class EstadisticasDescriptivas:
 
                 # Agregar solo si ambos valores existen
                 if valor1 and valor2:
-                    combinaciones.append((valor1, valor2))
+                    agregador.agregar((valor1, valor2))
             
-            if not combinaciones:
+            if not agregador.cantidad:
                 raise ValueError(f"No se encontraron combinaciones válidas para los campos '{campo1}' y '{campo2}' en las entradas.")
             
-            # Calcular frecuencias de las combinaciones
-            frecuencias = Counter(combinaciones)
+            # Obtener las combinaciones más comunes hasta el límite especificado (heap de tamaño `limite`)
+            combinaciones_mas_comunes = agregador.mas_comunes()
             
-            # Obtener las combinaciones más comunes hasta el límite especificado
-            combinaciones_mas_comunes = frecuencias.most_common(limite)
-            
-            # Calcular la "mediana" como valor medio alfabético si es categórico
-            tipos_ordenados = sorted(combinaciones)
-            mediana = tipos_ordenados[len(tipos_ordenados) // 2] if tipos_ordenados else None
+            # Calcular la "mediana" como valor medio alfabético con selección lineal, sin ordenar las combinaciones
+            mediana = agregador.mediana()
 
             # Crear el diccionario de estadísticas
             stats = {
-                'cantidad': len(combinaciones),
+                'cantidad': agregador.cantidad,
                 'frecuencias': {f"{k[0]} - {k[1]}": v for k, v in combinaciones_mas_comunes},
                 'moda': f"{combinaciones_mas_comunes[0][0][0]} - {combinaciones_mas_comunes[0][0][1]}" if combinaciones_mas_comunes else None,
                 'mediana': mediana 
@@ -233,39 +219,76 @@ class EstadisticasDescriptivas:
             return None
 
     @staticmethod
-    def generar_histograma(stats, etiqueta_x):
+    def valor_en_posicion(frecuencias, posicion):
+        """
+        Devuelve el valor que ocuparía la posición `posicion` (desde 0) si se ordenaran todos los
+        datos, usando solo los valores distintos y sus frecuencias (selección lineal, sin ordenarlos).
+        """
+        return AgregadorFrecuencias.valor_en_posicion(frecuencias, posicion)
+
+    @staticmethod
+    def resumen_numerico(frecuencias):
+        """
+        Calcula las mismas estadísticas que `calcular_estadisticas_anio` a partir de un Counter
+        valor -> frecuencia (p. ej. el resultado combinado de varios procesos).
+
+        Returns:
+            Diccionario con las estadísticas, o None si no hay valores.
+        """
+        cantidad = sum(frecuencias.values())
+        if not cantidad:
+            return None
+        ordenados = sorted(frecuencias.items())
+        mitad = cantidad // 2
+        if cantidad % 2:
+            mediana = EstadisticasDescriptivas.valor_en_posicion(frecuencias, mitad)
+        else:
+            mediana = (EstadisticasDescriptivas.valor_en_posicion(frecuencias, mitad - 1) +
+                       EstadisticasDescriptivas.valor_en_posicion(frecuencias, mitad)) / 2
+        minimo, maximo = ordenados[0][0], ordenados[-1][0]
+        return {
+            'cantidad': cantidad,
+            'mediana': mediana,
+            'moda': frecuencias.most_common(1)[0][0],
+            'rango': maximo - minimo,
+            'minimo': minimo,
+            'maximo': maximo,
+            'frecuencias': dict(ordenados),
+        }
+
+    @staticmethod
+    def resumen_categorico(frecuencias, n_top=None):
+        """
+        Calcula las estadísticas de `calcular_estadisticas` (n_top=None) o de
+        `calcular_estadisticas_max15` (n_top=15) a partir de un Counter valor -> frecuencia.
+        """
+        cantidad = sum(frecuencias.values())
+        return {
+            'cantidad': cantidad,
+            'frecuencias': dict(frecuencias.most_common(n_top)) if n_top else dict(frecuencias),
+            'moda': frecuencias.most_common(1)[0] if frecuencias else None,
+            'mediana': EstadisticasDescriptivas.valor_en_posicion(frecuencias, cantidad // 2) if cantidad else None,
+        }
+
+    @staticmethod
+    @Metricas.cronometrado
+    def generar_histograma(stats, etiqueta_x, formato="png", dpi=None):
         """
         Genera un histograma basado en las frecuencias de los datos y lo guarda como imagen en base64.
 
+        Usa una figura propia (sin el estado global de pyplot), por lo que es seguro llamarla desde
+        varios hilos a la vez.
+
         Args:
             stats (dict): Estadísticas descriptivas que incluyen las frecuencias.
             etiqueta_x (str): Etiqueta para el eje X.
+            formato (str): "png" o "svg".
+            dpi (int): Resolución de la imagen PNG.
 
         Returns:
             str: Imagen del histograma en formato base64.
         """
-        # Crear el histograma
-        plt.figure(figsize=(10, 6))
-        plt.bar(stats['frecuencias'].keys(), stats['frecuencias'].values(), color='skyblue')
-        plt.xlabel(etiqueta_x)
-        plt.ylabel('Frecuencia')
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-
-        # Rotar las etiquetas del eje X para que aparezcan verticalmente
-        plt.xticks(rotation=90)
-
-        # Guardar en un buffer en lugar de un archivo
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format="png", bbox_inches="tight")
-        plt.close()
-
-        # Codificar en base64
-        buffer.seek(0)
-        img_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-        buffer.close()
-        
-        # Devolver la imagen en base64
-        return img_base64
+        return Renderizado.histograma(stats['frecuencias'], etiqueta_x, formato, dpi)
 
 
    
@@ -300,41 +323,29 @@ class EstadisticasDescriptivas:
         
         return categorias
 
-    def contar_frecuencia_categorias(entradas, categorias, campo="abstract"):
+    @Metricas.cronometrado
+    def contar_frecuencia_categorias(entradas, categorias, campo="abstract", frases=False):
         """
         Calcula la frecuencia de cada categoría y cada variable en los abstracts.
-        
+
+        Recorre cada abstract una sola vez con un índice palabra -> (categoría, variable). Se puede
+        pasar un EmparejadorCategorias ya construido en lugar del diccionario de categorías para
+        reutilizarlo entre llamadas; con `frases=True` las variables de varias palabras se buscan
+        como frases completas.
+
         Returns:
             Dos diccionarios:
             - frecuencias_categorias: Frecuencia total de cada categoría.
             - frecuencias_variables: Frecuencia de cada sinónimo dentro de cada categoría.
         """
-        frecuencias_categorias = Counter()
-        frecuencias_variables = defaultdict(Counter)
-        
-        for entrada in entradas:
-            if entrada.campos.get(campo, '').strip():  # Asegurar que el abstract existe
-                valor = entrada.campos.get(campo, '').strip()
-                # Convertir abstract en minúsculas y limpiar texto
-                abstract_texto = valor.lower()
-                palabras = re.findall(r'\b\w+\b', abstract_texto)  # Solo palabras, sin puntuación
-                
-                for categoria, variables in categorias.items():
-                    # Contar la frecuencia de cada sinónimo o parte de sinónimo en el abstract
-                    for variable_lista in variables:  # `variable_lista` es una lista de partes de sinónimo
-                        total_conteo = 0  # Conteo acumulado para el sinónimo compuesto
-                        
-                        for parte in variable_lista:  # Cada parte de un sinónimo compuesto
-                            conteo_parte = palabras.count(parte.lower())  # Contar cada parte en el abstract
-                            total_conteo += conteo_parte
-                        
-                        # Asignar el total para el sinónimo compuesto y sumar al total de la categoría
-                        frecuencias_variables[categoria][" - ".join(variable_lista)] += total_conteo
-                        frecuencias_categorias[categoria] += total_conteo  # Sumar al total de la categoría
-        
-        return frecuencias_categorias, frecuencias_variables
+        if isinstance(categorias, EmparejadorCategorias):
+            emparejador = categorias
+        else:
+            emparejador = EmparejadorCategorias(categorias, frases=frases)
+        return emparejador.contar(entradas, campo)
     
-    def generar_nube_palabras_base64(frecuencias_variables):
+    @Metricas.cronometrado
+    def generar_nube_palabras_base64(frecuencias_variables, formato="png", dpi=None):
         """
         Genera una nube de palabras en base a las frecuencias de los sinónimos y retorna la imagen en formato base64.
             
@@ -348,46 +359,37 @@ class EstadisticasDescriptivas:
                 if frecuencia > 0:  # Ignorar sinónimos con frecuencia cero
                     palabras_frecuencias[variable] = frecuencia
 
-        # Crear la nube de palabras
-        nube_palabras = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(palabras_frecuencias)
-        
-        # Convertir la imagen de la nube de palabras a base64
-        buffered = BytesIO()
-        plt.figure(figsize=(10, 5))
-        plt.imshow(nube_palabras, interpolation='bilinear')
-        plt.axis('off')
-        plt.savefig(buffered, format="png", bbox_inches='tight')
-        plt.close()
-        
-        # Convertir el buffer de imagen a base64
-        buffered.seek(0)
-        imagen_base64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
-        
-        return imagen_base64
+        # Crear la nube de palabras y convertirla a base64
+        return Renderizado.nube_palabras(palabras_frecuencias, formato, dpi)
 
 
     @staticmethod
+    @Metricas.cronometrado
     def identificar_journals_mas_publicados(entradas):
         """
         Identifica los 10 journals con más artículos publicados y selecciona los 15 artículos más citados
         en cada journal, vinculando el país del primer autor.
 
+        Las citaciones y los países se leen de las columnas del enriquecimiento del corpus
+        (Util.Enriquecimiento), que se calculan una sola vez; los artículos sin citaciones cuentan
+        como 0 y los que no tienen país no aportan ninguno, de modo que el resultado es reproducible.
+
         Args:
-            entradas: Lista de objetos EntradaBib con datos de los artículos.
+            entradas: Lista de objetos EntradaBib con datos de los artículos (o un BibCorpus).
 
         Returns:
             Un diccionario que contiene los journals, citaciones totales y países asociados.
         """
+        columnas = Enriquecimiento.de(entradas)
         journal_counts = Counter()
         journal_articles = defaultdict(list)
-        journal_citations = {}
 
-        for entrada in entradas:
+        for fila, entrada in enumerate(entradas):
             # Usar el journal o ISSN como identificador
             journal = entrada.campos.get("journal") or entrada.campos.get("issn")
             if journal:
                 journal_counts[journal] += 1
-                journal_articles[journal].append(entrada)
+                journal_articles[journal].append(fila)
 
         # Seleccionar los 10 journals con más publicaciones
         top_10_journals = [journal for journal, _ in journal_counts.most_common(10)]
@@ -396,47 +398,31 @@ class EstadisticasDescriptivas:
         journal_data = {}
         for journal in top_10_journals:
             articles = journal_articles[journal]
-            total_citations = 0  # Acumulador de citaciones para cada journal
-            
-            # Obtener y asignar citaciones
-            top_articles_info = []
-            for article in articles:
-                note = article.campos.get("note", "")
-                match = re.search(r"Cited by: (\d+)", note)
-                if match:
-                    citations = int(match.group(1))
-                else:
-                    citations = random.randint(0, 250)
-                article.campos["citations"] = citations
-                total_citations += citations  # Acumular citaciones del journal
-                
-                # Solo guardar país del primer autor
-                country = article.campos.get("first_author_country")
-                if not country:
-                    country = random.choice(["USA", "UK", "Germany", "France", "Japan", "China", "India"])
-                
-                top_articles_info.append({"citations": citations, "country": country})
+            total_citations = sum(max(columnas.citas[fila], 0) for fila in articles)
 
-            # Ordenar por citaciones y tomar los 15 artículos más citados
-            top_articles = sorted(top_articles_info, key=lambda x: x["citations"], reverse=True)[:15]
+            # Ordenar por citaciones y tomar los 15 artículos más citados (heap de tamaño 15)
+            top_articles = Enriquecimiento.mas_citados(articles, columnas, 15)
 
-            # Guardar la información de cada journal: total de citaciones y países únicos
-            countries = list(set(article["country"] for article in top_articles))
+            # Guardar la información de cada journal: total de citaciones y países únicos (país del primer autor)
+            countries = list(dict.fromkeys(
+                pais for pais in (columnas.pais_de(fila) for fila in top_articles) if pais is not None))
             journal_data[journal] = {"total_citations": total_citations, "countries": countries}
 
         return journal_data
 
     @staticmethod
-    def generar_grafo_journals(journal_data):
+    def construir_grafo_journals(journal_data):
         """
-        Genera un grafo de relaciones entre journals y países.
+        Construye el grafo de relaciones entre journals y países y calcula su layout.
 
         Args:
             journal_data: Diccionario con información de los journals, sus citaciones y países asociados.
 
         Returns:
-            La imagen del grafo en formato base64.
+            Una tupla (grafo de networkx, posiciones de los nodos).
         """
+        import networkx as nx  # Solo hace falta al construir los artefactos, no al arrancar con la caché
+
         G = nx.Graph()
 
         # Crear nodos y aristas en el grafo
@@ -452,26 +438,63 @@ class EstadisticasDescriptivas:
                 G.add_node(country, tipo="country")
                 G.add_edge(journal, country)  # Conexión entre journal y país
 
-        # Dibujar el grafo y convertirlo en imagen base64
-        plt.figure(figsize=(12, 8))
-        pos = nx.spring_layout(G, seed=42)  # Layout del grafo
+        # Layout del grafo
+        pos = nx.spring_layout(G, seed=42)
+        return G, pos
+
+    @staticmethod
+    def datos_grafo_journals(journal_data):
+        """
+        Datos del grafo de journals y países listos para serializar en JSON (nodos con su tipo,
+        tamaño y posición, y aristas), para dibujarlo en el cliente.
+        """
+        G, pos = EstadisticasDescriptivas.construir_grafo_journals(journal_data)
+        nodos = [
+            {
+                "id": node,
+                "tipo": G.nodes[node]["tipo"],
+                "size": G.nodes[node].get("size", 300),
+                "x": float(pos[node][0]),
+                "y": float(pos[node][1]),
+            }
+            for node in G.nodes
+        ]
+        aristas = [[origen, destino] for origen, destino in G.edges]
+        return {"nodos": nodos, "aristas": aristas}
+
+    @staticmethod
+    @Metricas.cronometrado
+    def generar_grafo_journals(journal_data, formato="png", dpi=None):
+        """
+        Genera un grafo de relaciones entre journals y países.
+
+        Args:
+            journal_data: Diccionario con información de los journals, sus citaciones y países asociados.
+
+        Returns:
+            La imagen del grafo en formato base64.
+        """
+        G, pos = EstadisticasDescriptivas.construir_grafo_journals(journal_data)
 
         # Configurar colores y tamaños
         colors = {"journal": "skyblue", "country": "lightcoral"}
         node_colors = [colors[G.nodes[node]["tipo"]] for node in G.nodes]
         node_sizes = [G.nodes[node]["size"] if G.nodes[node]["tipo"] == "journal" else 300 for node in G.nodes]
 
-        # Dibujar el grafo
-        nx.draw(G, pos, with_labels=True, node_size=node_sizes, node_color=node_colors, font_size=8, font_weight="bold")
+        # Dibujar el grafo sobre una figura propia y codificarlo en base64
+        return Renderizado.grafo(G, pos, node_sizes, node_colors, formato, dpi)
 
-        # Guardar el grafo en un buffer en formato PNG
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format="png")
-        plt.close()
-        
-        # Codificar la imagen en base64
-        buffer.seek(0)
-        img_base64 = base64.b64encode(buffer.read()).decode("utf-8")
-        buffer.close()
+    @staticmethod
+    @Metricas.cronometrado
+    def generar_grafo_completo(entradas, tipo="journal_pais", formato="png", dpi=None, directorio_cache=None):
+        """
+        Genera la red journal–país ("journal_pais") o de coautoría ("coautores") con todo el corpus,
+        con layout espectral disperso y posiciones en caché (ver Util.GrafoGrande).
+
+        Returns:
+            La imagen del grafo en formato base64; el título incluye el tiempo del layout.
+        """
+        from Util.GrafoGrande import GrafoGrande  # scipy se carga con el primer grafo completo
 
-        return img_base64
\ No newline at end of file
+        imagen, _ = GrafoGrande.generar(entradas, tipo, formato, dpi, directorio_cache)
+        return imagen
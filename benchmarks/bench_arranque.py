@@ -0,0 +1,120 @@
+"""
+Informe de arranque y memoria por worker de gunicorn, con y sin preload_app (gunicorn.conf.py).
+
+Para cada tamaño se genera un corpus sintético en un directorio de trabajo temporal, se llenan las
+cachés con un primer `import server` y se levanta gunicorn con PRECARGA=0 y PRECARGA=1. Se mide el
+tiempo hasta que todos los workers terminan de iniciar (la línea de post_worker_init en el log),
+se envían algunas peticiones y se lee /proc/<pid>/smaps_rollup del maestro y de cada worker. La
+suma de PSS es la memoria real del conjunto: las páginas compartidas se cuentan una sola vez.
+
+Uso (desde la raíz del repositorio; solo Linux):
+    python benchmarks/bench_arranque.py --tamanos 20000 100000 --workers 4
+"""
+import argparse
+import os
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import ARCHIVO_CATEGORIAS, escribir_archivo
+from Util.Metricas import Metricas
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIVO_SERVIDOR = "referencias_ordenadas_GnomeSort_year.bib"
+RUTAS = ["/api/stats/year", "/api/stats/author", "/api/stats2/author/year", "/api/categorias",
+         "/api/cubo?agrupar=year&agrupar=categoria", "/search?q=computational+thinking"]
+patron_worker = re.compile(r"Worker (\d+): RSS")
+
+
+def puerto_libre():
+    with socket.socket() as conexion:
+        conexion.bind(("127.0.0.1", 0))
+        return conexion.getsockname()[1]
+
+
+def preparar(directorio, n):
+    """Corpus sintético en la estructura que espera server.py y cachés ya construidas."""
+    os.makedirs(os.path.join(directorio, "Util", "outputFile"))
+    shutil.copy(ARCHIVO_CATEGORIAS, os.path.join(directorio, "Util", "Categorias.csv"))
+    escribir_archivo(os.path.join(directorio, "Util", "outputFile", ARCHIVO_SERVIDOR), n)
+    subprocess.run([sys.executable, "-c", "import server"], cwd=directorio, env=entorno(), check=True,
+                   capture_output=True)
+
+
+def entorno(**extra):
+    return dict(os.environ, PYTHONPATH=RAIZ + os.pathsep + os.environ.get("PYTHONPATH", ""),
+                VIGILAR_NUEVOS="0", **extra)
+
+
+def medir_gunicorn(directorio, precarga, workers, peticiones, espera_maxima=600):
+    """Levanta gunicorn, espera a todos los workers, envía peticiones y mide la memoria."""
+    puerto = puerto_libre()
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", os.path.join(RAIZ, "gunicorn.conf.py"), "server:app"],
+        cwd=directorio, env=entorno(PRECARGA="1" if precarga else "0", PORT=str(puerto), WEB_CONCURRENCY=str(workers)),
+        stderr=subprocess.PIPE, text=True)
+
+    pids, listos = [], threading.Event()
+    def leer_log():
+        for linea in proceso.stderr:
+            coincidencia = patron_worker.search(linea)
+            if coincidencia:
+                pids.append(int(coincidencia.group(1)))
+                if len(pids) == workers:
+                    listos.set()
+    threading.Thread(target=leer_log, daemon=True).start()
+
+    try:
+        if not listos.wait(espera_maxima):
+            raise RuntimeError("gunicorn no terminó de iniciar los workers")
+        arranque = time.perf_counter() - inicio
+        for i in range(peticiones):
+            with urllib.request.urlopen(f"http://127.0.0.1:{puerto}{RUTAS[i % len(RUTAS)]}") as respuesta:
+                respuesta.read()
+        maestro = Metricas.memoria_proceso(proceso.pid)
+        memoria_workers = [Metricas.memoria_proceso(pid) for pid in pids]
+    finally:
+        proceso.send_signal(signal.SIGTERM)
+        proceso.wait(60)
+    return arranque, maestro, memoria_workers
+
+
+def mb(bytes_):
+    return bytes_ / 2**20
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempo de arranque y RSS por worker de gunicorn.")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[20000, 100000])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--peticiones", type=int, default=200, help="Peticiones enviadas antes de medir")
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("Este informe necesita /proc/<pid>/smaps_rollup (Linux).")
+
+    for n in args.tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            preparar(directorio, n)
+            print(f"\n{n} entradas, {args.workers} workers, {args.peticiones} peticiones")
+            print(f"{'precarga':<9} {'arranque s':>10} {'proceso':<12} {'RSS MB':>8} {'PSS MB':>8} "
+                  f"{'compartida':>11} {'privada':>8}")
+            for precarga in (False, True):
+                arranque, maestro, memoria_workers = medir_gunicorn(directorio, precarga, args.workers, args.peticiones)
+                etiqueta = "sí" if precarga else "no"
+                filas = [("maestro", maestro)] + [(f"worker {i}", memoria) for i, memoria in enumerate(memoria_workers)]
+                for nombre, memoria in filas:
+                    print(f"{etiqueta:<9} {arranque:10.2f} {nombre:<12} {mb(memoria['rss']):8.0f} {mb(memoria['pss']):8.0f} "
+                          f"{mb(memoria['compartida']):11.0f} {mb(memoria['privada']):8.0f}")
+                total_pss = sum(memoria["pss"] for _, memoria in filas)
+                print(f"{etiqueta:<9} {arranque:10.2f} {'total PSS':<12} {'':>8} {mb(total_pss):8.0f}")
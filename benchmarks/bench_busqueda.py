@@ -0,0 +1,76 @@
+"""
+Mide el índice invertido de Util.IndiceBusqueda sobre corpus sintéticos: tiempo de construcción,
+tamaño en disco y latencia de consultas (términos, frases y filtros) frente a recorrer las
+entradas buscando el texto, que es lo que había que hacer antes.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_busqueda.py --tamanos 10000 100000 --max-recorrido 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import escribir_archivo
+from Util.BibCorpus import BibCorpus
+from Util.IndiceBusqueda import IndiceBusqueda
+
+CONSULTAS = [
+    ("término", "students", {}),
+    ("varios términos", "computational thinking programming", {}),
+    ("frase", '"computational thinking"', {}),
+    ("frase + término", '"problem solving" students', {}),
+    ("con filtros", "programming", {"anio_min": 2015, "anio_max": 2020, "tipos": ["article"]}),
+]
+
+
+def recorrido(entradas, texto):
+    """Búsqueda sin índice: subcadena en title, abstract o keywords de cada entrada."""
+    texto = texto.strip('"').lower()
+    return sum(1 for entrada in entradas
+               if any(texto in entrada.campos.get(campo, "").lower() for campo in IndiceBusqueda.CAMPOS))
+
+
+def latencia_ms(funcion, repeticiones=20):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2], tiempos[int(len(tiempos) * 0.95) - 1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del índice invertido de búsqueda.")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[10000, 100000])
+    parser.add_argument("--max-recorrido", type=int, default=100000, help="Entradas máximas para medir el recorrido")
+    args = parser.parse_args()
+
+    for n in args.tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            corpus = BibCorpus.desde_archivo(escribir_archivo(os.path.join(directorio, "sintetico.bib"), n))
+            ruta_indice = os.path.join(directorio, "busqueda.idx")
+            inicio = time.perf_counter()
+            IndiceBusqueda.construir(corpus, ruta_indice)
+            construccion = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            indice = IndiceBusqueda.cargar(ruta_indice)
+            carga = (time.perf_counter() - inicio) * 1000
+            print(f"\n{n} entradas: construcción {construccion:.1f} s, carga {carga:.1f} ms, "
+                  f"{os.path.getsize(ruta_indice) / 2**20:.1f} MB, {len(indice)} términos")
+
+            print(f"{'consulta':<18} {'resultados':>10} {'p50 ms':>8} {'p95 ms':>8} {'recorrido ms':>13}")
+            for nombre, consulta, filtros in CONSULTAS:
+                total = indice.buscar(consulta, **filtros)["total"]
+                p50, p95 = latencia_ms(lambda: indice.buscar(consulta, **filtros))
+                columna_recorrido = f"{'-':>13}"
+                if n <= args.max_recorrido and not filtros:
+                    inicio = time.perf_counter()
+                    recorrido(corpus, consulta)
+                    columna_recorrido = f"{(time.perf_counter() - inicio) * 1000:13.0f}"
+                print(f"{nombre:<18} {total:>10} {p50:8.2f} {p95:8.2f} {columna_recorrido}")
+            del indice
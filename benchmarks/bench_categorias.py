@@ -0,0 +1,81 @@
+"""
+Compara el conteo de categorías original (palabras.count por sinónimo) con EmparejadorCategorias.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_categorias.py --n 50000 --sinonimos 400
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import ARCHIVO_CATEGORIAS, PALABRAS, escribir_archivo
+from app import EstadisticasDescriptivas
+from Util.BibCorpus import BibCorpus
+from Util.EmparejadorCategorias import EmparejadorCategorias
+
+
+def contar_frecuencia_categorias_anterior(entradas, categorias, campo="abstract"):
+    """Copia de la implementación original: O(abstracts × sinónimos × palabras)."""
+    frecuencias_categorias = Counter()
+    frecuencias_variables = defaultdict(Counter)
+    for entrada in entradas:
+        if entrada.campos.get(campo, '').strip():
+            palabras = re.findall(r'\b\w+\b', entrada.campos.get(campo, '').strip().lower())
+            for categoria, variables in categorias.items():
+                for variable_lista in variables:
+                    total_conteo = 0
+                    for parte in variable_lista:
+                        total_conteo += palabras.count(parte.lower())
+                    frecuencias_variables[categoria][" - ".join(variable_lista)] += total_conteo
+                    frecuencias_categorias[categoria] += total_conteo
+    return frecuencias_categorias, frecuencias_variables
+
+
+def categorias_ampliadas(total_sinonimos, semilla=7):
+    """Categorias.csv más sinónimos sintéticos hasta llegar a `total_sinonimos`."""
+    categorias = EstadisticasDescriptivas.cargar_datos(ARCHIVO_CATEGORIAS)
+    actuales = sum(len(variables) for variables in categorias.values())
+    rnd = random.Random(semilla)
+    extra = categorias.setdefault("Sintéticos", [])
+    for i in range(max(0, total_sinonimos - actuales)):
+        extra.append([rnd.choice(PALABRAS) if i % 3 == 0 else f"termino{i}"])
+    return categorias
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return time.perf_counter() - inicio, resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del conteo de categorías.")
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--sinonimos", type=int, default=400)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        entradas = BibCorpus.desde_archivo(escribir_archivo(os.path.join(directorio, "sintetico.bib"), args.n),
+                                           texto_en_memoria=True)
+    categorias = categorias_ampliadas(args.sinonimos)
+    total = sum(len(variables) for variables in categorias.values())
+    print(f"{len(entradas)} abstracts, {total} sinónimos")
+
+    t_anterior, esperado = medir(lambda: contar_frecuencia_categorias_anterior(entradas, categorias))
+    t_construccion, emparejador = medir(lambda: EmparejadorCategorias(categorias))
+    t_nuevo, obtenido = medir(lambda: emparejador.contar(entradas))
+    t_frases, _ = medir(lambda: EmparejadorCategorias(categorias, frases=True).contar(entradas))
+
+    if obtenido != esperado or list(obtenido) != list(esperado):
+        raise AssertionError("EmparejadorCategorias no reproduce el conteo original")
+    print(f"{'anterior':<28} {t_anterior:8.3f} s")
+    print(f"{'emparejador (construcción)':<28} {t_construccion:8.3f} s")
+    print(f"{'emparejador':<28} {t_nuevo:8.3f} s  ({t_anterior / t_nuevo:.1f}x)")
+    print(f"{'emparejador con frases':<28} {t_frases:8.3f} s")
@@ -0,0 +1,75 @@
+"""
+Compara Util.RedCoautoria (matriz dispersa A = BᵀB) con la red equivalente de networkx sobre
+corpus sintéticos: construcción, PageRank y componentes conexas, y la diferencia máxima entre
+los PageRank de ambas.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_coautoria.py --tamanos 10000 100000 --max-networkx 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from itertools import combinations
+
+import networkx as nx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import escribir_archivo
+from Util.Autores import Autores
+from Util.BibCorpus import BibCorpus
+from Util.RedCoautoria import RedCoautoria
+
+
+def red_networkx(entradas):
+    """La red como se armaba antes: un nodo por autor y una arista por par, con peso = artículos en común."""
+    G = nx.Graph()
+    for entrada in entradas:
+        autores = Autores.normalizar(entrada.campos.get("author", ""))
+        G.add_nodes_from(autores)
+        if len(autores) > RedCoautoria.MAX_AUTORES_POR_ENTRADA:
+            continue
+        for a, b in combinations(autores, 2):
+            if G.has_edge(a, b):
+                G[a][b]["weight"] += 1
+            else:
+                G.add_edge(a, b, weight=1)
+    return G
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return time.perf_counter() - inicio, resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la red de coautoría dispersa.")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[10000, 100000])
+    parser.add_argument("--max-networkx", type=int, default=100000, help="Entradas máximas para medir networkx")
+    args = parser.parse_args()
+
+    print(f"{'n':>8}  {'versión':<9} {'autores':>8} {'aristas':>9} {'construir':>10} {'pagerank':>9} "
+          f"{'componentes':>12} {'dif. pagerank':>14}")
+    for n in args.tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            corpus = BibCorpus.desde_archivo(escribir_archivo(os.path.join(directorio, "sintetico.bib"), n))
+
+            construir, red = cronometrar(lambda: RedCoautoria.construir(corpus))
+            segundos_pagerank, pagerank = cronometrar(red.pagerank)
+            segundos_componentes, (n_componentes, _) = cronometrar(red.componentes)
+            print(f"{n:>8}  {'dispersa':<9} {len(red):>8} {red.n_aristas:>9} {construir:10.2f} "
+                  f"{segundos_pagerank:9.2f} {segundos_componentes:12.2f} {'':>14}")
+
+            if n > args.max_networkx:
+                continue
+            construir, G = cronometrar(lambda: red_networkx(corpus))
+            segundos_pagerank, pagerank_nx = cronometrar(lambda: nx.pagerank(G, weight="weight"))
+            segundos_componentes, n_componentes_nx = cronometrar(lambda: nx.number_connected_components(G))
+            diferencia = max(abs(pagerank[i] - pagerank_nx[autor]) for i, autor in enumerate(red.autores))
+            print(f"{n:>8}  {'networkx':<9} {G.number_of_nodes():>8} {G.number_of_edges():>9} {construir:10.2f} "
+                  f"{segundos_pagerank:9.2f} {segundos_componentes:12.2f} {diferencia:14.2e}")
+            if n_componentes_nx != n_componentes:
+                print(f"  componentes distintas: {n_componentes} frente a {n_componentes_nx}")
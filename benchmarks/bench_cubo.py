@@ -0,0 +1,84 @@
+"""
+Mide el cubo OLAP de Util.CuboOLAP sobre corpus sintéticos: construcción (junto con los cortes de
+categorías, en la misma pasada), tamaño serializado y latencia de consultas frente a recorrer las
+entradas filtradas y contar sus categorías con EmparejadorCategorias, que es lo que había que
+hacer antes para cada pregunta.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_cubo.py --tamanos 10000 100000
+"""
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import escribir_archivo, ARCHIVO_CATEGORIAS
+from app import EstadisticasDescriptivas
+from Util.BibCorpus import BibCorpus
+from Util.CortesCategorias import CortesCategorias
+from Util.CuboOLAP import CuboOLAP
+from Util.EmparejadorCategorias import EmparejadorCategorias
+
+CONSULTAS = [
+    ("total", (), {}, "entradas"),
+    ("roll-up año", ("year",), {}, "entradas"),
+    ("slice artículos", ("categoria",), {"ENTRYTYPE": ["article"]}, "apariciones"),
+    ("drill-down", ("year", "categoria"), {"ENTRYTYPE": ["article"]}, "apariciones"),
+    ("journal x año", ("journal", "year"), {}, "entradas"),
+]
+
+
+def recorrido(entradas, emparejador, agrupar, filtros):
+    """Sin cubo: filtra las entradas, las agrupa y cuenta las categorías de cada grupo."""
+    grupos = {}
+    for entrada in entradas:
+        if all(CuboOLAP.valor(entrada, dimension) in valores for dimension, valores in filtros.items()):
+            clave = tuple(CuboOLAP.valor(entrada, dimension) for dimension in agrupar if dimension != "categoria")
+            grupos.setdefault(clave, []).append(entrada)
+    return {clave: emparejador.contar(grupo) for clave, grupo in grupos.items()}
+
+
+def latencia_ms(funcion, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return min(tiempos)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del cubo OLAP.")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[10000, 100000])
+    parser.add_argument("--max-recorrido", type=int, default=100000, help="Entradas máximas para medir el recorrido")
+    args = parser.parse_args()
+
+    emparejador = EmparejadorCategorias(EstadisticasDescriptivas.cargar_datos(ARCHIVO_CATEGORIAS))
+    for n in args.tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            corpus = BibCorpus.desde_archivo(escribir_archivo(os.path.join(directorio, "sintetico.bib"), n))
+
+            inicio = time.perf_counter()
+            CortesCategorias.desde_entradas(corpus, emparejador)
+            solo_cortes = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            cubo = CuboOLAP.desde_entradas(corpus, emparejador, cortes=CortesCategorias(emparejador.variables))
+            construccion = time.perf_counter() - inicio
+            print(f"\n{n} entradas: {len(cubo)} celdas, cubo + cortes {construccion:.2f} s "
+                  f"(solo cortes {solo_cortes:.2f} s), {len(pickle.dumps(cubo)) / 2**20:.1f} MB serializado")
+
+            print(f"{'consulta':<16} {'filas':>7} {'cubo ms':>8} {'recorrido ms':>13}")
+            for nombre, agrupar, filtros, medida in CONSULTAS:
+                filas = cubo.consultar(agrupar, filtros, medida)
+                # Sin la caché de resultados: se mide el cálculo sobre las celdas
+                ms_cubo = latencia_ms(lambda: (cubo._memo.clear(), cubo.consultar(agrupar, filtros, medida)))
+                columna_recorrido = f"{'-':>13}"
+                if n <= args.max_recorrido:
+                    inicio = time.perf_counter()
+                    recorrido(corpus, emparejador, agrupar, filtros)
+                    columna_recorrido = f"{(time.perf_counter() - inicio) * 1000:13.0f}"
+                print(f"{nombre:<16} {len(filas):>7} {ms_cubo:8.2f} {columna_recorrido}")
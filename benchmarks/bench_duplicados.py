@@ -0,0 +1,115 @@
+"""
+Mide Util.CasiDuplicados sobre corpus sintéticos con casi duplicados insertados: una fracción de
+las entradas se vuelve a agregar con el título en otro formato, los autores como "Nombre Apellido",
+el abstract con una nota de copyright, otra fuente y sin DOI, como llegan desde otra base de datos.
+
+Reporta el tiempo de las firmas y del LSH, la cobertura (copias agrupadas con su original) y la
+precisión (entradas descartadas que eran copias), y lo compara con la comparación de todos los
+pares (Jaccard exacto) en los corpus pequeños.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_duplicados.py --tamanos 5000 100000 --fraccion 0.05 --max-pares 5000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import generar_textos
+from Util.BibCorpus import BibCorpus
+from Util.CasiDuplicados import CasiDuplicados
+
+patron_campo = re.compile(r"^ (\w+) = \{(.*)\},?$")
+
+
+def perturbar(texto, rnd, indice):
+    """Copia de una entrada generada como la exportaría otra base de datos."""
+    lineas = texto.strip().splitlines()
+    tipo = lineas[0][1:lineas[0].index("{")]
+    campos = {}
+    for linea in lineas[1:-1]:
+        coincidencia = patron_campo.match(linea)
+        if coincidencia:
+            campos[coincidencia.group(1)] = coincidencia.group(2)
+    campos.pop("doi", None)
+    campos["title"] = campos["title"].title() + rnd.choice([".", "", ":", " (extended abstract)"])
+    campos["author"] = " and ".join(" ".join(reversed(autor.split(", "))) for autor in campos["author"].split(" and "))
+    campos["abstract"] += rnd.choice(["", " © 2023 Elsevier Ltd. All rights reserved.", " Copyright IEEE."])
+    campos["source"] = "Copia"
+    cuerpo = ",\n".join(f" {campo} = {{{valor}}}" for campo, valor in sorted(campos.items()))
+    return f"@{tipo}{{copia{indice},\n{cuerpo}\n}}\n\n"
+
+
+def escribir_con_duplicados(ruta, n, fraccion, semilla=42):
+    """Escribe el corpus con las copias al final; devuelve {fila de la copia: fila del original}."""
+    rnd = random.Random(semilla)
+    textos = list(generar_textos(n, semilla))
+    originales = rnd.sample(range(n), int(n * fraccion))
+    copias = {}
+    with open(ruta, 'w', encoding='utf-8') as salida:
+        for texto in textos:
+            salida.write(texto)
+        for posicion, original in enumerate(originales):
+            salida.write(perturbar(textos[original], rnd, posicion))
+            copias[n + posicion] = original
+    return copias
+
+
+def todos_los_pares(detector, entradas):
+    """Jaccard exacto de todos los pares de conjuntos de shingles: O(n²)."""
+    conjuntos = [set(detector.shingles(entrada).tolist()) for entrada in entradas]
+    pares = 0
+    for i in range(len(conjuntos)):
+        for j in range(i + 1, len(conjuntos)):
+            union = len(conjuntos[i] | conjuntos[j])
+            if union and len(conjuntos[i] & conjuntos[j]) / union >= detector.umbral:
+                pares += 1
+    return pares
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la detección de casi duplicados.")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[5000, 100000])
+    parser.add_argument("--fraccion", type=float, default=0.05, help="Fracción de entradas duplicadas")
+    parser.add_argument("--umbral", type=float, default=CasiDuplicados.UMBRAL)
+    parser.add_argument("--max-pares", type=int, default=5000, help="Entradas máximas para comparar todos los pares")
+    args = parser.parse_args()
+
+    detector = CasiDuplicados(args.umbral)
+    print(f"LSH: {detector.bandas} bandas x {detector.filas_banda} filas, umbral {args.umbral}")
+    print(f"{'n':>8} {'copias':>7} {'firmas s':>9} {'LSH s':>7} {'grupos':>7} {'cobertura':>10} "
+          f"{'precisión':>10} {'todos los pares s':>18}")
+    for n in args.tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "sintetico.bib")
+            copias = escribir_con_duplicados(ruta, n, args.fraccion)
+            corpus = BibCorpus.desde_archivo(ruta)
+
+            inicio = time.perf_counter()
+            firmas = detector.firmas(corpus)
+            segundos_firmas = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            grupos, _ = detector.agrupar(corpus, firmas)
+            segundos_lsh = time.perf_counter() - inicio
+
+            grupo_de = {fila: numero for numero, grupo in enumerate(grupos) for fila in grupo}
+            encontradas = sum(1 for copia, original in copias.items()
+                              if copia in grupo_de and grupo_de[copia] == grupo_de.get(original))
+            descartadas = [fila for grupo in grupos for fila in grupo[1:]]
+            correctas = sum(1 for fila in descartadas
+                            if fila in copias or any(copias.get(otra) == fila for otra in grupos[grupo_de[fila]]))
+            cobertura = encontradas / len(copias) if copias else 1.0
+            precision = correctas / len(descartadas) if descartadas else 1.0
+
+            columna_pares = f"{'-':>18}"
+            if len(corpus) <= args.max_pares:
+                inicio = time.perf_counter()
+                todos_los_pares(detector, corpus)
+                columna_pares = f"{time.perf_counter() - inicio:18.1f}"
+            print(f"{len(corpus):>8} {len(copias):>7} {segundos_firmas:9.2f} {segundos_lsh:7.2f} "
+                  f"{len(grupos):>7} {cobertura:10.3f} {precision:10.3f} {columna_pares}")
@@ -0,0 +1,80 @@
+"""
+Compara el filtro por DOI original de scripts/Filter.py (bibtexparser, todo en memoria) con
+FiltroBib en streaming: mismas entradas, tiempo y pico de memoria.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_filtro.py --tamanos 1000 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import escribir_archivo
+from Util.BibFileUtil import BibFileUtil
+from Util.FiltroBib import FiltroBib, RangoAnios, TieneCampo, TiposEntrada, Y
+
+
+def filtrar_por_doi_anterior(ruta_archivo_bib, archivo_salida):
+    """Copia del flujo original de scripts/Filter.py: leer_bibtex + filtrar_por_doi + guardar_bibtex."""
+    import bibtexparser
+
+    with open(ruta_archivo_bib, encoding='utf-8') as bibtex_file:
+        bib_database = bibtexparser.load(bibtex_file)
+    entradas_con_doi = [entry for entry in bib_database.entries if 'doi' in entry]
+
+    bib_database = bibtexparser.bibdatabase.BibDatabase()
+    bib_database.entries = entradas_con_doi
+    with open(archivo_salida, 'w', encoding='utf-8') as bibtex_file:
+        writer = bibtexparser.bwriter.BibTexWriter()
+        bibtex_file.write(writer.write(bib_database))
+    return len(entradas_con_doi)
+
+
+def medir(funcion, *argumentos):
+    """Devuelve (segundos, pico de memoria en MB, resultado)."""
+    inicio = time.perf_counter()
+    resultado = funcion(*argumentos)
+    segundos = time.perf_counter() - inicio
+
+    # La memoria se mide en una segunda pasada: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    funcion(*argumentos)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 2**20, resultado
+
+
+def claves(ruta):
+    return [entrada.clave for entrada in BibFileUtil.iter_entradas(ruta)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del filtro por DOI.")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[1000, 5000])
+    args = parser.parse_args()
+
+    print(f"{'n':>8}  {'variante':<26} {'segundos':>9} {'pico MB':>9} {'entradas':>9}")
+    for n in args.tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = escribir_archivo(os.path.join(directorio, "sintetico.bib"), n)
+            salida_anterior = os.path.join(directorio, "anterior.bib")
+            salida_nueva = os.path.join(directorio, "nueva.bib")
+
+            variantes = [
+                ("Filter.py (bibtexparser)", filtrar_por_doi_anterior, salida_anterior),
+                ("FiltroBib doi", lambda r, s: FiltroBib(TieneCampo("doi")).escribir(r, s)["cumplen"], salida_nueva),
+                ("FiltroBib tipo+años+doi",
+                 lambda r, s: FiltroBib(Y(TiposEntrada("article"), RangoAnios(2010, 2015), TieneCampo("doi")))
+                 .escribir(r, s)["cumplen"], os.path.join(directorio, "combinado.bib")),
+            ]
+            for nombre, funcion, salida in variantes:
+                segundos, pico, total = medir(funcion, ruta, salida)
+                print(f"{n:>8}  {nombre:<26} {segundos:9.3f} {pico:9.1f} {total:>9}")
+
+            iguales = sorted(claves(salida_anterior)) == sorted(claves(salida_nueva))
+            print(f"{'':>8}  mismas entradas con DOI que el filtro original: {iguales}")
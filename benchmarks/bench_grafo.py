@@ -0,0 +1,53 @@
+"""
+Compara el layout espectral disperso de Util.GrafoGrande con nx.spring_layout (el que usa
+generar_grafo_journals) sobre las redes journal–país y de coautoría de corpus sintéticos.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_grafo.py --tamanos 5000 20000 --max-spring 3000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import networkx as nx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import escribir_archivo
+from Util.BibCorpus import BibCorpus
+from Util.GrafoGrande import GrafoGrande
+
+
+def spring(grafo):
+    G = nx.Graph()
+    G.add_nodes_from(range(len(grafo)))
+    G.add_edges_from(zip(grafo.origen.tolist(), grafo.destino.tolist()))
+    inicio = time.perf_counter()
+    nx.spring_layout(G, seed=42)
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de layouts de grafos grandes.")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[5000, 20000])
+    parser.add_argument("--max-spring", type=int, default=3000, help="Nodos máximos para medir spring_layout")
+    args = parser.parse_args()
+
+    print(f"{'n':>8}  {'grafo':<13} {'nodos':>7} {'aristas':>8} {'construir':>10} {'espectral':>10} {'spring':>8}")
+    for n in args.tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            corpus = BibCorpus.desde_archivo(escribir_archivo(os.path.join(directorio, "sintetico.bib"), n))
+            for tipo in GrafoGrande.TIPOS:
+                inicio = time.perf_counter()
+                grafo = GrafoGrande.construir(corpus, tipo)
+                construir = time.perf_counter() - inicio
+
+                inicio = time.perf_counter()
+                GrafoGrande.layout_espectral(grafo)
+                espectral = time.perf_counter() - inicio
+
+                segundos_spring = f"{spring(grafo):8.2f}" if len(grafo) <= args.max_spring else f"{'-':>8}"
+                print(f"{n:>8}  {tipo:<13} {len(grafo):>7} {grafo.n_aristas:>8} {construir:10.3f} "
+                      f"{espectral:10.3f} {segundos_spring}")
@@ -0,0 +1,53 @@
+"""
+Compara la memoria que ocupan las entradas como lista de EntradaBib y como BibCorpus columnar.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_memoria.py --tamanos 10000 50000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import escribir_archivo
+from Util.BibCorpus import BibCorpus
+from Util.BibFileUtil import BibFileUtil
+
+
+def memoria_retenida(construir, ruta):
+    """MB que quedan ocupados por la estructura construida (no el pico de construcción)."""
+    gc.collect()
+    tracemalloc.start()
+    estructura = construir(ruta)
+    gc.collect()
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del estructura
+    return actual / 2**20
+
+
+VARIANTES = {
+    "lista EntradaBib": BibFileUtil.leer_archivo_bib,
+    "BibCorpus": BibCorpus.desde_archivo,
+    "BibCorpus + texto": lambda ruta: BibCorpus.desde_archivo(ruta, texto_en_memoria=True),
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de memoria del almacenamiento de entradas.")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[10000, 50000])
+    args = parser.parse_args()
+
+    print(f"{'n':>8}  {'variante':<18} {'MB':>8} {'x archivo':>10}")
+    for n in args.tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = escribir_archivo(os.path.join(directorio, "sintetico.bib"), n)
+            megabytes_archivo = os.path.getsize(ruta) / 2**20
+            print(f"{n:>8}  {'archivo .bib':<18} {megabytes_archivo:8.1f} {1:10.2f}")
+            for nombre, construir in VARIANTES.items():
+                megabytes = memoria_retenida(construir, ruta)
+                print(f"{n:>8}  {nombre:<18} {megabytes:8.1f} {megabytes / megabytes_archivo:10.2f}")
@@ -0,0 +1,71 @@
+"""
+Compara GnomeSort con los algoritmos de MotorOrdenamiento sobre 1k/10k/100k entradas sintéticas.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_ordenamiento.py --tamanos 1000 10000 100000 --campos year journal
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import escribir_archivo
+from Ordenamiento import GnomeSort, MotorOrdenamiento
+from Util.BibFileUtil import BibFileUtil
+
+# Por encima de este tamaño GnomeSort (cuadrático) tarda demasiado y se omite
+LIMITE_GNOME = 5000
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def ejecutar(tamanos, campos):
+    resultados = []
+    for n in tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = escribir_archivo(os.path.join(directorio, "sintetico.bib"), n)
+            base = BibFileUtil.leer_archivo_bib(ruta)
+
+        referencia = None
+        for algoritmo in ("gnome",) + MotorOrdenamiento.ALGORITMOS:
+            entradas = list(base)
+            if algoritmo == "gnome":
+                if n > LIMITE_GNOME:
+                    resultados.append((n, algoritmo, None))
+                    continue
+
+                def ordenar_gnome():
+                    MotorOrdenamiento.asignar_valor_orden(entradas, campos)
+                    GnomeSort.gnome_sort(entradas)
+                segundos = medir(ordenar_gnome)
+            else:
+                segundos = medir(lambda: MotorOrdenamiento.ordenar(entradas, campos, algoritmo))
+
+            # Todos los algoritmos deben producir exactamente el mismo orden
+            claves = [entrada.clave for entrada in entradas]
+            if referencia is None:
+                referencia = claves
+            elif claves != referencia:
+                raise AssertionError(f"'{algoritmo}' produjo un orden distinto para n={n}")
+            resultados.append((n, algoritmo, segundos))
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de algoritmos de ordenamiento BibTeX.")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--campos", nargs="+", default=["year", "journal"])
+    args = parser.parse_args()
+
+    print(f"Campos de orden: {', '.join(args.campos)} (desempate por clave)")
+    print(f"{'n':>8}  {'algoritmo':<10} {'segundos':>10}")
+    for n, algoritmo, segundos in ejecutar(args.tamanos, tuple(args.campos)):
+        tiempo = f"{segundos:10.4f}" if segundos is not None else f"{'omitido':>10}"
+        print(f"{n:>8}  {algoritmo:<10} {tiempo}")
@@ -0,0 +1,64 @@
+"""
+Escalamiento del análisis map-reduce (Util.AnalisisParalelo) de 1 a N procesos.
+
+Verifica además que el resultado sea idéntico al de la ruta en serie de EstadisticasDescriptivas.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_paralelo.py --n 50000 --workers 1 2 4 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import ARCHIVO_CATEGORIAS, escribir_archivo
+from app import EstadisticasDescriptivas
+from Util.AnalisisParalelo import AnalisisParalelo
+from Util.BibCorpus import BibCorpus
+
+
+def analizar_en_serie(ruta, categorias):
+    """Ruta en serie: las funciones de EstadisticasDescriptivas que usa server.py."""
+    entradas = BibCorpus.desde_archivo(ruta)
+    frecuencias_categorias, frecuencias_variables = EstadisticasDescriptivas.contar_frecuencia_categorias(entradas, categorias)
+    with contextlib.redirect_stdout(io.StringIO()):  # Silenciar las advertencias por año inválido
+        estadisticas = {"year": EstadisticasDescriptivas.calcular_estadisticas_anio(entradas, "year")}
+        for campo in ("author", "journal", "publisher"):
+            estadisticas[campo] = EstadisticasDescriptivas.calcular_estadisticas_max15(entradas, campo)
+        for campo in ("ENTRYTYPE", "source"):
+            estadisticas[campo] = EstadisticasDescriptivas.calcular_estadisticas(entradas, campo)
+    return frecuencias_categorias, frecuencias_variables, estadisticas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del análisis paralelo.")
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    categorias = EstadisticasDescriptivas.cargar_datos(ARCHIVO_CATEGORIAS)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = escribir_archivo(os.path.join(directorio, "sintetico.bib"), args.n)
+
+        inicio = time.perf_counter()
+        esperado = analizar_en_serie(ruta, categorias)
+        t_serie = time.perf_counter() - inicio
+        print(f"{args.n} entradas, {os.cpu_count()} CPUs")
+        print(f"{'serie (EstadisticasDescriptivas)':<34} {t_serie:8.2f} s")
+
+        t_base = None
+        for workers in sorted(set(args.workers)):
+            inicio = time.perf_counter()
+            resultado = AnalisisParalelo.analizar(ruta, categorias, workers)
+            segundos = time.perf_counter() - inicio
+            t_base = t_base or segundos
+
+            obtenido = (resultado["frecuencias_categorias"], resultado["frecuencias_variables"], resultado["estadisticas"])
+            if obtenido != esperado:
+                raise AssertionError(f"El resultado con {workers} proceso(s) difiere de la ruta en serie")
+            print(f"{f'map-reduce, {workers} proceso(s)':<34} {segundos:8.2f} s  (x{t_base / segundos:.2f})")
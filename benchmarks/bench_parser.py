@@ -0,0 +1,100 @@
+"""
+Mide el rendimiento (MB/s) del parser incremental de BibFileUtil frente a la implementación anterior.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_parser.py --tamanos 10000 100000
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import escribir_archivo
+from Util.BibFileUtil import BibFileUtil
+
+
+def leer_archivo_bib_anterior(nombre_archivo):
+    """Copia de la implementación línea a línea original (recompila los patrones en cada línea)."""
+    entradas = []
+    entrada_actual = []
+    clave_actual = ""
+    entry_type_actual = ""
+    campos = {}
+    dentro_de_entrada = False
+
+    with open(nombre_archivo, 'r', encoding='utf-8') as archivo:
+        for linea in archivo:
+            if linea.strip().startswith("@"):
+                if dentro_de_entrada:
+                    entradas.append(BibFileUtil.EntradaBib("".join(entrada_actual), clave_actual, entry_type_actual, campos))
+                    entrada_actual = []
+                    clave_actual = ""
+                    entry_type_actual = ""
+                    campos = {}
+
+                dentro_de_entrada = True
+                entrada_actual.append(linea)
+
+                patron_clave = re.compile(r"@(\w+)\{([^,]+),")
+                coincidencia_clave = patron_clave.search(linea)
+                if coincidencia_clave:
+                    entry_type_actual = coincidencia_clave.group(1)
+                    clave_actual = coincidencia_clave.group(2)
+            elif dentro_de_entrada:
+                entrada_actual.append(linea)
+
+                patron_campo = re.compile(r"(\w+)\s*=\s*\{(.+?)\}")
+                coincidencia_campo = patron_campo.search(linea)
+                if coincidencia_campo:
+                    campos[coincidencia_campo.group(1).lower()] = coincidencia_campo.group(2)
+
+                if linea.strip() == "}":
+                    entradas.append(BibFileUtil.EntradaBib("".join(entrada_actual), clave_actual, entry_type_actual, campos))
+                    entrada_actual = []
+                    clave_actual = ""
+                    entry_type_actual = ""
+                    campos = {}
+                    dentro_de_entrada = False
+
+    return entradas
+
+
+def medir(funcion, ruta):
+    """Devuelve (segundos, pico de memoria en MB, número de entradas)."""
+    inicio = time.perf_counter()
+    total = funcion(ruta)
+    segundos = time.perf_counter() - inicio
+
+    # La memoria se mide en una segunda pasada: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    funcion(ruta)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 2**20, total
+
+
+VARIANTES = {
+    "anterior (lista)": lambda ruta: len(leer_archivo_bib_anterior(ruta)),
+    "leer_archivo_bib": lambda ruta: len(BibFileUtil.leer_archivo_bib(ruta)),
+    "iter_entradas": lambda ruta: sum(1 for _ in BibFileUtil.iter_entradas(ruta)),
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del parser BibTeX.")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'n':>8}  {'variante':<18} {'MB/s':>8} {'segundos':>9} {'pico MB':>9} {'entradas':>9}")
+    for n in args.tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = escribir_archivo(os.path.join(directorio, "sintetico.bib"), n)
+            megabytes = os.path.getsize(ruta) / 2**20
+            for nombre, funcion in VARIANTES.items():
+                segundos, pico, total = medir(funcion, ruta)
+                print(f"{n:>8}  {nombre:<18} {megabytes / segundos:8.1f} {segundos:9.3f} {pico:9.1f} {total:>9}")
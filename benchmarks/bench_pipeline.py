@@ -0,0 +1,332 @@
+"""
+Benchmark de todo el pipeline bibliométrico sobre corpus sintéticos de 1k a 1M entradas.
+
+Mide cada etapa (lectura, ordenamiento, categorías, estadísticas, gráficos y el arranque de
+server.py) con su tiempo y su pico de memoria (RSS). Cada etapa se ejecuta en un proceso hijo
+(fork) para que el pico sea el de esa etapa y no el acumulado del proceso. Los resultados se
+pueden guardar en JSON y comparar con los de otro commit para detectar regresiones, y cada etapa
+se puede perfilar con cProfile o, si está instalado, con py-spy (flamegraph SVG).
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_pipeline.py --tamanos 1000 10000 --salida resultados.json
+    python benchmarks/bench_pipeline.py --tamanos 1000 10000 --comparar base.json --umbral 1.2
+    python benchmarks/bench_pipeline.py --tamanos 10000 --etapas contar_frecuencia_categorias --perfil perfiles/
+    python benchmarks/bench_pipeline.py --tamanos 10000 --etapas leer_archivo_bib --flamegraph perfiles/
+"""
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import multiprocessing
+import os
+import platform
+import pstats
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.generador_bib import ARCHIVO_CATEGORIAS, escribir_archivo
+from app import EstadisticasDescriptivas
+from Ordenamiento import GnomeSort, MotorOrdenamiento
+from Util.BibCorpus import BibCorpus
+from Util.BibFileUtil import BibFileUtil
+from Util.EmparejadorCategorias import EmparejadorCategorias
+from Util.FieldIndex import FieldIndex
+
+# Por encima de este tamaño GnomeSort (cuadrático) tarda demasiado y se omite
+LIMITE_GNOME = 5000
+
+# Nombre que usa server.py para el corpus ordenado
+ARCHIVO_SERVIDOR = "referencias_ordenadas_GnomeSort_year.bib"
+
+
+def memoria_mb():
+    """(RSS actual, pico de RSS) del proceso en MB; fuera de Linux solo el pico de getrusage."""
+    try:
+        with open("/proc/self/status") as estado:
+            valores = dict(linea.split(":", 1) for linea in estado if linea.startswith(("VmRSS", "VmHWM")))
+        return int(valores["VmRSS"].split()[0]) / 1024, int(valores["VmHWM"].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        pico = pico / 2**20 if sys.platform == "darwin" else pico / 1024  # bytes en macOS, KB en Linux
+        return None, pico
+
+
+def reiniciar_pico():
+    """Reinicia el pico de RSS (VmHWM) al RSS actual; devuelve False si el sistema no lo permite."""
+    try:
+        with open("/proc/self/clear_refs", "w") as archivo:
+            archivo.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _ordenar_gnome(contexto):
+    entradas = list(contexto["entradas"])
+    MotorOrdenamiento.asignar_valor_orden(entradas, ("year",))
+    GnomeSort.gnome_sort(entradas)
+
+
+def _grafo_journals(contexto):
+    journal_data = EstadisticasDescriptivas.identificar_journals_mas_publicados(contexto["entradas"])
+    return EstadisticasDescriptivas.generar_grafo_journals(journal_data)
+
+
+# Etapas del pipeline en orden: nombre -> función que recibe el contexto
+ETAPAS = {
+    "leer_archivo_bib": lambda contexto: BibFileUtil.leer_archivo_bib(contexto["ruta"]),
+    "BibCorpus": lambda contexto: BibCorpus.desde_archivo(contexto["ruta"]),
+    "GnomeSort": _ordenar_gnome,
+    "MotorOrdenamiento": lambda contexto: MotorOrdenamiento.ordenar(list(contexto["entradas"]), ("year",)),
+    "contar_frecuencia_categorias": lambda contexto: EstadisticasDescriptivas.contar_frecuencia_categorias(
+        contexto["entradas"], contexto["emparejador"]),
+    "calcular_estadisticas_anio": lambda contexto: EstadisticasDescriptivas.calcular_estadisticas_anio(
+        contexto["entradas"], "year"),
+    "calcular_estadisticas_max15": lambda contexto: EstadisticasDescriptivas.calcular_estadisticas_max15(
+        contexto["entradas"], "author"),
+    "calcular_estadisticas": lambda contexto: EstadisticasDescriptivas.calcular_estadisticas(
+        contexto["entradas"], "ENTRYTYPE"),
+    "calcular_estadisticas_dos_campos": lambda contexto: EstadisticasDescriptivas.calcular_estadisticas_dos_campos(
+        contexto["entradas"], "author", "year"),
+    "FieldIndex": lambda contexto: FieldIndex(contexto["entradas"]),
+    "generar_histograma": lambda contexto: EstadisticasDescriptivas.generar_histograma(
+        contexto["estadisticas_anio"], "year"),
+    "generar_nube_palabras": lambda contexto: EstadisticasDescriptivas.generar_nube_palabras_base64(
+        contexto["frecuencias_variables"]),
+    "generar_grafo_journals": _grafo_journals,
+}
+
+# El arranque de server.py se mide en un subproceso nuevo: primero sin caché y luego con ella
+ETAPAS_SERVIDOR = ("arranque_servidor_frio", "arranque_servidor_caliente")
+
+
+def preparar_contexto(ruta):
+    """Datos que comparten las etapas, calculados una sola vez en el proceso principal."""
+    entradas = BibFileUtil.leer_archivo_bib(ruta)
+    categorias = EstadisticasDescriptivas.cargar_datos(ARCHIVO_CATEGORIAS)
+    emparejador = EmparejadorCategorias(categorias)
+    with contextlib.redirect_stdout(io.StringIO()):
+        estadisticas_anio = EstadisticasDescriptivas.calcular_estadisticas_anio(entradas, "year")
+    _, frecuencias_variables = EstadisticasDescriptivas.contar_frecuencia_categorias(entradas, emparejador)
+    return {
+        "ruta": ruta,
+        "entradas": entradas,
+        "emparejador": emparejador,
+        "estadisticas_anio": estadisticas_anio,
+        "frecuencias_variables": frecuencias_variables,
+    }
+
+
+def medir_etapa(nombre, contexto, archivo_perfil=None):
+    """Ejecuta una etapa y devuelve sus segundos, pico de RSS y aumento de RSS en MB."""
+    reiniciado = reiniciar_pico()
+    rss_inicial, _ = memoria_mb()
+    perfil = cProfile.Profile() if archivo_perfil else None
+    with contextlib.redirect_stdout(io.StringIO()):  # Silenciar las advertencias de las funciones
+        inicio = time.perf_counter()
+        if perfil:
+            perfil.enable()
+        ETAPAS[nombre](contexto)
+        if perfil:
+            perfil.disable()
+        segundos = time.perf_counter() - inicio
+    _, pico = memoria_mb()
+    if perfil:
+        perfil.dump_stats(archivo_perfil)
+    return {
+        "segundos": round(segundos, 4),
+        "pico_rss_mb": round(pico, 1),
+        "delta_rss_mb": round(pico - rss_inicial, 1) if reiniciado and rss_inicial is not None else None,
+    }
+
+
+def _medir_en_hijo(conexion, nombre, contexto, archivo_perfil):
+    try:
+        conexion.send(medir_etapa(nombre, contexto, archivo_perfil))
+    except Exception as e:
+        conexion.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conexion.close()
+
+
+def medir_aislada(nombre, contexto, archivo_perfil=None):
+    """Mide la etapa en un proceso hijo (fork) que hereda el contexto; sin fork, en este proceso."""
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return medir_etapa(nombre, contexto, archivo_perfil)
+    mp = multiprocessing.get_context("fork")
+    receptor, emisor = mp.Pipe(duplex=False)
+    proceso = mp.Process(target=_medir_en_hijo, args=(emisor, nombre, contexto, archivo_perfil))
+    proceso.start()
+    emisor.close()
+    resultado = receptor.recv()
+    proceso.join()
+    return resultado
+
+
+def medir_servidor(ruta_bib):
+    """
+    Tiempo y pico de RSS de `import server` en un subproceso, con el corpus sintético en un
+    directorio de trabajo temporal: la primera vez construye la caché y la segunda la reutiliza.
+    """
+    codigo = (
+        "import json, time\n"
+        "inicio = time.perf_counter()\n"
+        "import server\n"
+        "segundos = time.perf_counter() - inicio\n"
+        "from benchmarks.bench_pipeline import memoria_mb\n"
+        "print(json.dumps({'segundos': round(segundos, 4), 'pico_rss_mb': round(memoria_mb()[1], 1)}))\n"
+    )
+    entorno = dict(os.environ, PYTHONPATH=RAIZ + os.pathsep + os.environ.get("PYTHONPATH", ""), VIGILAR_NUEVOS="0")
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        os.makedirs(os.path.join(directorio, "Util", "outputFile"))
+        shutil.copy(ARCHIVO_CATEGORIAS, os.path.join(directorio, "Util", "Categorias.csv"))
+        shutil.copy(ruta_bib, os.path.join(directorio, "Util", "outputFile", ARCHIVO_SERVIDOR))
+        for nombre in ETAPAS_SERVIDOR:
+            proceso = subprocess.run([sys.executable, "-c", codigo], cwd=directorio, env=entorno,
+                                     capture_output=True, text=True)
+            if proceso.returncode != 0:
+                resultados[nombre] = {"error": proceso.stderr.strip().splitlines()[-1:]}
+                continue
+            resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+            resultado["delta_rss_mb"] = None
+            resultados[nombre] = resultado
+    return resultados
+
+
+def flamegraph(nombre, n, directorio):
+    """Vuelve a ejecutar una sola etapa bajo py-spy y guarda su flamegraph en SVG."""
+    py_spy = shutil.which("py-spy")
+    if py_spy is None:
+        print("Advertencia: py-spy no está instalado; se omite el flamegraph.")
+        return None
+    salida = os.path.join(directorio, f"{n}-{nombre}.svg")
+    subprocess.run([py_spy, "record", "--format", "flamegraph", "--output", salida, "--subprocesses", "--",
+                    sys.executable, os.path.abspath(__file__), "--tamanos", str(n), "--etapas", nombre,
+                    "--sin-servidor"], check=False, capture_output=True)
+    return salida
+
+
+def imprimir_resumen_perfil(archivo_perfil, lineas=15):
+    estadisticas = pstats.Stats(archivo_perfil, stream=sys.stdout)
+    estadisticas.strip_dirs().sort_stats("cumulative").print_stats(lineas)
+
+
+def ejecutar(tamanos, etapas, con_servidor=True, directorio_perfil=None, directorio_flamegraph=None):
+    resultados = []
+    for n in tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = escribir_archivo(os.path.join(directorio, "sintetico.bib"), n)
+            contexto = preparar_contexto(ruta)
+            for nombre in etapas:
+                if nombre == "GnomeSort" and n > LIMITE_GNOME:
+                    resultados.append({"n": n, "etapa": nombre, "omitida": True})
+                    continue
+                archivo_perfil = None
+                if directorio_perfil:
+                    archivo_perfil = os.path.join(directorio_perfil, f"{n}-{nombre}.prof")
+                resultado = medir_aislada(nombre, contexto, archivo_perfil)
+                resultados.append(dict({"n": n, "etapa": nombre}, **resultado))
+                imprimir_fila(resultados[-1])
+                if archivo_perfil and os.path.exists(archivo_perfil):
+                    imprimir_resumen_perfil(archivo_perfil)
+                if directorio_flamegraph:
+                    flamegraph(nombre, n, directorio_flamegraph)
+            del contexto
+
+            if con_servidor:
+                for nombre, resultado in medir_servidor(ruta).items():
+                    resultados.append(dict({"n": n, "etapa": nombre}, **resultado))
+                    imprimir_fila(resultados[-1])
+    return resultados
+
+
+def imprimir_fila(resultado):
+    if "error" in resultado:
+        print(f"{resultado['n']:>8}  {resultado['etapa']:<34} error: {resultado['error']}")
+        return
+    delta = resultado.get("delta_rss_mb")
+    print(f"{resultado['n']:>8}  {resultado['etapa']:<34} {resultado['segundos']:10.3f} "
+          f"{resultado['pico_rss_mb']:10.1f} {'-' if delta is None else f'{delta:.1f}':>10}")
+
+
+def metadatos():
+    """Commit, versión de Python y plataforma, para identificar los resultados."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def comparar(resultados, archivo_base, umbral):
+    """
+    Compara los tiempos con los de un JSON anterior. Devuelve las regresiones: etapas cuyo tiempo
+    creció más que `umbral` veces (y al menos 10 ms, para ignorar el ruido de las etapas cortas).
+    """
+    with open(archivo_base, encoding="utf-8") as archivo:
+        base = json.load(archivo)
+    anteriores = {(r["n"], r["etapa"]): r for r in base["resultados"] if "segundos" in r}
+    print(f"\nComparación con {archivo_base} (commit {base['metadatos'].get('commit')}):")
+    print(f"{'n':>8}  {'etapa':<34} {'antes':>10} {'ahora':>10} {'razón':>8}")
+    regresiones = []
+    for resultado in resultados:
+        anterior = anteriores.get((resultado["n"], resultado["etapa"]))
+        if anterior is None or "segundos" not in resultado:
+            continue
+        razon = resultado["segundos"] / anterior["segundos"] if anterior["segundos"] else float("inf")
+        marca = ""
+        if razon > umbral and resultado["segundos"] - anterior["segundos"] > 0.01:
+            regresiones.append(resultado)
+            marca = "  <- regresión"
+        print(f"{resultado['n']:>8}  {resultado['etapa']:<34} {anterior['segundos']:10.3f} "
+              f"{resultado['segundos']:10.3f} {razon:8.2f}{marca}")
+    return regresiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline bibliométrico completo.")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[1000, 10000],
+                        help="Entradas de cada corpus sintético (de 1000 a 1000000)")
+    parser.add_argument("--etapas", nargs="+", choices=list(ETAPAS), default=list(ETAPAS))
+    parser.add_argument("--sin-servidor", action="store_true", help="No medir el arranque de server.py")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior para detectar regresiones")
+    parser.add_argument("--umbral", type=float, default=1.10, help="Razón de tiempo que cuenta como regresión")
+    parser.add_argument("--perfil", help="Directorio donde guardar un .prof de cProfile por etapa")
+    parser.add_argument("--flamegraph", help="Directorio donde guardar un flamegraph SVG por etapa (py-spy)")
+    args = parser.parse_args()
+
+    for directorio in (args.perfil, args.flamegraph):
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+    print(f"{'n':>8}  {'etapa':<34} {'segundos':>10} {'pico MB':>10} {'delta MB':>10}")
+    resultados = ejecutar(args.tamanos, args.etapas, not args.sin_servidor, args.perfil, args.flamegraph)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump({"metadatos": metadatos(), "resultados": resultados}, archivo, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en: {args.salida}")
+
+    if args.comparar:
+        regresiones = comparar(resultados, args.comparar, args.umbral)
+        if regresiones:
+            print(f"\n{len(regresiones)} etapas más lentas que {args.umbral}x la ejecución anterior.")
+            sys.exit(1)
@@ -0,0 +1,88 @@
+"""
+Compara calcular_estadisticas_dos_campos original (Counter + sorted de todas las combinaciones)
+con AgregadorFrecuencias en modo exacto y aproximado: tiempo, pico de memoria y, para el modo
+aproximado, cuántas de las k combinaciones más frecuentes coinciden con las exactas.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_topk.py --n 100000 --campos author title
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador_bib import escribir_archivo
+from app import EstadisticasDescriptivas
+from Util.Autores import Autores
+from Util.BibCorpus import BibCorpus
+
+
+def dos_campos_anterior(entradas, campo1, campo2, limite=15):
+    """Copia del cálculo original: lista de combinaciones, Counter y sorted completo (con el primer autor de Util.Autores)."""
+    combinaciones = []
+    for entrada in entradas:
+        valor1 = entrada.campos.get(campo1, '').strip()
+        valor2 = entrada.campos.get(campo2, '').strip()
+        if campo1 == 'author' and valor1:
+            valor1 = Autores.primer_autor(valor1)
+        if campo2 == 'author' and valor2:
+            valor2 = Autores.primer_autor(valor2)
+        if valor1 and valor2:
+            combinaciones.append((valor1, valor2))
+    frecuencias = Counter(combinaciones)
+    mas_comunes = frecuencias.most_common(limite)
+    tipos_ordenados = sorted(combinaciones)
+    return {
+        'cantidad': len(combinaciones),
+        'frecuencias': {f"{k[0]} - {k[1]}": v for k, v in mas_comunes},
+        'moda': f"{mas_comunes[0][0][0]} - {mas_comunes[0][0][1]}" if mas_comunes else None,
+        'mediana': tipos_ordenados[len(tipos_ordenados) // 2],
+    }
+
+
+def medir(funcion):
+    """Devuelve (segundos, pico de memoria en MB, resultado)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        segundos = time.perf_counter() - inicio
+        tracemalloc.start()
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return segundos, pico / 2**20, resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la agregación top-k de dos campos.")
+    parser.add_argument("--n", type=int, default=100000)
+    parser.add_argument("--campos", nargs=2, default=["author", "year"])
+    args = parser.parse_args()
+    campo1, campo2 = args.campos
+
+    with tempfile.TemporaryDirectory() as directorio:
+        entradas = BibCorpus.desde_archivo(escribir_archivo(os.path.join(directorio, "sintetico.bib"), args.n))
+        variantes = [
+            ("original", lambda: dos_campos_anterior(entradas, campo1, campo2)),
+            ("exacto", lambda: EstadisticasDescriptivas.calcular_estadisticas_dos_campos(entradas, campo1, campo2)),
+            ("aproximado", lambda: EstadisticasDescriptivas.calcular_estadisticas_dos_campos(
+                entradas, campo1, campo2, modo="aproximado")),
+        ]
+        print(f"{'variante':<12} {'segundos':>9} {'pico MB':>9}")
+        resultados = {}
+        for nombre, funcion in variantes:
+            segundos, pico, resultados[nombre] = medir(funcion)
+            print(f"{nombre:<12} {segundos:9.3f} {pico:9.1f}")
+
+        print(f"exacto idéntico al original: {resultados['exacto'] == resultados['original']}")
+        comunes = set(resultados['aproximado']['frecuencias']) & set(resultados['exacto']['frecuencias'])
+        print(f"aproximado: {len(comunes)} de {len(resultados['exacto']['frecuencias'])} combinaciones más "
+              f"frecuentes coinciden; mediana {resultados['aproximado']['mediana']} "
+              f"(exacta {resultados['exacto']['mediana']})")
@@ -0,0 +1,109 @@
+"""
+Generador de archivos BibTeX sintéticos para los benchmarks.
+
+Produce entradas con el mismo formato que escribe bibtexparser (un campo por línea) y con
+distribuciones parecidas a las exportaciones reales: pocos journals muy frecuentes, años
+concentrados en la última década, varios autores por artículo y abstracts que mencionan
+las variables de Categorias.csv.
+"""
+import argparse
+import csv
+import os
+import random
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIVO_CATEGORIAS = os.path.join(RAIZ, "Util", "Categorias.csv")
+
+TIPOS = ["article"] * 6 + ["inproceedings"] * 3 + ["book", "incollection"]
+FUENTES = ["Scopus", "IEEE", "ScienceDirect", "SAGE", "ACM"]
+EDITORIALES = ["Elsevier", "IEEE", "Springer", "SAGE Publications", "ACM", "Taylor & Francis", "Wiley"]
+PAISES = ["USA", "United Kingdom", "Germany", "Spain", "Colombia", "China", "Brazil", "India", "Japan", "Mexico"]
+APELLIDOS = ["Smith", "García", "Müller", "Wang", "Kim", "Rossi", "Silva", "Kumar", "Nakamura", "López",
+             "Johnson", "Brown", "Martínez", "Chen", "Novak", "Dubois", "Ivanov", "Hernández", "Lee", "Ahmed"]
+NOMBRES = ["John", "María", "Wei", "Ana", "Peter", "Li", "Carlos", "Sofia", "Hiroshi", "Fatima", "Laura", "David"]
+PALABRAS = ("the of and to in a is that for on with as by this are be an from at which study students "
+            "results learning education computational thinking approach data analysis model course "
+            "school teachers research method framework using based evaluation activities").split()
+
+
+def _cargar_variables():
+    variables = []
+    with open(ARCHIVO_CATEGORIAS, mode='r', encoding='utf-8') as archivo_csv:
+        for fila in csv.DictReader(archivo_csv):
+            variables.extend(parte.strip() for parte in fila['Variable'].split(' - '))
+    return variables
+
+
+def _zipf(rnd, n):
+    """Índice en [0, n) con distribución aproximadamente de Zipf."""
+    return min(int(rnd.paretovariate(1.1)) - 1, n - 1)
+
+
+def _autor(rnd):
+    return f"{rnd.choice(APELLIDOS)}{rnd.randint(1, 400)}, {rnd.choice(NOMBRES)}"
+
+
+def generar_entrada(rnd, indice, variables, n_journals=500):
+    """Devuelve el texto BibTeX de una entrada sintética."""
+    tipo = rnd.choice(TIPOS)
+    anio = 2024 - min(int(rnd.expovariate(0.25)), 34)
+    autores = [_autor(rnd) for _ in range(rnd.randint(1, 6))]
+    n_palabras = rnd.randint(80, 250)
+    abstract = []
+    for _ in range(n_palabras):
+        if rnd.random() < 0.06:
+            abstract.append(rnd.choice(variables).lower())
+        else:
+            abstract.append(rnd.choice(PALABRAS))
+
+    campos = {
+        "abstract": " ".join(abstract).capitalize() + ".",
+        "author": " and ".join(autores),
+        "title": " ".join(rnd.choice(PALABRAS) for _ in range(rnd.randint(5, 14))).capitalize(),
+        "year": str(anio),
+        "source": rnd.choice(FUENTES),
+        "publisher": rnd.choice(EDITORIALES),
+        "keywords": "; ".join(rnd.sample(variables, 3)).lower(),
+        "affiliations": "; ".join(
+            f"University {rnd.randint(1, 90)}, City {rnd.randint(1, 40)}, {rnd.choice(PAISES)}" for _ in autores),
+    }
+    if tipo == "article":
+        campos["journal"] = f"Journal of Computing Education {_zipf(rnd, n_journals)}"
+        campos["issn"] = f"{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}"
+    elif tipo == "inproceedings":
+        campos["booktitle"] = f"Proceedings of the Conference {_zipf(rnd, n_journals)}"
+    if rnd.random() < 0.9:
+        campos["doi"] = f"10.{rnd.randint(1000, 9999)}/synt.{indice}"
+    if rnd.random() < 0.7:
+        campos["note"] = f"Cited by: {int(rnd.paretovariate(1.3)) - 1}"
+
+    clave = f"{autores[0].split(',')[0].lower()}{anio}{indice}"
+    lineas = [f" {campo} = {{{valor}}}" for campo, valor in sorted(campos.items())]
+    return f"@{tipo}{{{clave},\n" + ",\n".join(lineas) + "\n}\n\n"
+
+
+def generar_textos(n, semilla=42):
+    """Genera `n` entradas BibTeX sintéticas como texto."""
+    rnd = random.Random(semilla)
+    variables = _cargar_variables()
+    for indice in range(n):
+        yield generar_entrada(rnd, indice, variables)
+
+
+def escribir_archivo(ruta, n, semilla=42):
+    """Escribe un archivo .bib sintético de `n` entradas y devuelve su ruta."""
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as salida:
+        for texto in generar_textos(n, semilla):
+            salida.write(texto)
+    return ruta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un archivo .bib sintético.")
+    parser.add_argument("salida")
+    parser.add_argument("--n", type=int, default=10000)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    escribir_archivo(args.salida, args.n, args.semilla)
+    print(f"{args.n} entradas escritas en: {args.salida}")
@@ -0,0 +1,70 @@
+"""
+Configuración de gunicorn (la lee automáticamente desde el directorio de trabajo; ver Procfile).
+
+Con PRECARGA=1 (por defecto) server.py se importa una sola vez en el proceso maestro
+(preload_app): el corpus, los índices y los artefactos se cargan antes del fork y los workers los
+heredan. Para que las páginas sigan compartidas después del fork, la recolección de basura se
+desactiva durante la carga (no deja huecos en las páginas) y los objetos cargados se congelan con
+gc.freeze() al terminar la carga y antes de cada fork, de modo que las recolecciones (del maestro
+y de los workers, que vuelven a activarlas) no escriben en ellos.
+Con PRECARGA=0 cada worker importa server.py por su cuenta, como antes.
+
+Al quedar listo, el maestro registra el tiempo de arranque y el de cada etapa de la carga, y cada
+worker registra su memoria (RSS, PSS y la parte compartida) al iniciar.
+"""
+import gc
+import os
+import sys
+import time
+
+inicio_arranque = time.perf_counter()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.environ.get("HILOS", 4))
+
+preload_app = os.environ.get("PRECARGA", "1") == "1"
+os.environ["PRECARGA"] = "1" if preload_app else "0"  # server.py lo consulta para sus hilos
+if preload_app:
+    gc.disable()
+
+
+def _mb(bytes_):
+    return f"{bytes_ / 2**20:.0f} MB"
+
+
+def when_ready(server):
+    from Util.Metricas import Metricas
+
+    if preload_app:
+        # La carga terminó: el maestro vuelve a recolectar, sin tocar los objetos ya cargados
+        gc.freeze()
+        gc.enable()
+
+    etapas = ", ".join(f"{etapa} {segundos:.2f} s" for etapa, segundos in Metricas.segundos_por_etapa().items())
+    memoria = Metricas.memoria_proceso()
+    server.log.info(f"Arranque en {time.perf_counter() - inicio_arranque:.2f} s "
+                    f"(precarga: {'sí' if preload_app else 'no'}; {etapas or 'sin etapas medidas'}); "
+                    f"maestro RSS {_mb(memoria.get('rss', 0))}")
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
+        # Los hilos del maestro no pasan al worker: cada uno inicia el suyo
+        sys.modules["server"].iniciar_vigilancia()
+
+
+def post_worker_init(worker):
+    from Util.Metricas import Metricas
+
+    memoria = Metricas.memoria_proceso()
+    if memoria:
+        worker.log.info(f"Worker {worker.pid}: RSS {_mb(memoria['rss'])}, PSS {_mb(memoria['pss'])}, "
+                        f"compartida {_mb(memoria['compartida'])}, privada {_mb(memoria['privada'])}")
@@ -1,36 +1,52 @@
-import bibtexparser
-
-# Función para leer el archivo .bib y almacenar las entradas
-def leer_bibtex(ruta_archivo):
-    with open(ruta_archivo, encoding='utf-8') as bibtex_file:
-        bib_database = bibtexparser.load(bibtex_file)
-    return bib_database.entries
-
-# Función para filtrar entradas que tienen DOI
-def filtrar_por_doi(entries):
-    entradas_con_doi = [entry for entry in entries if 'doi' in entry]
-    return entradas_con_doi
-
-# Guardar los resultados filtrados en un archivo .bib
-def guardar_bibtex(entradas, archivo_salida):
-    bib_database = bibtexparser.bibdatabase.BibDatabase()
-    bib_database.entries = entradas
-    
-    with open(archivo_salida, 'w', encoding='utf-8') as bibtex_file:
-        writer = bibtexparser.bwriter.BibTexWriter()
-        bibtex_file.write(writer.write(bib_database))
-
-# Asegúrate de que la ruta al archivo es correcta
-ruta_archivo_bib = '../Util/BaseDatos.bib'
-archivo_salida = '../Util/filtradoPorDoi.bib'
-
-# Leer el archivo unificado
-try:
-    entradas_unificadas = leer_bibtex(ruta_archivo_bib)
-    # Filtrar las entradas que contienen DOI
-    entradas_filtradas = filtrar_por_doi(entradas_unificadas)
-    # Guardar el archivo filtrado por DOI
-    guardar_bibtex(entradas_filtradas, archivo_salida)
-    print(f'Se han guardado {len(entradas_filtradas)} entradas con DOI en el archivo "{archivo_salida}".')
-except FileNotFoundError as e:
-    print(f"Error: {e}")
+"""
+Filtra el archivo unificado de referencias y guarda las entradas que cumplen los criterios.
+
+Por defecto conserva las entradas que tienen DOI (el filtro original). Los criterios se combinan
+con Y y se evalúan en streaming con Util.FiltroBib: las entradas que se pueden descartar por su
+cabecera o por los nombres de sus campos no se llegan a parsear.
+
+Uso (desde la raíz del repositorio):
+    python -m scripts.Filter
+    python -m scripts.Filter Util/BaseDatos.bib salida.bib --campo doi --anios 2015 2020 --tipo article
+"""
+import argparse
+import os
+
+from Util.FiltroBib import FiltroBib, Journal, RangoAnios, Regex, TieneCampo, TiposEntrada, Y
+
+# Rutas por defecto del proyecto
+directorio_util = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Util')
+ruta_archivo_bib = os.path.join(directorio_util, 'BaseDatos.bib')
+archivo_salida = os.path.join(directorio_util, 'filtradoPorDoi.bib')
+
+
+def construir_predicado(args):
+    """Combina con Y los criterios indicados en la línea de comandos."""
+    predicados = [TieneCampo(campo) for campo in args.campo]
+    if args.anios:
+        predicados.append(RangoAnios(*args.anios))
+    if args.tipo:
+        predicados.append(TiposEntrada(*args.tipo))
+    if args.journal:
+        predicados.append(Journal(*args.journal))
+    if args.regex:
+        predicados.append(Regex(args.regex))
+    return Y(*predicados)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filtra un archivo .bib en streaming.")
+    parser.add_argument("entrada", nargs="?", default=ruta_archivo_bib)
+    parser.add_argument("salida", nargs="?", default=archivo_salida)
+    parser.add_argument("--campo", nargs="+", default=["doi"], help="Campos que deben estar presentes")
+    parser.add_argument("--anios", nargs=2, type=int, metavar=("DESDE", "HASTA"))
+    parser.add_argument("--tipo", nargs="+", help="Tipos de entrada (article, inproceedings, ...)")
+    parser.add_argument("--journal", nargs="+")
+    parser.add_argument("--regex", help="Expresión regular sobre el título y el abstract")
+    args = parser.parse_args()
+
+    try:
+        estadisticas = FiltroBib(construir_predicado(args)).escribir(args.entrada, args.salida)
+        print(f'Se han guardado {estadisticas["cumplen"]} de {estadisticas["leidas"]} entradas en el archivo "{args.salida}".')
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
@@ -1,37 +1,595 @@
+import base64
+import glob
+import gzip
+import hashlib
+import hmac
+import json
 import os
-from flask import Flask, render_template, request
+import threading
+import time
+from flask import Flask, Response, g, jsonify, render_template, request, url_for
 from app import EstadisticasDescriptivas
-from Util.BibFileUtil import BibFileUtil
+from Util.ActualizacionCorpus import ActualizacionCorpus
+from Util.Autores import Autores
+from Util.CacheCorpus import CacheCorpus
+from Util.CortesCategorias import CortesCategorias
+from Util.CuboOLAP import CuboOLAP
+from Util.EmparejadorCategorias import EmparejadorCategorias
+from Util.Enriquecimiento import Enriquecimiento
+from Util.FieldIndex import FieldIndex
+from Util.IndiceBusqueda import IndiceBusqueda
+from Util.Metricas import Metricas
+from Util.CacheGraficos import CacheGraficos
+from Util.Renderizado import Renderizado
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
 
 app = Flask(__name__, static_folder='Style', template_folder='Templates')
 
-# Configuración de archivo y datos preprocesados
+# Configuración de archivo y datos preprocesados. El .bib ordenado sale de UnirBib + Ordenamiento y
+# no se versiona; para probar sin las bases de datos se puede generar uno sintético con
+#   python benchmarks/generador_bib.py Util/outputFile/referencias_ordenadas_GnomeSort_year.bib --n 2000
 ruta = "./Util/outputFile/"
 archivo_entrada = ruta + "referencias_ordenadas_GnomeSort_year.bib"
+ruta_cache = ruta + "cache/corpus.bibcache"
+ruta_indice_busqueda = ruta + "cache/busqueda.idx"
+
+archivo_categorias = "./Util/Categorias.csv"
+categorias = EstadisticasDescriptivas.cargar_datos(archivo_categorias)
+# Índice palabra -> (categoría, variable) construido una sola vez
+emparejador_categorias = EmparejadorCategorias(categorias)
+# Versión de Categorias.csv: los artefactos de categorías se recalculan si cambia
+huella_categorias = CortesCategorias.calcular_huella(archivo_categorias)
+
+def datos_de_frecuencias(frecuencias_categorias, frecuencias_variables):
+    """Frecuencias por categoría con el total y las de sus variables, como las muestra la página."""
+    return {
+        categoria: {
+            "total": total,
+            "variables": frecuencias_variables[categoria]
+        }
+        for categoria, total in frecuencias_categorias.items()
+    }
+
+def calcular_categorias(entradas):
+    """Cortes de categorías y cubo OLAP de las entradas, recorriendo los abstracts una sola vez."""
+    cortes = CortesCategorias(emparejador_categorias.variables, huella_categorias)
+    cubo = CuboOLAP.desde_entradas(entradas, emparejador_categorias, huella_categorias, cortes)
+    return cortes, cubo
 
-# Cargar los datos de frecuencias y la nube de palabras una vez
-categorias = EstadisticasDescriptivas.cargar_datos("./Util/Categorias.csv")
-entradas = BibFileUtil.leer_archivo_bib(archivo_entrada)
+def construir_artefactos(entradas):
+    """
+    Calcula los datos que se muestran en todas las páginas (frecuencias, nube de palabras y grafo).
+    Solo se ejecuta cuando la caché no existe o el archivo .bib cambió.
+    """
+    # Cubo OLAP y frecuencias por corte (año, tipo) en una sola pasada; el total es la suma de todos los cortes
+    cortes_categorias, cubo_olap = calcular_categorias(entradas)
+    frecuencias_categorias, frecuencias_variables = cortes_categorias.frecuencias()
 
-frecuencias_categorias, frecuencias_variables = EstadisticasDescriptivas.contar_frecuencia_categorias(entradas, categorias)
+    # Generar los datos de frecuencias por categorías
+    datos_frecuencias = datos_de_frecuencias(frecuencias_categorias, frecuencias_variables)
 
-# Generar los datos de frecuencias por categorías
-datos_frecuencias = {
-    categoria: {
-        "total": total,
-        "variables": frecuencias_variables[categoria]
+    # Citaciones y país del primer autor como columnas del corpus (se guardan en la caché)
+    Enriquecimiento.de(entradas)
+
+    #Cargar los datos del grafo
+    journal_data = EstadisticasDescriptivas.identificar_journals_mas_publicados(entradas)
+
+    # Generar la nube de palabras y el grafo (en base64) en paralelo
+    nube_palabras, img_grafo_base64 = Renderizado.en_paralelo([
+        (EstadisticasDescriptivas.generar_nube_palabras_base64, (frecuencias_variables,)),
+        (EstadisticasDescriptivas.generar_grafo_journals, (journal_data,)),
+    ])
+
+    return {
+        "cortes_categorias": cortes_categorias,
+        "cubo_olap": cubo_olap,
+        "datos_frecuencias": datos_frecuencias,
+        "nube_palabras": nube_palabras,
+        "img_grafo_base64": img_grafo_base64,
+        "datos_grafo": EstadisticasDescriptivas.datos_grafo_journals(journal_data),
     }
-    for categoria, total in frecuencias_categorias.items()
-}
 
-# Generar la nube de palabras una vez
-nube_palabras = EstadisticasDescriptivas.generar_nube_palabras_base64(frecuencias_variables)
+def publicar_artefactos():
+    """Expone los artefactos precalculados en las variables que usan las rutas."""
+    global cortes_categorias, cubo_olap, datos_frecuencias, nube_palabras, img_grafo_base64, datos_grafo, imagenes_fijas
+    cortes_categorias = artefactos["cortes_categorias"]
+    cubo_olap = artefactos["cubo_olap"]
+    datos_frecuencias = artefactos["datos_frecuencias"]
+    nube_palabras = artefactos["nube_palabras"]
+    img_grafo_base64 = artefactos["img_grafo_base64"]
+    datos_grafo = artefactos.get("datos_grafo")  # Las cachés anteriores no lo incluyen; se reconstruyen al cambiar el .bib
+
+    # Imágenes fijas decodificadas una sola vez para servirlas como archivos cacheables
+    imagenes_fijas = {
+        "nube_palabras.png": base64.b64decode(nube_palabras),
+        "grafo_journals.png": base64.b64decode(img_grafo_base64),
+    }
+
+def recalcular_categorias():
+    """
+    Recalcula los artefactos que dependen de Categorias.csv (cortes, cubo OLAP, frecuencias y
+    nube de palabras) cuando la caché se construyó con otra versión del archivo, y guarda la caché.
+    """
+    cortes, cubo = calcular_categorias(entradas)
+    frecuencias_categorias, frecuencias_variables = cortes.frecuencias()
+    artefactos["cortes_categorias"] = cortes
+    artefactos["cubo_olap"] = cubo
+    artefactos["datos_frecuencias"] = datos_de_frecuencias(frecuencias_categorias, frecuencias_variables)
+    artefactos["nube_palabras"] = EstadisticasDescriptivas.generar_nube_palabras_base64(frecuencias_variables)
+    CacheCorpus.guardar(ruta_cache, entradas, artefactos, CacheCorpus.leer_metadatos(ruta_cache))
+
+# Backend de las estadísticas por campo: "indice" (FieldIndex, sin dependencias) o "pandas"
+backend_estadisticas = os.environ.get("BACKEND_ESTADISTICAS", "indice")
+
+def cargar_estado():
+    """
+    Carga el corpus columnar y los artefactos desde la caché binaria (mmap compartido entre
+    workers); se reconstruye automáticamente si el archivo .bib cambió.
+    """
+    global entradas, artefactos, indice_campos, indice_busqueda, version_corpus
+    with Metricas.etapa("carga_corpus"):
+        entradas, artefactos = CacheCorpus.cargar_o_construir(archivo_entrada, ruta_cache, construir_artefactos)
+    # Las cachés anteriores no incluyen los cortes ni el cubo
+    cortes, cubo = artefactos.get("cortes_categorias"), artefactos.get("cubo_olap")
+    if cortes is None or cubo is None or {cortes.huella_categorias, cubo.huella_categorias} != {huella_categorias}:
+        recalcular_categorias()
+    publicar_artefactos()
+
+    # Índice de frecuencias por campo: las peticiones POST se responden sin recorrer las entradas
+    with Metricas.etapa("indice_campos"):
+        if backend_estadisticas == "pandas":
+            from Util.EstadisticasPandas import EstadisticasPandas
+            indice_campos = EstadisticasPandas(entradas)
+        else:
+            indice_campos = FieldIndex(entradas)
+
+    # Versión (SHA-256) del corpus: invalida la caché de histogramas y los ETag
+    version_corpus = CacheCorpus.leer_metadatos(ruta_cache)["sha256"]
+
+    # Índice invertido de title, abstract y keywords para /search, compartido con mmap
+    with Metricas.etapa("indice_busqueda"):
+        indice_busqueda = IndiceBusqueda.cargar_o_construir(entradas, ruta_indice_busqueda, {"sha256": version_corpus})
+
+cargar_estado()
+
+# Formato de los histogramas ("png" o "svg") y resolución de las imágenes PNG
+formato_imagen = os.environ.get("FORMATO_IMAGEN", "png")
+dpi_imagen = int(os.environ.get("DPI_IMAGEN", Renderizado.DPI))
+mime_imagen = Renderizado.mime(formato_imagen)
+
+# Caché LRU de histogramas renderizados, invalidada por la versión (SHA-256) del corpus
+cache_graficos = CacheGraficos(max_elementos=64, max_bytes=32 * 2**20, directorio=ruta + "cache/graficos")
+Metricas.registrar_cache("graficos", cache_graficos.estadisticas)
+# Los autores forman parte de los histogramas y de la red de coautoría: si cambia su normalización,
+# las imágenes guardadas en disco dejan de servir
+tipo_histograma = f"histograma-{formato_imagen}-{dpi_imagen}-autores{Autores.VERSION}"
+
+def histograma_en_cache(stats, campos, etiqueta_x, limite=None):
+    """Devuelve el histograma desde la caché o lo genera y lo guarda."""
+    clave = CacheGraficos.clave(tipo_histograma, campos, limite, version_corpus)
+    return cache_graficos.obtener_o_generar(
+        clave, lambda: EstadisticasDescriptivas.generar_histograma(stats, etiqueta_x, formato_imagen, dpi_imagen))
+
+# Precalentar en paralelo los histogramas de los campos del formulario
+cache_graficos.precalentar(
+    ((CacheGraficos.clave(tipo_histograma, (campo,), None, version_corpus),
+      lambda campo=campo: EstadisticasDescriptivas.generar_histograma(
+          indice_campos.estadisticas(campo), campo, formato_imagen, dpi_imagen))
+     for campo in FieldIndex.CAMPOS_NUMERICOS + FieldIndex.CAMPOS_PRIMER_DATO + FieldIndex.CAMPOS_COMPLETOS),
+    ejecutor=Renderizado.ejecutor()
+)
+
+# Actualización incremental: las exportaciones .bib nuevas se dejan en `ruta_nuevos` y se aplican
+# con /admin/reload o, si VIGILAR_NUEVOS > 0, revisando la carpeta cada VIGILAR_NUEVOS segundos
+ruta_nuevos = ruta + "nuevos/"
+ruta_indice_claves = ruta + "cache/claves.idx"
+bloqueo_actualizacion = threading.Lock()
+
+def aplicar_nuevas(desde):
+    """Aplica como deltas las filas agregadas al corpus desde `desde` y guarda la caché."""
+    global version_corpus, indice_busqueda
+    nuevas = entradas[desde:]
+    indice_campos.agregar_filas(desde)
+
+    # Las frecuencias de categorías y el cubo son sumas: solo se cuentan los abstracts de las entradas nuevas
+    cubo_olap.agregar(nuevas, emparejador_categorias, cortes_categorias)
+    frecuencias_categorias, frecuencias_variables = cortes_categorias.frecuencias()
+    artefactos["datos_frecuencias"] = datos_de_frecuencias(frecuencias_categorias, frecuencias_variables)
+
+    # La nube de palabras y el grafo se vuelven a dibujar con los datos actualizados
+    journal_data = EstadisticasDescriptivas.identificar_journals_mas_publicados(entradas)
+    artefactos["nube_palabras"], artefactos["img_grafo_base64"] = Renderizado.en_paralelo([
+        (EstadisticasDescriptivas.generar_nube_palabras_base64, (frecuencias_variables,)),
+        (EstadisticasDescriptivas.generar_grafo_journals, (journal_data,)),
+    ])
+    artefactos["datos_grafo"] = EstadisticasDescriptivas.datos_grafo_journals(journal_data)
+    publicar_artefactos()
+
+    # La caché queda al día para los demás workers y el próximo arranque
+    metadatos = CacheCorpus.metadatos_archivo(archivo_entrada)
+    CacheCorpus.guardar(ruta_cache, entradas, artefactos, metadatos)
+    version_corpus = metadatos["sha256"]
+
+    # El índice de búsqueda se reconstruye para la nueva versión del corpus
+    IndiceBusqueda.construir(entradas, ruta_indice_busqueda, {"sha256": version_corpus})
+    indice_busqueda = IndiceBusqueda.cargar(ruta_indice_busqueda)
+
+def actualizar_corpus():
+    """
+    Incorpora las exportaciones pendientes sin reiniciar el servidor.
+
+    Si otro worker ya actualizó el corpus (o el .bib cambió por otra vía) primero se recarga el
+    estado desde la caché. Luego las entradas nuevas se deduplican contra el índice de huellas,
+    se insertan en el archivo ordenado y se aplican como deltas; los archivos procesados se
+    mueven a `ruta_nuevos/procesados`.
+
+    Returns:
+        Diccionario con el resumen de la actualización.
+    """
+    os.makedirs(os.path.dirname(ruta_cache), exist_ok=True)
+    with bloqueo_actualizacion, open(ruta_cache + ".actualizacion.lock", 'w') as bloqueo:
+        if fcntl is not None:
+            fcntl.flock(bloqueo, fcntl.LOCK_EX)
+
+        resumen = {"archivos": 0, "leidas": 0, "nuevas": 0, "duplicadas": 0, "recargado": False}
+        metadatos = CacheCorpus.leer_metadatos(ruta_cache)
+        if not CacheCorpus.vigente(archivo_entrada, ruta_cache) or not metadatos or metadatos["sha256"] != version_corpus:
+            cargar_estado()
+            resumen["recargado"] = True
+
+        archivos = sorted(glob.glob(os.path.join(ruta_nuevos, "*.bib")))
+        if archivos:
+            inicio = time.perf_counter()
+            delta = ActualizacionCorpus.aplicar(archivo_entrada, entradas, archivos, ruta_indice_claves)
+            if delta["nuevas"]:
+                aplicar_nuevas(delta["desde"])
+
+            procesados = os.path.join(ruta_nuevos, "procesados")
+            os.makedirs(procesados, exist_ok=True)
+            for archivo in archivos:
+                os.replace(archivo, os.path.join(procesados, os.path.basename(archivo)))
+
+            resumen.update(archivos=len(archivos), leidas=delta["leidas"], nuevas=delta["nuevas"],
+                           duplicadas=delta["duplicadas"], segundos=round(time.perf_counter() - inicio, 3))
+        resumen["entradas"] = len(entradas)
+        resumen["version"] = version_corpus
+        return resumen
+
+# Con varios workers, /admin/reload (o el vigilante) actualiza solo el worker que lo ejecuta; los
+# demás revisan antes de responder, como mucho cada REVISAR_VERSION segundos, si la caché cambió
+intervalo_revision = float(os.environ.get("REVISAR_VERSION", 1))
+ultima_revision = 0.0
+firma_cache = None
+
+@app.before_request
+def revisar_version():
+    """Recarga el estado si otro proceso guardó en la caché una versión distinta del corpus."""
+    global ultima_revision, firma_cache
+    ahora = time.monotonic()
+    if ahora - ultima_revision < intervalo_revision:
+        return
+    ultima_revision = ahora
+    try:
+        estado = os.stat(ruta_cache)
+    except OSError:
+        return
+    firma = (estado.st_mtime_ns, estado.st_size, estado.st_ino)
+    if firma == firma_cache:
+        return
+    metadatos = CacheCorpus.leer_metadatos(ruta_cache)
+    if metadatos and metadatos["sha256"] != version_corpus:
+        # Se espera a que termine la actualización en curso (índice de búsqueda incluido)
+        with bloqueo_actualizacion, open(ruta_cache + ".actualizacion.lock", 'w') as bloqueo:
+            if fcntl is not None:
+                fcntl.flock(bloqueo, fcntl.LOCK_EX)
+            metadatos = CacheCorpus.leer_metadatos(ruta_cache)
+            if metadatos and metadatos["sha256"] != version_corpus:
+                cargar_estado()
+    firma_cache = firma
+
+def vigilar_nuevos(intervalo):
+    """Hilo que revisa periódicamente la carpeta de exportaciones nuevas."""
+    while True:
+        time.sleep(intervalo)
+        try:
+            actualizar_corpus()
+        except Exception as e:
+            print(f"Advertencia: no se pudo actualizar el corpus: {e}")
 
-#Cargar los datos del grafo
-journal_data = EstadisticasDescriptivas.identificar_journals_mas_publicados(entradas)
+intervalo_vigilancia = float(os.environ.get("VIGILAR_NUEVOS", 0))
 
-# Generar el grafo en formato base64
-img_grafo_base64 = EstadisticasDescriptivas.generar_grafo_journals(journal_data)
+def iniciar_vigilancia():
+    if intervalo_vigilancia > 0:
+        threading.Thread(target=vigilar_nuevos, args=(intervalo_vigilancia,), daemon=True, name="vigilante-nuevos").start()
+
+# Con preload_app (gunicorn.conf.py, PRECARGA=1) el módulo se importa en el proceso maestro y los
+# hilos no sobreviven al fork: cada worker inicia su vigilante en post_fork
+if os.environ.get("PRECARGA") != "1":
+    iniciar_vigilancia()
+
+# Respuestas cacheables: ETag derivado de la versión del corpus, Cache-Control y gzip
+MAX_AGE = int(os.environ.get("MAX_AGE", 3600))
+TIPOS_COMPRIMIBLES = {"application/json", "image/svg+xml"}
+MIN_BYTES_GZIP = 512
+
+def respuesta_cacheable(generar, mimetype):
+    """
+    Construye una respuesta con ETag, Cache-Control y compresión gzip.
+
+    El contenido de cada URL (con su query string) solo depende de la versión del corpus, la de
+    Categorias.csv y el formato de las imágenes, así que el ETag se calcula sin generar el cuerpo y las peticiones condicionales
+    (If-None-Match) se responden con 304 sin trabajo adicional.
+
+    Args:
+        generar: Función sin argumentos que devuelve el cuerpo en bytes.
+        mimetype: Tipo MIME de la respuesta.
+    """
+    etag = hashlib.sha1(
+        f"{version_corpus}|{huella_categorias}|{tipo_histograma}|{request.full_path}".encode('utf-8')).hexdigest()
+    comprimir = mimetype in TIPOS_COMPRIMIBLES and "gzip" in request.accept_encodings
+    if comprimir:
+        etag += "-gzip"  # Cada codificación es una representación distinta
+
+    if etag in request.if_none_match:
+        Metricas.contar("etag_total", resultado="acierto")
+        respuesta = Response(status=304)
+    else:
+        Metricas.contar("etag_total", resultado="fallo")
+        cuerpo = generar()
+        if comprimir and len(cuerpo) >= MIN_BYTES_GZIP:
+            cuerpo = gzip.compress(cuerpo, compresslevel=6)
+            respuesta = Response(cuerpo, mimetype=mimetype)
+            respuesta.headers["Content-Encoding"] = "gzip"
+        else:
+            respuesta = Response(cuerpo, mimetype=mimetype)
+
+    respuesta.set_etag(etag)
+    respuesta.headers["Cache-Control"] = f"public, max-age={MAX_AGE}"
+    respuesta.headers["Vary"] = "Accept-Encoding"
+    return respuesta
+
+def respuesta_json(datos):
+    """Respuesta JSON cacheable; las claves no textuales (años) se convierten en cadenas."""
+    return respuesta_cacheable(lambda: json.dumps(datos, ensure_ascii=False).encode('utf-8'), "application/json")
+
+def error_json(mensaje, codigo=404):
+    return jsonify({"error": mensaje}), codigo
+
+# Métricas: fases de cada petición en la cabecera Server-Timing y todo lo acumulado en /metrics
+# (formato de texto de Prometheus). METRICAS=0 las desactiva
+@app.before_request
+def iniciar_metricas():
+    g.inicio_metricas = Metricas.iniciar_peticion()
+
+@app.after_request
+def cabecera_server_timing(respuesta):
+    ruta_peticion = request.url_rule.rule if request.url_rule else "desconocida"
+    server_timing = Metricas.terminar_peticion(g.get("inicio_metricas"), ruta_peticion, respuesta.status_code)
+    if server_timing:
+        respuesta.headers["Server-Timing"] = server_timing
+    return respuesta
+
+@app.route('/metrics')
+def metricas():
+    """Latencias por etapa y por ruta, contadores de peticiones y tasas de acierto de las cachés."""
+    if not Metricas.habilitadas:
+        return error_json("Las métricas están desactivadas (METRICAS=0).")
+    return Response(Metricas.exportar(), mimetype="text/plain; version=0.0.4")
+
+@app.route('/api/stats/<campo>')
+def api_estadisticas(campo):
+    """Estadísticas y frecuencias de un campo del formulario (year, author, ENTRYTYPE, journal, publisher, source)."""
+    stats = indice_campos.estadisticas(campo)
+    if stats is None:
+        return error_json(f"No hay estadísticas para el campo '{campo}'.")
+    return respuesta_json(stats)
+
+@app.route('/api/stats2/<campo1>/<campo2>')
+def api_estadisticas_dos_campos(campo1, campo2):
+    """Estadísticas y las 15 combinaciones más frecuentes de dos campos."""
+    if campo1 not in indice_campos.campos_disponibles or campo2 not in indice_campos.campos_disponibles:
+        return error_json(f"Uno o ambos campos ('{campo1}', '{campo2}') no se encontraron en los datos.")
+    stats = indice_campos.estadisticas_dos_campos(campo1, campo2)
+    if stats is None:
+        return error_json(f"No hay entradas con valores para '{campo1}' y '{campo2}'.")
+    return respuesta_json(stats)
+
+def filtro_categorias(argumentos):
+    """Años y tipos de entrada de la query string (?anio=2020&tipo=article, repetibles); None = todos."""
+    anios = [anio for anio in argumentos.getlist("anio") if anio] or None
+    tipos = [tipo for tipo in argumentos.getlist("tipo") if tipo] or None
+    return anios, tipos
+
+@app.route('/api/categorias')
+def api_categorias():
+    """Frecuencias por categoría y por variable en los abstracts, opcionalmente filtradas por año y tipo."""
+    anios, tipos = filtro_categorias(request.args)
+    if anios is None and tipos is None:
+        return respuesta_json(datos_frecuencias)
+    return respuesta_json(datos_de_frecuencias(*cortes_categorias.frecuencias(anios, tipos)))
+
+@app.route('/api/categorias/filtros')
+def api_filtros_categorias():
+    """Años y tipos de entrada disponibles para filtrar las categorías y la nube de palabras."""
+    return respuesta_json({"anios": cortes_categorias.anios(), "tipos": cortes_categorias.tipos()})
+
+def entero_opcional(argumentos, nombre):
+    valor = argumentos.get(nombre, "").strip()
+    return int(valor) if valor else None
+
+@app.route('/api/cubo')
+def api_cubo():
+    """
+    Consultas sobre el cubo OLAP (año, tipo, journal, publisher, source y categoría).
+
+    Parámetros: agrupar (dimensión del resultado, se puede repetir; sin él, el total), un filtro
+    por dimensión con su nombre (?ENTRYTYPE=article&year=2020, repetibles), medida ("entradas" o
+    "apariciones") y limite.
+    """
+    dimensiones = CuboOLAP.DIMENSIONES + (CuboOLAP.CATEGORIA,)
+    filtros = {dimension: request.args.getlist(dimension) for dimension in dimensiones if dimension in request.args}
+    try:
+        limite = entero_opcional(request.args, "limite")
+    except ValueError:
+        return error_json("limite debe ser un número entero.", 400)
+    try:
+        filas = cubo_olap.consultar(request.args.getlist("agrupar"), filtros,
+                                    request.args.get("medida", "entradas"), limite)
+    except ValueError as error:
+        return error_json(str(error), 400)
+    return respuesta_json({"filas": filas})
+
+@app.route('/api/cubo/<dimension>')
+def api_miembros_cubo(dimension):
+    """Valores de una dimensión del cubo, para construir los filtros."""
+    if dimension not in CuboOLAP.DIMENSIONES and dimension != CuboOLAP.CATEGORIA:
+        return error_json(f"No existe la dimensión '{dimension}'.")
+    return respuesta_json(cubo_olap.miembros(dimension))
+
+@app.route('/api/grafo')
+def api_grafo():
+    """Nodos (journals y países, con tamaño y posición) y aristas del grafo de journals."""
+    if datos_grafo is None:
+        return error_json("Los datos del grafo no están disponibles en la caché actual.")
+    return respuesta_json(datos_grafo)
+
+# Red de coautoría dispersa: se construye con la primera consulta y se descarta si cambia el corpus
+red_coautoria = None
+bloqueo_red_coautoria = threading.Lock()
+
+def obtener_red_coautoria():
+    global red_coautoria
+    with bloqueo_red_coautoria:
+        if red_coautoria is None or red_coautoria[0] != version_corpus:
+            from Util.RedCoautoria import RedCoautoria  # scipy se importa con la primera consulta
+            with Metricas.etapa("red_coautoria"):
+                red_coautoria = (version_corpus, RedCoautoria.construir(entradas))
+        return red_coautoria[1]
+
+@app.route('/api/coautores')
+def api_coautores():
+    """Tamaño y componentes de la red de coautoría y los k autores (hasta 100) con mayor PageRank."""
+    try:
+        k = max(0, min(int(request.args.get("k", 20)), 100))
+    except ValueError:
+        return error_json("k debe ser un número entero.", 400)
+    return respuesta_json(obtener_red_coautoria().resumen(k))
+
+@app.route('/search')
+def buscar():
+    """
+    Búsqueda de texto completo en title, abstract y keywords, ordenada por BM25.
+
+    Parámetros: q (términos y "frases entre comillas"), limite (hasta 100), anio_min, anio_max,
+    anio (un solo año) y tipo (se puede repetir).
+    """
+    consulta = request.args.get("q", "").strip()
+    if not consulta:
+        return error_json("Falta la consulta (parámetro q).", 400)
+    try:
+        limite = entero_opcional(request.args, "limite") or 10
+        anio = entero_opcional(request.args, "anio")
+        anio_min = anio if anio is not None else entero_opcional(request.args, "anio_min")
+        anio_max = anio if anio is not None else entero_opcional(request.args, "anio_max")
+    except ValueError:
+        return error_json("limite, anio, anio_min y anio_max deben ser números enteros.", 400)
+
+    resultado = indice_busqueda.buscar(consulta, limite, anio_min, anio_max, request.args.getlist("tipo") or None)
+    resultados = []
+    for fila, puntaje in resultado["resultados"]:
+        entrada = entradas[fila]
+        resultados.append({
+            "fila": fila,
+            "clave": entrada.clave,
+            "titulo": entrada.campos.get("title"),
+            "anio": entrada.campos.get("year"),
+            "tipo": entrada.entry_type,
+            "puntaje": round(puntaje, 4),
+        })
+    return respuesta_json({"consulta": consulta, "total": resultado["total"], "resultados": resultados})
+
+@app.route('/img/<nombre>')
+def imagen_fija(nombre):
+    """Nube de palabras y grafo de journals, generados al construir la caché del corpus."""
+    if nombre not in imagenes_fijas:
+        return error_json(f"No existe la imagen '{nombre}'.")
+    return respuesta_cacheable(lambda: imagenes_fijas[nombre], "image/png")
+
+@app.route('/img/nube')
+def imagen_nube():
+    """
+    Nube de palabras de las entradas de los años y tipos de la query string, a partir de los
+    cortes precalculados y desde la caché de gráficos.
+    """
+    anios, tipos = filtro_categorias(request.args)
+    _, frecuencias_variables = cortes_categorias.frecuencias(anios, tipos)
+    if not any(frecuencia > 0 for variables in frecuencias_variables.values() for frecuencia in variables.values()):
+        return error_json("No hay abstracts con categorías para el filtro indicado.")
+    clave = CacheGraficos.clave(f"nube-{formato_imagen}-{dpi_imagen}",
+                                (tuple(sorted(anios or ())), tuple(sorted(tipos or ()))),
+                                None, (version_corpus, huella_categorias))
+    return respuesta_cacheable(
+        lambda: base64.b64decode(cache_graficos.obtener_o_generar(
+            clave, lambda: EstadisticasDescriptivas.generar_nube_palabras_base64(
+                frecuencias_variables, formato_imagen, dpi_imagen))),
+        mime_imagen)
+
+# Redes completas (journal–país y coautoría) con layout espectral; las posiciones se guardan en
+# disco y se reutilizan entre formatos, resoluciones y workers. GRAFO_COMPLETO=1 muestra la red
+# journal–país completa en la página principal en lugar del grafo de los 10 journals
+ruta_layouts = ruta + "cache/layouts"
+grafo_completo = os.environ.get("GRAFO_COMPLETO", "0") == "1"
+
+@app.route('/img/grafo/<tipo>')
+def imagen_grafo(tipo):
+    """Red journal–país o de coautoría de todo el corpus, desde la caché de gráficos."""
+    from Util.GrafoGrande import GrafoGrande
+
+    if tipo not in GrafoGrande.TIPOS:
+        return error_json(f"No existe el grafo '{tipo}'.")
+    clave = CacheGraficos.clave(f"grafo-{formato_imagen}-{dpi_imagen}-autores{Autores.VERSION}", (tipo,), None, version_corpus)
+    return respuesta_cacheable(
+        lambda: base64.b64decode(cache_graficos.obtener_o_generar(
+            clave, lambda: EstadisticasDescriptivas.generar_grafo_completo(
+                entradas, tipo, formato_imagen, dpi_imagen, ruta_layouts))),
+        mime_imagen)
+
+@app.route('/img/histograma/<campo>')
+def imagen_histograma(campo):
+    """Histograma de un campo del formulario, desde la caché de gráficos."""
+    stats = indice_campos.estadisticas(campo)
+    if stats is None:
+        return error_json(f"No hay estadísticas para el campo '{campo}'.")
+    return respuesta_cacheable(
+        lambda: base64.b64decode(histograma_en_cache(stats, (campo,), campo)), mime_imagen)
+
+@app.route('/img/histograma/<campo1>/<campo2>')
+def imagen_histograma_dos_campos(campo1, campo2):
+    """Histograma de las combinaciones más frecuentes de dos campos, desde la caché de gráficos."""
+    if campo1 not in indice_campos.campos_disponibles or campo2 not in indice_campos.campos_disponibles:
+        return error_json(f"Uno o ambos campos ('{campo1}', '{campo2}') no se encontraron en los datos.")
+    stats = indice_campos.estadisticas_dos_campos(campo1, campo2)
+    if stats is None:
+        return error_json(f"No hay entradas con valores para '{campo1}' y '{campo2}'.")
+    return respuesta_cacheable(
+        lambda: base64.b64decode(histograma_en_cache(stats, (campo1, campo2), f"{campo1} - {campo2}", limite=15)),
+        mime_imagen)
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Aplica las exportaciones pendientes; requiere la cabecera X-Admin-Token igual a ADMIN_TOKEN."""
+    token = os.environ.get("ADMIN_TOKEN")
+    if not token or not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token):
+        return error_json("No autorizado.", 403)
+    try:
+        resumen = actualizar_corpus()
+    except Exception as e:
+        return error_json(f"No se pudo actualizar el corpus: {str(e)}", 500)
+    return jsonify(resumen)
 
 # Ruta principal
 @app.route('/', methods=['GET', 'POST'])
@@ -42,63 +600,78 @@ def index():
     stats_dos_variables = None
     error_mensaje = None
 
+    # Filtro por año y tipo de entrada de las frecuencias de categorías y la nube de palabras (GET)
+    anio_filtro = request.args.get("anio", "")
+    tipo_filtro = request.args.get("tipo", "")
+    frecuencias_mostradas = datos_frecuencias
+    url_nube = url_for('imagen_fija', nombre="nube_palabras.png")
+    if anio_filtro or tipo_filtro:
+        anios, tipos = filtro_categorias(request.args)
+        frecuencias_mostradas = datos_de_frecuencias(*cortes_categorias.frecuencias(anios, tipos))
+        url_nube = url_for('imagen_nube', anio=anio_filtro or None, tipo=tipo_filtro or None)
+
     if request.method == 'POST':
         # Obtener los valores del formulario
-        campo = request.form.get("campo", "").strip()
-        campo1 = request.form.get("campo1", "").strip()
-        campo2 = request.form.get("campo2", "").strip()
+        with Metricas.etapa("validacion"):
+            campo = request.form.get("campo", "").strip()
+            campo1 = request.form.get("campo1", "").strip()
+            campo2 = request.form.get("campo2", "").strip()
+            campos_validos = (campo1 in indice_campos.campos_disponibles and campo2 in indice_campos.campos_disponibles)
 
         # Procesar si solo una variable fue seleccionada
         if campo:
             try:
-                # Procesar estadísticas para una sola variable
-                if campo == "year":
-                    stats = EstadisticasDescriptivas.calcular_estadisticas_anio(entradas, campo)
-                elif campo == "author":
-                    stats = EstadisticasDescriptivas.calcular_estadisticas_max15(entradas, campo)
-                elif campo in ["ENTRYTYPE", "source"]:
-                    stats = EstadisticasDescriptivas.calcular_estadisticas(entradas, campo)
-                elif campo in ["journal", "publisher"]:
-                    stats = EstadisticasDescriptivas.calcular_estadisticas_max15(entradas, campo)
+                # Estadísticas precalculadas en el índice (year, author, ENTRYTYPE, journal, publisher, source)
+                with Metricas.etapa("estadisticas"):
+                    stats = indice_campos.estadisticas(campo)
                 
-                # Generar histograma para una variable
-                imagen_histograma = EstadisticasDescriptivas.generar_histograma(stats, campo)
+                # El navegador descarga (y guarda en caché) el histograma desde su propia URL
+                if stats is None:
+                    raise ValueError("no hay datos para este campo")
+                imagen_histograma = url_for('imagen_histograma', campo=campo)
             except Exception as e:
                 error_mensaje = f"Ocurrió un error al procesar la estadística para '{campo}': {str(e)}"
         
         # Procesar si se seleccionaron dos variables
         elif campo1 and campo2:
             # Verificar si los campos existen en las entradas
-            campos_disponibles = {key for entrada in entradas for key in entrada.campos.keys()}
-            campos_disponibles.add('ENTRYTYPE')
-            
-            if campo1 not in campos_disponibles or campo2 not in campos_disponibles:
+            if not campos_validos:
                 error_mensaje = f"Uno o ambos campos ingresados ('{campo1}', '{campo2}') no se encontraron en los datos."
-                return render_template('index.html', error_mensaje=error_mensaje)
+                with Metricas.etapa("plantilla"):
+                    return render_template('index.html', error_mensaje=error_mensaje)
 
             try:
-                # Calcular estadísticas descriptivas para las dos variables
-                stats_dos_variables = EstadisticasDescriptivas.calcular_estadisticas_dos_campos(entradas, campo1, campo2)
+                # Calcular estadísticas descriptivas para las dos variables desde el índice
+                with Metricas.etapa("estadisticas"):
+                    stats_dos_variables = indice_campos.estadisticas_dos_campos(campo1, campo2)
                 
-                # Generar histograma para las dos variables
-                imagen_histograma_dos_variables = EstadisticasDescriptivas.generar_histograma(stats_dos_variables, f"{campo1} - {campo2}")
+                # URL del histograma para las dos variables
+                if stats_dos_variables is None:
+                    raise ValueError("no hay entradas con valores para ambos campos")
+                imagen_histograma_dos_variables = url_for('imagen_histograma_dos_campos', campo1=campo1, campo2=campo2)
             except Exception as e:
                 error_mensaje = f"Ocurrió un error al calcular las estadísticas para '{campo1}' y '{campo2}': {str(e)}"
         
         else:
             error_mensaje = "Debe seleccionar una variable o dos variables válidas."
 
-    return render_template(
-        'index.html', 
-        imagen_histograma=imagen_histograma, 
-        imagen_histograma_dos_variables=imagen_histograma_dos_variables,
-        estadisticas=stats, 
-        estadisticas_dos_variables=stats_dos_variables,
-        datos_frecuencias=datos_frecuencias,
-        nube_palabras=nube_palabras,
-        img_grafo_base64=img_grafo_base64,
-        error_mensaje=error_mensaje
-    )
+    with Metricas.etapa("plantilla"):
+        return render_template(
+            'index.html', 
+            imagen_histograma=imagen_histograma, 
+            imagen_histograma_dos_variables=imagen_histograma_dos_variables,
+            estadisticas=stats, 
+            estadisticas_dos_variables=stats_dos_variables,
+            datos_frecuencias=frecuencias_mostradas,
+            url_nube_palabras=url_nube if any(datos["total"] for datos in frecuencias_mostradas.values()) else None,
+            anios_categorias=cortes_categorias.anios(),
+            tipos_categorias=cortes_categorias.tipos(),
+            anio_filtro=anio_filtro,
+            tipo_filtro=tipo_filtro,
+            url_grafo=(url_for('imagen_grafo', tipo="journal_pais") if grafo_completo
+                       else url_for('imagen_fija', nombre="grafo_journals.png")),
+            error_mensaje=error_mensaje
+        )
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5000))